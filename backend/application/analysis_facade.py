@@ -1,18 +1,37 @@
 from __future__ import annotations
 
+import asyncio
+import tempfile
+import time
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
 from fastapi import HTTPException, UploadFile
 
 from backend.application.clause_extractor import ClauseExtractor
-from backend.application.llm_agent import LLMAgent
+from backend.application.llm_agent import ClauseFieldCallback, LLMAgent, is_fallback
 from backend.application.ocr_service import OCRService
+from backend.application.result_query import parse_fields, query_clauses, summarize_result
 from backend.application.risk_analyzer import RiskAnalyzer
-from backend.domain.models import AnalysisResult, Document, DocumentStatus
+from backend.application.template_matcher import TemplateMatcher, build_template
+from backend.domain.models import (
+    AnalysisResult,
+    Clause,
+    ClauseImprovement,
+    ClausePage,
+    ContractTemplate,
+    Document,
+    DocumentStatus,
+    ResultSummary,
+)
+from backend.infrastructure.compute.executors import ExecutorPool
+from backend.infrastructure.metrics.prometheus import STAGE_DURATION, TEMPLATE_CLAUSES, provider_labels
+from backend.infrastructure.metrics.tracing import record_span, span
 from backend.infrastructure.storage.repository import InMemoryRepository
 
+T = TypeVar("T")
+
 
 class AnalysisFacade:
     """Single entry point for the end-to-end analysis pipeline."""
@@ -24,45 +43,272 @@ class AnalysisFacade:
         clause_extractor: ClauseExtractor,
         llm_agent: LLMAgent,
         risk_analyzer: RiskAnalyzer,
+        executors: Optional[ExecutorPool] = None,
+        template_matcher: Optional[TemplateMatcher] = None,
     ) -> None:
         self.repository = repository
         self.ocr_service = ocr_service
         self.clause_extractor = clause_extractor
         self.llm_agent = llm_agent
         self.risk_analyzer = risk_analyzer
+        # Without executors the blocking stages run on asyncio's default thread pool (scripts, benchmarks)
+        self.executors = executors
+        self.template_matcher = template_matcher
+        # document_id -> (contract_type, task) for the single analysis allowed per document
+        self._inflight: Dict[str, Tuple[str, asyncio.Task[AnalysisResult]]] = {}
+        # document_id -> (id of its result, improvement store generation) as of the last attach
+        self._improvements_attached: Dict[str, Tuple[int, int]] = {}
 
     async def register_document(self, upload_file: UploadFile) -> Document:
         document_id = str(uuid.uuid4())
         document = await self.repository.store_upload(document_id, upload_file)
         return document
 
-    async def analyze(self, document_id: str, contract_type: str = "general") -> AnalysisResult:
+    async def analyze(
+        self, document_id: str, contract_type: str = "general", tenant: Optional[str] = None
+    ) -> AnalysisResult:
         document = self.repository.get_document(document_id)
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         if not document.stored_path:
             raise HTTPException(status_code=400, detail="Document file missing on disk")
 
+        inflight = self._inflight.get(document_id)
+        if inflight and inflight[0] == contract_type and not inflight[1].done():
+            task = inflight[1]
+        else:
+            if inflight:
+                # A request with different options supersedes the running analysis
+                inflight[1].cancel()
+            task = asyncio.create_task(self._run_analysis(document, contract_type, flow=tenant or document_id))
+            self._inflight[document_id] = (contract_type, task)
+            task.add_done_callback(lambda done: self._forget(document_id, done))
+
+        try:
+            # Shield so one caller disconnecting does not abort the work other callers await
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                raise HTTPException(status_code=409, detail="Analysis was cancelled or superseded") from None
+            raise
+
+    def cancel(self, document_id: str) -> bool:
+        inflight = self._inflight.pop(document_id, None)
+        if not inflight or inflight[1].done():
+            return False
+        inflight[1].cancel()
+        self.repository.save_status(DocumentStatus(document_id=document_id, stage="cancelled", progress=0, message="분석 취소됨"))
+        return True
+
+    def _forget(self, document_id: str, task: asyncio.Task[AnalysisResult]) -> None:
+        inflight = self._inflight.get(document_id)
+        if inflight and inflight[1] is task:
+            del self._inflight[document_id]
+
+    async def _run_analysis(self, document: Document, contract_type: str, flow: str) -> AnalysisResult:
+        document_id = document.id
+        durations: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        def _lap(stage: str) -> None:
+            nonlocal started
+            now = time.perf_counter()
+            durations[stage] = round(now - started, 6)
+            record_span(f"stage.{stage}", started, now, document_id=document_id)
+            started = now
+
         self.repository.save_status(DocumentStatus(document_id=document_id, stage="extract", progress=10, message="문서 텍스트 추출 중"))
-        text = await self.ocr_service.extract_text(Path(document.stored_path), document.content_type)
-        self.repository.save_document_text(document.id, text)
+        with self.repository.local_upload(document) as upload_path:
+            text = await self.ocr_service.extract_text(upload_path, document.content_type)
+        # Clause offsets point into the normalized text, so that is the copy we keep. Normalizing is a
+        # few regex passes, cheaper than handing the text to any executor.
+        text = self.clause_extractor.normalize(text)
+        await self._io(self.repository.save_document_text, document.id, text)
+        _lap("extract")
 
         self.repository.save_status(DocumentStatus(document_id=document_id, stage="split", progress=30, message="조항 구조 파악 중"))
-        clauses = self.clause_extractor.build_clauses(text)
+        # Threads, not processes: pickling thousands of clauses back costs more than splitting them
+        clauses = await self._io(self.clause_extractor.build_clauses, text)
+        _lap("split")
         self.repository.save_status(DocumentStatus(document_id=document_id, stage="llm", progress=55, message="위험 패턴 스캔 중"))
-        clauses, risk_data = await self.llm_agent.annotate(clauses)
-
-        # Self-query for contract type if not provided
-        auto_type = await self.llm_agent.infer_contract_type(clauses) or contract_type
+        match = None
+        if self.template_matcher is not None:
+            # Thread rather than process pool: the template library lives in this process
+            with span("template.match", clauses=len(clauses)):
+                match = await self._io(self.template_matcher.match, clauses)
+        if match is None:
+            progress = self._scan_progress(document_id, len(clauses))
+            clauses, risk_data = await self.llm_agent.annotate(clauses, flow=flow, on_field=progress)
+            # Self-query for contract type if not provided
+            auto_type = await self.llm_agent.infer_contract_type(clauses, flow=flow) or contract_type
+        else:
+            # Filled-in copies of a registered form: only clauses that deviate go to the provider
+            deviating = match.deviating(clauses)
+            progress = self._scan_progress(document_id, len(deviating))
+            _, fresh = await self.llm_agent.annotate(deviating, flow=flow, on_field=progress)
+            risk_data = match.merge(clauses, fresh)
+            auto_type = match.template.contract_type
+            TEMPLATE_CLAUSES.inc(len(match.reused), outcome="reused")
+            TEMPLATE_CLAUSES.inc(len(deviating), outcome="analyzed")
         chosen_type = contract_type if contract_type != "general" else (auto_type or "general")
+        _lap("llm")
 
         self.repository.save_status(DocumentStatus(document_id=document_id, stage="risk", progress=75, message="법적 관점에서 문제 조항 평가 중"))
-        result = self.risk_analyzer.analyze(document.id, clauses, risk_data, contract_type=chosen_type)
+        result = await self._io(self.risk_analyzer.analyze, document.id, clauses, risk_data, contract_type=chosen_type)
         result.auto_contract_type = auto_type
+        if match is not None:
+            result.template_id = match.template.id
+            result.template_clauses_reused = len(match.reused)
+        await self._io(self.llm_agent.attach_stored_improvements, result.clauses)
+        _lap("risk")
+
+        result.stage_durations = durations
+        labels = {**provider_labels(self.llm_agent.provider), "contract_type": chosen_type}
+        for stage, seconds in durations.items():
+            STAGE_DURATION.observe(seconds, stage=stage, **labels)
 
-        self.repository.save_analysis_result(result)
+        # Listeners (search, analytics) index every clause, so keep that off the loop too
+        await self._io(self.repository.save_analysis_result, result)
         self.repository.save_status(DocumentStatus(document_id=document_id, stage="done", progress=100, message="분석 완료"))
         return result
 
+    def _scan_progress(self, document_id: str, total: int) -> ClauseFieldCallback:
+        """Status updates as clause scores stream in, ahead of the rest of each answer."""
+        scored = high = 0
+
+        def on_field(clause: Clause, name: str, value: Any) -> None:
+            nonlocal scored, high
+            if name != "risk_score" or total == 0:
+                return
+            scored += 1
+            if isinstance(value, int) and value >= 75:
+                high += 1
+            self.repository.save_status(
+                DocumentStatus(
+                    document_id=document_id,
+                    stage="llm",
+                    progress=55 + 20 * scored // total,
+                    message=f"위험 패턴 스캔 중 ({scored}/{total}, 고위험 {high})",
+                )
+            )
+
+        return on_field
+
+    async def register_template(
+        self, upload_file: UploadFile, name: str, contract_type: Optional[str] = None
+    ) -> ContractTemplate:
+        """Analyze a standard form once and store it for matching; it is not kept as a document."""
+        if self.template_matcher is None:
+            raise HTTPException(status_code=400, detail="Template matching is not enabled")
+        data = await upload_file.read()
+        suffix = Path(upload_file.filename or "").suffix
+        with tempfile.TemporaryDirectory(prefix="cg-template-") as tmp_dir:
+            path = Path(tmp_dir) / f"template{suffix}"
+            await self._io(path.write_bytes, data)
+            text = await self.ocr_service.extract_text(path, upload_file.content_type)
+        text = self.clause_extractor.normalize(text)
+        clauses = await self._io(self.clause_extractor.build_clauses, text)
+        if not clauses:
+            raise HTTPException(status_code=400, detail="No clauses found in template")
+        flow = f"template:{name}"
+        clauses, risk_data = await self.llm_agent.annotate(clauses, flow=flow, priority="bulk")
+        failed = sum(1 for hint in risk_data if is_fallback(hint))
+        if failed:
+            # Matched documents reuse this analysis as is, so it must not hold placeholders
+            raise HTTPException(
+                status_code=503,
+                detail=f"LLM unavailable for {failed} of {len(clauses)} template clauses; template not registered, retry later",
+            )
+        if not contract_type:
+            contract_type = await self.llm_agent.infer_contract_type(clauses, flow=flow, priority="bulk") or "general"
+        template = build_template(name, contract_type, clauses, risk_data, filename=upload_file.filename)
+        await self._io(self.template_matcher.store.add, template)
+        return template
+
+    async def _io(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.executors is None:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        return await self.executors.run_thread(fn, *args, **kwargs)
+
+    async def improve_clauses(
+        self, document_id: str, min_score: int = 50, max_calls: int = 20, concurrency: int = 4
+    ) -> Optional[dict]:
+        result = self.repository.get_analysis_result(document_id)
+        if not result:
+            return None
+        stats = await self.llm_agent.suggest_improvements(
+            result.clauses,
+            min_score=min_score,
+            max_calls=max_calls,
+            concurrency=concurrency,
+            flow=document_id,
+            document_id=document_id,
+        )
+        # Re-save so cached JSON, indexes and reports pick up the suggestions
+        await self._io(self.repository.save_analysis_result, result)
+        return stats
+
+    async def refresh_improvements(self, document_id: str) -> None:
+        """Attach suggestions stored since the result was saved here, possibly by another process.
+
+        Improvements run on whichever API process took the request; siblings serving /result or
+        /report for the same document pick them up here.
+        """
+        result = self.repository.get_analysis_result(document_id)
+        if result is None:
+            return
+        store = self.llm_agent.improvement_store
+        await self._io(store.reload_if_changed)
+        stamp = (id(result), store.generation)
+        if self._improvements_attached.get(document_id) == stamp:
+            return
+        before = [clause.improvement for clause in result.clauses]
+        await self._io(self.llm_agent.attach_stored_improvements, result.clauses)
+        self._improvements_attached[document_id] = stamp
+        if any(clause.improvement != old for clause, old in zip(result.clauses, before)):
+            # Re-save so the cached JSON and reports pick up the suggestions
+            await self._io(self.repository.save_analysis_result, result)
+
+    async def improve_clause(self, document_id: str, clause_id: str, clause_text: str) -> ClauseImprovement:
+        improvement = await self.llm_agent.suggest_improvement(clause_text, flow=document_id, document_id=document_id)
+        result = self.repository.get_analysis_result(document_id)
+        clause = next((c for c in result.clauses if c.id == clause_id), None) if result else None
+        if clause is not None and clause.raw_text.strip() == clause_text.strip():
+            clause.improvement = improvement
+            await self._io(self.repository.save_analysis_result, result)
+        return improvement
+
     async def get_result(self, document_id: str) -> Optional[AnalysisResult]:
         return self.repository.get_analysis_result(document_id)
+
+    async def get_result_page(
+        self,
+        document_id: str,
+        sort: str = "risk_desc",
+        min_level: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 50,
+        fields: Optional[str] = None,
+    ) -> Optional[ClausePage]:
+        result = self.repository.get_analysis_result(document_id)
+        if not result:
+            return None
+        risk_index = self.repository.get_risk_index(document_id) or []
+        try:
+            return query_clauses(
+                result,
+                risk_index,
+                sort=sort,
+                min_level=min_level,
+                page=page,
+                page_size=page_size,
+                fields=parse_fields(fields),
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    async def get_result_summary(self, document_id: str) -> Optional[ResultSummary]:
+        result = self.repository.get_analysis_result(document_id)
+        if not result:
+            return None
+        return summarize_result(result)
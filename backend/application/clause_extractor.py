@@ -1,35 +1,120 @@
 from __future__ import annotations
 
 import re
-from typing import List
+from typing import List, Optional, Tuple
 
-from backend.domain.models import Clause
+from backend.domain.models import Clause, ClauseSpan
+
+# One precompiled pass finds every structural marker: 조 headings (anywhere, as before),
+# circled 항 numbers, line-leading 호 numbers and blank-line paragraph breaks. The leading
+# lookahead lets the engine skip straight to candidate characters; a 호 on the very first
+# line has no newline before it and is checked separately.
+_MARKERS = re.compile(
+    r"(?=[제①-⑳\n])(?:"
+    r"(?P<jo>제\s*(?P<jo_no>\d+)\s*조)"
+    r"|(?P<hang>[①-⑳])"
+    r"|\n(?P<blank>\s*\n)?(?:[ \t]*(?P<ho>\d{1,2})\.(?=[ \t]))?"
+    r")"
+)
+_LEADING_HO = re.compile(r"[ \t]*(\d{1,2})\.(?=[ \t])")
+
+_Marker = Tuple[str, Optional[int], int]
 
 
 class ClauseExtractor:
     """Heuristic clause splitter for Korean contract text."""
 
-    def split_into_clauses(self, text: str) -> List[str]:
-        normalized = text.replace("\r\n", "\n").replace("\r", "\n")
-        heading_pattern = r"(?=제\s*\d+\s*조)"
+    @staticmethod
+    def normalize(text: str) -> str:
+        return text.replace("\r\n", "\n").replace("\r", "\n")
 
-        if re.search(heading_pattern, normalized):
-            chunks = re.split(heading_pattern, normalized)
-            clauses = [f"{match}{body}".strip() for match, body in zip(re.findall(heading_pattern, normalized), chunks[1:])]
+    def split_spans(self, text: str) -> List[ClauseSpan]:
+        """Return 조-level spans (with nested 항/호) as offsets into normalized `text`."""
+        headings: List[Tuple[int, int]] = []
+        sections: List[_Marker] = []
+        breaks: List[Tuple[int, int]] = []
+        leading = _LEADING_HO.match(text)
+        if leading is not None:
+            sections.append(("호", int(leading.group(1)), leading.start(1)))
+        for match in _MARKERS.finditer(text):
+            kind = match.lastgroup
+            if kind == "jo":
+                headings.append((match.start(), int(match.group("jo_no"))))
+            elif kind == "hang":
+                sections.append(("항", ord(match.group("hang")) - 0x2460 + 1, match.start()))
+            else:
+                blank = match.start("blank")
+                if blank >= 0:
+                    breaks.append((match.start(), match.end("blank")))
+                if kind == "ho":
+                    sections.append(("호", int(match.group("ho")), match.start("ho")))
+
+        bounds: List[Tuple[int, int, Optional[int]]] = []
+        if headings:
+            # Text before the first heading (title, parties) is not a clause
+            for idx, (start, number) in enumerate(headings):
+                end = headings[idx + 1][0] if idx + 1 < len(headings) else len(text)
+                bounds.append((start, end, number))
         else:
-            clauses = [c.strip() for c in re.split(r"\n\s*\n", normalized) if c.strip()]
+            start = 0
+            for break_start, break_end in breaks:
+                bounds.append((start, break_start, None))
+                start = break_end
+            bounds.append((start, len(text), None))
+
+        spans: List[ClauseSpan] = []
+        cursor, count = 0, len(sections)
+        for start, end, number in bounds:
+            start, end = self._trim(text, start, end)
+            if start >= end:
+                continue
+            while cursor < count and sections[cursor][2] < start:
+                cursor += 1
+            clause = ClauseSpan("조", number, start, end)
+            # A section runs until the next 항 (or, for a 호, the next 호); open ones close at the 조's end
+            hang: Optional[ClauseSpan] = None
+            ho: Optional[ClauseSpan] = None
+            while cursor < count and sections[cursor][2] < end:
+                kind, section_no, position = sections[cursor]
+                cursor += 1
+                span = ClauseSpan(kind, section_no, position, end)
+                if ho is not None:
+                    ho.end = self._rstrip(text, ho.start, position)
+                    ho = None
+                if kind == "항":
+                    if hang is not None:
+                        hang.end = self._rstrip(text, hang.start, position)
+                    hang = span
+                    clause.add(span)
+                else:
+                    ho = span
+                    (hang if hang is not None else clause).add(span)
+            spans.append(clause)
+        return spans
 
-        merged: List[str] = []
-        for clause in clauses:
-            cleaned = re.sub(r"\s{2,}", " ", clause)
-            cleaned = cleaned.strip()
-            if cleaned:
-                merged.append(cleaned)
-        return merged
+    @staticmethod
+    def _rstrip(text: str, start: int, end: int) -> int:
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return end
+
+    @staticmethod
+    def _trim(text: str, start: int, end: int) -> Tuple[int, int]:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    def split_into_clauses(self, text: str) -> List[str]:
+        normalized = self.normalize(text)
+        return [clause.raw_text for clause in self._clauses_from_spans(normalized)]
 
     def build_clauses(self, text: str) -> List[Clause]:
-        clauses = []
-        for idx, raw in enumerate(self.split_into_clauses(text), start=1):
-            clause = Clause(id=f"clause-{idx}", raw_text=raw)
-            clauses.append(clause)
-        return clauses
+        return self._clauses_from_spans(self.normalize(text))
+
+    def _clauses_from_spans(self, normalized: str) -> List[Clause]:
+        return [
+            Clause.from_span(f"clause-{idx}", normalized, span)
+            for idx, span in enumerate(self.split_spans(normalized), start=1)
+        ]
@@ -1,53 +1,165 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import inspect
 import logging
-from typing import List, Tuple, Optional
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Optional, TypeVar
 
-from backend.domain.models import Clause
-from backend.infrastructure.llm.base import LLMProvider
+from backend.application.llm_scheduler import LLMScheduler, estimate_tokens
+from backend.domain.models import Clause, ClauseImprovement
+from backend.infrastructure.llm.base import LLMProvider, contract_type_sample
+from backend.infrastructure.metrics.prometheus import LLM_CALL_DURATION, LLM_CALLS, LLM_FALLBACKS, provider_labels
+from backend.infrastructure.metrics.tracing import record_span
+from backend.infrastructure.storage.improvement_store import ImprovementStore
+
+T = TypeVar("T")
+
+# Called with (clause, field, value) as a streaming provider completes each answer field
+ClauseFieldCallback = Callable[[Clause, str, Any], None]
+
+
+class ImprovementUnavailable(RuntimeError):
+    """The provider could not suggest a rewrite (it returned the clause unchanged)."""
+
+
+# Start of the risk hint `annotate` returns for a clause the provider failed on
+FALLBACK_HINT = "LLM unavailable"
+
+
+def is_fallback(risk_hint: dict) -> bool:
+    """True for a risk hint from `annotate`'s fail-soft defaults rather than the provider."""
+    return str(risk_hint.get("risk_reason") or "").startswith(f"{FALLBACK_HINT}:")
+
+
+def _is_unchanged(clause_text: str, suggestion: dict) -> bool:
+    text = (suggestion.get("suggestion") or "").strip()
+    return (not text or text == clause_text.strip()) and not suggestion.get("rationale")
 
 
 class LLMAgent:
     """Orchestrates LLM calls for clause-level analysis."""
 
-    def __init__(self, provider: LLMProvider) -> None:
+    def __init__(
+        self,
+        provider: LLMProvider,
+        improvement_store: Optional[ImprovementStore] = None,
+        scheduler: Optional[LLMScheduler] = None,
+    ) -> None:
         self.provider = provider
+        self.improvement_store = improvement_store or ImprovementStore()
+        self.scheduler = scheduler
+        self.metric_labels = provider_labels(provider)
+        # Providers written before field callbacks existed still work, just without early fields
+        self.reports_fields = "on_field" in inspect.signature(provider.analyze_clause).parameters
         self.logger = logging.getLogger(__name__)
 
-    async def annotate(self, clauses: List[Clause]) -> Tuple[List[Clause], List[dict]]:
-        risk_data: List[dict] = []
-        for clause in clauses:
-            try:
-                if hasattr(self.provider, "analyze_clause"):
-                    result = await self.provider.analyze_clause(clause.raw_text)
-                    clause.summary = result.get("summary") or clause.summary
-                    clause.category = result.get("category") or clause.category
-                    clause.reasoning = result.get("reasoning") or clause.reasoning
-                    risk_data.append(
-                        {
-                            "risk_reason": result.get("risk_reason") or "",
-                            "risk_score": result.get("risk_score"),
-                            "risk_level": result.get("risk_level"),
-                        }
-                    )
-                    continue
-                clause.summary = await self.provider.summarize_clause(clause.raw_text)
-                clause.category = await self.provider.classify_clause(clause.raw_text)
-                hint = await self.provider.analyze_risk(clause.raw_text)
-            except Exception as exc:  # noqa: BLE001
-                # Fail soft: keep pipeline running with graceful defaults
-                self.logger.warning("LLM provider failed, using fallback summary: %s", exc)
-                clause.summary = clause.summary or "[LLM error] 요약 불가"
-                clause.category = clause.category or "general"
-                clause.reasoning = clause.reasoning or "LLM unavailable"
-                hint = f"LLM unavailable: {exc}"
-            risk_data.append({"risk_reason": hint, "risk_score": None, "risk_level": None})
+    async def _call(
+        self,
+        method: Callable[[Any], Awaitable[T]],
+        payload: Any,
+        text: str,
+        flow: Optional[str],
+        priority: str,
+        **kwargs: Any,
+    ) -> T:
+        """Invoke a provider method, through the shared scheduler when one is configured."""
+        queued = time.perf_counter()
+        if self.scheduler is None:
+            return await self._timed(method, payload, text, queued, kwargs)
+        return await self.scheduler.submit(
+            lambda: self._timed(method, payload, text, queued, kwargs),
+            flow=flow or "default",
+            priority=priority,
+            tokens=estimate_tokens(text),
+        )
+
+    async def _timed(
+        self, method: Callable[..., Awaitable[T]], payload: Any, text: str, queued: float, kwargs: Dict[str, Any]
+    ) -> T:
+        # Measured inside the scheduler slot so queueing time is not counted as provider latency
+        labels = {**self.metric_labels, "method": getattr(method, "__name__", "call")}
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await method(payload, **kwargs)
+            outcome = "ok"
+            return result
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            ended = time.perf_counter()
+            LLM_CALL_DURATION.observe(ended - started, **labels)
+            LLM_CALLS.inc(outcome=outcome, **labels)
+            record_span(
+                f"llm.{labels['method']}",
+                started,
+                ended,
+                prompt_tokens=estimate_tokens(text, completion_tokens=0),
+                queued_ms=round((started - queued) * 1000, 3),
+                outcome=outcome,
+            )
+
+    async def annotate(
+        self,
+        clauses: List[Clause],
+        flow: Optional[str] = None,
+        priority: str = "interactive",
+        on_field: Optional[ClauseFieldCallback] = None,
+    ) -> Tuple[List[Clause], List[dict]]:
+        """Annotate clauses in place and return their risk hints.
+
+        `on_field` sees each answer field as it arrives, before the clause's call has finished.
+        """
+        if self.scheduler is None:
+            risk_data = [await self._annotate_one(clause, flow, priority, on_field) for clause in clauses]
+        else:
+            # The scheduler bounds concurrency and interleaves documents fairly
+            risk_data = list(
+                await asyncio.gather(*(self._annotate_one(c, flow, priority, on_field) for c in clauses))
+            )
         return clauses, risk_data
 
-    async def infer_contract_type(self, clauses: List[Clause]) -> Optional[str]:
+    async def _annotate_one(
+        self, clause: Clause, flow: Optional[str], priority: str, on_field: Optional[ClauseFieldCallback] = None
+    ) -> dict:
+        text = clause.raw_text
+        try:
+            if hasattr(self.provider, "analyze_clause"):
+                # Passed explicitly: scheduler tasks do not inherit the caller's context
+                extra = {"on_field": functools.partial(on_field, clause)} if on_field and self.reports_fields else {}
+                result = await self._call(self.provider.analyze_clause, text, text, flow, priority, **extra)
+                clause.summary = result.get("summary") or clause.summary
+                clause.category = result.get("category") or clause.category
+                clause.reasoning = result.get("reasoning") or clause.reasoning
+                return {
+                    "risk_reason": result.get("risk_reason") or "",
+                    "risk_score": result.get("risk_score"),
+                    "risk_level": result.get("risk_level"),
+                }
+            clause.summary = await self._call(self.provider.summarize_clause, text, text, flow, priority)
+            clause.category = await self._call(self.provider.classify_clause, text, text, flow, priority)
+            hint = await self._call(self.provider.analyze_risk, text, text, flow, priority)
+        except Exception as exc:  # noqa: BLE001
+            # Fail soft: keep pipeline running with graceful defaults
+            self.logger.warning("LLM provider failed, using fallback summary: %s", exc)
+            LLM_FALLBACKS.inc(**self.metric_labels)
+            clause.summary = clause.summary or "[LLM error] 요약 불가"
+            clause.category = clause.category or "general"
+            clause.reasoning = clause.reasoning or FALLBACK_HINT
+            hint = f"{FALLBACK_HINT}: {exc}"
+        return {"risk_reason": hint, "risk_score": None, "risk_level": None}
+
+    async def infer_contract_type(
+        self, clauses: List[Clause], flow: Optional[str] = None, priority: str = "interactive"
+    ) -> Optional[str]:
         try:
             if hasattr(self.provider, "infer_contract_type"):
-                return await self.provider.infer_contract_type(clauses)
+                # Providers prompt with a bounded sample, so that is what the scheduler is charged
+                text = contract_type_sample(clauses)
+                return await self._call(self.provider.infer_contract_type, clauses, text, flow, priority)
         except Exception as exc:  # noqa: BLE001
             self.logger.warning("LLM contract type inference failed: %s", exc)
         # Heuristic fallback
@@ -58,3 +170,93 @@ class LLMAgent:
         if any(cat in {"lease"} for cat in categories) or "보증금" in text:
             return "lease"
         return None
+
+    async def suggest_improvement(
+        self,
+        clause_text: str,
+        flow: Optional[str] = None,
+        priority: str = "interactive",
+        document_id: Optional[str] = None,
+    ) -> ClauseImprovement:
+        """Return the stored suggestion for this clause text, asking the provider only on a miss.
+
+        Raises ImprovementUnavailable when the provider hands the clause back unchanged, which is
+        how providers report their own errors; such an answer is never stored.
+        """
+        self.improvement_store.reload_if_changed()
+        cached = self._stored(clause_text)
+        if cached is not None:
+            return ClauseImprovement(**cached)
+        raw = await self._call(self.provider.suggest_improvement, clause_text, clause_text, flow, priority)
+        improvement = ClauseImprovement(
+            suggestion=raw.get("suggestion") or clause_text,
+            rationale=raw.get("rationale") or "",
+            risk_delta=int(raw.get("risk_delta") or 0),
+        )
+        if _is_unchanged(clause_text, improvement.model_dump()):
+            LLM_FALLBACKS.inc(**self.metric_labels)
+            raise ImprovementUnavailable("LLM returned no suggestion")
+        self.improvement_store.put(clause_text, improvement.model_dump(), document_id=document_id)
+        return improvement
+
+    def _stored(self, clause_text: str) -> Optional[dict]:
+        cached = self.improvement_store.get(clause_text)
+        # Journals written before failures were detected may still hold no-op answers
+        return None if cached is None or _is_unchanged(clause_text, cached) else cached
+
+    def attach_stored_improvements(self, clauses: List[Clause]) -> int:
+        # Another process (a pre-fork sibling, a replica) may have stored suggestions since
+        self.improvement_store.reload_if_changed()
+        attached = 0
+        for clause in clauses:
+            cached = self._stored(clause.raw_text)
+            if cached is not None:
+                clause.improvement = ClauseImprovement(**cached)
+                attached += 1
+        return attached
+
+    async def suggest_improvements(
+        self,
+        clauses: List[Clause],
+        min_score: int = 50,
+        max_calls: int = 20,
+        concurrency: int = 4,
+        flow: Optional[str] = None,
+        document_id: Optional[str] = None,
+    ) -> dict:
+        """Attach suggestions to every clause scoring at least `min_score`.
+
+        Stored suggestions are reused for free; at most `max_calls` clauses go to the provider,
+        riskiest first, with `concurrency` requests in flight.
+        """
+        targets = sorted(
+            (c for c in clauses if c.risk and c.risk.score >= min_score),
+            key=lambda c: c.risk.score,
+            reverse=True,
+        )
+        reused = self.attach_stored_improvements(targets)
+        pending = [clause for clause in targets if clause.improvement is None]
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        failed = 0
+
+        async def _improve(clause: Clause) -> None:
+            nonlocal failed
+            async with semaphore:
+                try:
+                    clause.improvement = await self.suggest_improvement(
+                        clause.raw_text, flow=flow, priority="bulk", document_id=document_id
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    failed += 1
+                    self.logger.warning("Improvement suggestion failed for %s: %s", clause.id, exc)
+
+        budgeted = pending[: max(0, max_calls)]
+        await asyncio.gather(*(_improve(clause) for clause in budgeted))
+        return {
+            "eligible": len(targets),
+            "reused": reused,
+            "generated": len(budgeted) - failed,
+            "failed": failed,
+            "skipped": len(pending) - len(budgeted),
+        }
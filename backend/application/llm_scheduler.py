@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+PRIORITIES = ("interactive", "bulk")
+
+
+def estimate_tokens(text: str, completion_tokens: int = 200) -> int:
+    """Rough prompt+completion estimate; Korean text is close to one token per character."""
+    return len(text) + completion_tokens
+
+
+class TokenBucket:
+    """Continuous-refill bucket; a capacity of 0 disables the limit."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        self._refill()
+        # Requests larger than the whole bucket go through once it is full
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        if self.capacity > 0:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+
+
+@dataclass(order=True)
+class _Entry:
+    finish_tag: float
+    seq: int
+    start_tag: float = field(compare=False)
+    flow: str = field(compare=False)
+    priority: str = field(compare=False)
+    tokens: int = field(compare=False)
+    call: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued: float = field(compare=False)
+    task: Optional[asyncio.Task] = field(default=None, compare=False)
+
+
+class LLMScheduler:
+    """Process-wide gate between `LLMAgent` and the provider.
+
+    Requests are grouped into flows (a tenant or a document) and served by self-clocked weighted
+    fair queuing, so a 300-clause contract cannot monopolize the provider. Interactive requests
+    are served before bulk ones unless a bulk request has waited longer than `bulk_max_wait_s`.
+    Dispatch respects the provider's requests-per-minute and tokens-per-minute budgets.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        rpm: int = 0,
+        tpm: int = 0,
+        bulk_max_wait_s: float = 30.0,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.bulk_max_wait_s = bulk_max_wait_s
+        self.queues: Dict[str, List[_Entry]] = {priority: [] for priority in PRIORITIES}
+        self.last_finish: Dict[str, float] = {}
+        self.virtual_time = 0.0
+        self.running = 0
+        self.completed = 0
+        self.wait_seconds_total = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=1000)
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def submit(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        flow: str,
+        priority: str = "interactive",
+        tokens: int = 1,
+        weight: float = 1.0,
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        self._ensure_dispatcher(loop)
+        priority = priority if priority in PRIORITIES else "bulk"
+        if len(self.last_finish) > 10_000:
+            # Flows whose last tag is behind virtual time restart from it anyway
+            self.last_finish = {f: tag for f, tag in self.last_finish.items() if tag > self.virtual_time}
+        start_tag = max(self.virtual_time, self.last_finish.get(flow, 0.0))
+        finish_tag = start_tag + tokens / max(weight, 1e-6)
+        self.last_finish[flow] = finish_tag
+        entry = _Entry(
+            finish_tag, next(self._seq), start_tag, flow, priority, tokens, call, loop.create_future(), time.monotonic()
+        )
+        heapq.heappush(self.queues[priority], entry)
+        self._wake()
+        try:
+            return await entry.future
+        except asyncio.CancelledError:
+            if entry.task is not None:
+                entry.task.cancel()
+            raise
+
+    def _ensure_dispatcher(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._loop is not loop or self._dispatcher is None or self._dispatcher.done():
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next_queue(self) -> Optional[List[_Entry]]:
+        interactive, bulk = self.queues["interactive"], self.queues["bulk"]
+        if bulk and (not interactive or time.monotonic() - bulk[0].enqueued > self.bulk_max_wait_s):
+            return bulk
+        return interactive or None
+
+    async def _dispatch(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self.running < self.max_concurrency:
+                queue = self._next_queue()
+                if queue is None:
+                    break
+                head = queue[0]
+                if head.future.done():
+                    heapq.heappop(queue)
+                    continue
+                delay = max(self.requests.delay_for(1), self.tokens.delay_for(head.tokens))
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                entry = heapq.heappop(queue)
+                self.requests.consume(1)
+                self.tokens.consume(entry.tokens)
+                self.virtual_time = max(self.virtual_time, entry.start_tag)
+                self.running += 1
+                entry.task = asyncio.get_running_loop().create_task(self._execute(entry))
+
+    async def _execute(self, entry: _Entry) -> None:
+        waited = time.monotonic() - entry.enqueued
+        self.wait_seconds_total += waited
+        self.recent_waits.append(waited)
+        try:
+            result = await entry.call()
+        except asyncio.CancelledError:
+            if not entry.future.done():
+                entry.future.cancel()
+        except Exception as exc:  # noqa: BLE001
+            if not entry.future.done():
+                entry.future.set_exception(exc)
+        else:
+            if not entry.future.done():
+                entry.future.set_result(result)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._wake()
+
+    def snapshot(self) -> dict:
+        waits = sorted(self.recent_waits)
+        return {
+            "queue_depth": {priority: len(queue) for priority, queue in self.queues.items()},
+            "running": self.running,
+            "completed": self.completed,
+            "flows": len({entry.flow for queue in self.queues.values() for entry in queue}),
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "wait_p50_s": round(waits[len(waits) // 2], 3) if waits else 0.0,
+            "wait_p95_s": round(waits[max(0, int(len(waits) * 0.95) - 1)], 3) if waits else 0.0,
+        }
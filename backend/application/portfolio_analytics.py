@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.domain.models import AnalysisResult
+from backend.domain.risk_columns import RISK_LEVELS
+
+GROUP_BY_OPTIONS = ("category", "level", "contract_type")
+
+
+class _Dictionary:
+    """Dictionary-encodes repeated strings (categories, contract types, document ids) as ints."""
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class PortfolioAnalytics:
+    """Columnar clause-risk store across all saved results, queried with vectorized NumPy ops.
+
+    Rows are appended when a result is saved; re-saving or deleting a document tombstones its
+    previous rows, and the arrays are compacted once more than half of them are dead.
+    """
+
+    _COLUMNS: Tuple[Tuple[str, type], ...] = (
+        ("score", np.uint8),
+        ("level", np.uint8),
+        ("category", np.uint16),
+        ("contract_type", np.uint16),
+        ("document", np.uint32),
+        ("position", np.uint32),
+        ("created_at", np.int64),
+        ("alive", np.bool_),
+    )
+
+    def __init__(self, initial_capacity: int = 1024) -> None:
+        self.size = 0
+        self.dead = 0
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.zeros(initial_capacity, dtype=dtype) for name, dtype in self._COLUMNS
+        }
+        self.categories = _Dictionary()
+        self.contract_types = _Dictionary()
+        self.documents = _Dictionary()
+        # document code -> (first row, row count) of its live rows
+        self.rows_by_document: Dict[int, Tuple[int, int]] = {}
+        # Results are saved from worker threads while queries run on the event loop
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.size - self.dead
+
+    def _reserve(self, extra: int) -> None:
+        capacity = len(self.columns["score"])
+        if self.size + extra <= capacity:
+            return
+        new_capacity = max(capacity * 2, self.size + extra)
+        for name, column in self.columns.items():
+            grown = np.zeros(new_capacity, dtype=column.dtype)
+            grown[: self.size] = column[: self.size]
+            self.columns[name] = grown
+
+    def on_result_saved(self, result: AnalysisResult) -> None:
+        with self._lock:
+            document = self.documents.encode(result.document_id)
+            self._kill(document)
+
+            count = len(result.clauses)
+            self._reserve(count)
+            start = self.size
+            stop = start + count
+            level_codes = {level: code for code, level in enumerate(RISK_LEVELS)}
+            cols = self.columns
+            cols["score"][start:stop] = [clause.risk.score for clause in result.clauses]
+            cols["level"][start:stop] = [level_codes.get(clause.risk.level, 0) for clause in result.clauses]
+            cols["category"][start:stop] = [self.categories.encode(clause.category or "general") for clause in result.clauses]
+            cols["contract_type"][start:stop] = self.contract_types.encode(result.contract_type or "general")
+            cols["document"][start:stop] = document
+            cols["position"][start:stop] = np.arange(count, dtype=np.uint32)
+            cols["created_at"][start:stop] = int(_as_utc(result.created_at).timestamp())
+            cols["alive"][start:stop] = True
+            self.size = stop
+            self.rows_by_document[document] = (start, count)
+
+            if self.dead > self.size // 2:
+                self._compact()
+
+    def on_result_removed(self, document_id: str) -> None:
+        with self._lock:
+            document = self.documents.codes.get(document_id)
+            if document is None or not self._kill(document):
+                return
+            if self.dead > self.size // 2:
+                self._compact()
+
+    def _kill(self, document: int) -> bool:
+        """Tombstone a document's live rows; False if it has none."""
+        previous = self.rows_by_document.pop(document, None)
+        if previous is None:
+            return False
+        start, count = previous
+        self.columns["alive"][start : start + count] = False
+        self.dead += count
+        return True
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self.columns["alive"][: self.size])
+        for name, column in self.columns.items():
+            column[: len(keep)] = column[keep]
+        self.size = len(keep)
+        self.dead = 0
+        documents = self.columns["document"][: self.size]
+        self.rows_by_document = {}
+        if self.size:
+            # Rows of one document stay contiguous, so each run boundary starts a document
+            boundaries = np.flatnonzero(np.diff(documents)) + 1
+            starts = np.concatenate(([0], boundaries))
+            stops = np.concatenate((boundaries, [self.size]))
+            for start, stop in zip(starts.tolist(), stops.tolist()):
+                self.rows_by_document[int(documents[start])] = (start, stop - start)
+
+    def _mask(
+        self,
+        contract_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_level: Optional[str] = None,
+    ) -> np.ndarray:
+        cols = self.columns
+        mask = cols["alive"][: self.size].copy()
+        if contract_type is not None:
+            code = self.contract_types.codes.get(contract_type)
+            if code is None:
+                return np.zeros(self.size, dtype=np.bool_)
+            mask &= cols["contract_type"][: self.size] == code
+        if since is not None:
+            mask &= cols["created_at"][: self.size] >= int(_as_utc(since).timestamp())
+        if until is not None:
+            mask &= cols["created_at"][: self.size] < int(_as_utc(until).timestamp())
+        if min_level is not None:
+            mask &= cols["level"][: self.size] >= RISK_LEVELS.index(min_level)
+        return mask
+
+    def aggregate(self, group_by: str = "category", **filters) -> List[dict]:
+        with self._lock:
+            if group_by not in GROUP_BY_OPTIONS:
+                raise ValueError(f"Unsupported group_by: {group_by}")
+            mask = self._mask(**filters)
+            keys = self.columns[group_by][: self.size][mask].astype(np.int64)
+            scores = self.columns["score"][: self.size][mask].astype(np.float64)
+            labels = {"category": self.categories.values, "contract_type": self.contract_types.values}.get(
+                group_by, list(RISK_LEVELS)
+            )
+            counts = np.bincount(keys, minlength=len(labels))
+            totals = np.bincount(keys, weights=scores, minlength=len(labels))
+            groups = []
+            for code in np.flatnonzero(counts).tolist():
+                groups.append(
+                    {"key": labels[code], "count": int(counts[code]), "mean_score": round(float(totals[code] / counts[code]), 2)}
+                )
+            return sorted(groups, key=lambda group: group["count"], reverse=True)
+
+    def histogram(self, bins: int = 10, **filters) -> dict:
+        with self._lock:
+            mask = self._mask(**filters)
+            counts, edges = np.histogram(self.columns["score"][: self.size][mask], bins=bins, range=(0, 100))
+            return {"edges": edges.tolist(), "counts": counts.tolist(), "total": int(counts.sum())}
+
+    def top_k(self, k: int = 100, **filters) -> List[dict]:
+        with self._lock:
+            rows = np.flatnonzero(self._mask(**filters))
+            if rows.size == 0:
+                return []
+            scores = self.columns["score"][rows]
+            if rows.size > k:
+                # O(n) selection first, then sort only the k survivors
+                picked = np.argpartition(-scores.astype(np.int16), k - 1)[:k]
+                rows, scores = rows[picked], scores[picked]
+            rows = rows[np.argsort(-scores.astype(np.int16), kind="stable")]
+            cols = self.columns
+            return [
+                {
+                    "document_id": self.documents.values[int(cols["document"][row])],
+                    "position": int(cols["position"][row]),
+                    "score": int(cols["score"][row]),
+                    "level": RISK_LEVELS[int(cols["level"][row])],
+                    "category": self.categories.values[int(cols["category"][row])],
+                    "contract_type": self.contract_types.values[int(cols["contract_type"][row])],
+                    "created_at": datetime.fromtimestamp(int(cols["created_at"][row]), tz=timezone.utc).isoformat(),
+                }
+                for row in rows.tolist()
+            ]
+
+def _as_utc(value: datetime) -> datetime:
+    # AnalysisResult.created_at is a naive UTC timestamp
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
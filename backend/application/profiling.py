@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from backend.infrastructure.metrics.tracing import Trace, activate
+from backend.infrastructure.storage.profile_store import ProfileStore
+
+TOP_FUNCTIONS = 40
+CPROFILE_SCOPE = (
+    "event-loop thread for the duration of the request: includes coroutines of other requests that "
+    "ran meanwhile; excludes stages run in thread and process executors (text extraction, clause "
+    "splitting, risk scoring, report rendering), which appear only in spans"
+)
+
+
+def _top_functions(profiler: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> List[dict]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    rows = []
+    for func in stats.fcn_list[:limit]:  # type: ignore[attr-defined]
+        primitive_calls, total_calls, tottime, cumtime, _ = stats.stats[func]  # type: ignore[attr-defined]
+        filename, line, name = func
+        rows.append(
+            {
+                "function": f"{filename}:{line}({name})",
+                "ncalls": total_calls,
+                "primitive_calls": primitive_calls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            }
+        )
+    return rows
+
+
+class RequestProfiler:
+    """Captures a cProfile profile and a span timeline for individual opted-in requests.
+
+    cProfile hooks the event-loop thread, so only one capture profiles at a time; a concurrent
+    capture still records its span timeline. The profile is not limited to this request: other
+    coroutines scheduled meanwhile are counted too, while work in executor threads and processes
+    appears only as spans. Each saved profile says so in ``cprofile_scope``.
+    """
+
+    def __init__(self, store: ProfileStore) -> None:
+        self.store = store
+        self._cprofile_lock = threading.Lock()
+
+    @asynccontextmanager
+    async def capture(self, document_id: str, endpoint: str) -> AsyncIterator[Trace]:
+        trace = Trace()
+        profiler: Optional[cProfile.Profile] = None
+        if self._cprofile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            with activate(trace):
+                yield trace
+        except BaseException as exc:
+            error = repr(exc)
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._cprofile_lock.release()
+            self.store.save(
+                document_id,
+                {
+                    "id": f"{started_at:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}",
+                    "document_id": document_id,
+                    "endpoint": endpoint,
+                    "started_at": started_at.isoformat(),
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    "error": error,
+                    "spans": trace.timeline(),
+                    "cprofile": _top_functions(profiler) if profiler is not None else None,
+                    "cprofile_scope": CPROFILE_SCOPE if profiler is not None else None,
+                },
+            )
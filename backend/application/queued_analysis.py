@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from fastapi import HTTPException
+
+from backend.domain.models import AnalysisResult, DocumentStatus
+from backend.infrastructure.compute.executors import ExecutorPool
+from backend.infrastructure.queue.sqlite_queue import DELETED, FINISHED, Job, SQLiteWorkQueue
+from backend.infrastructure.storage.repository import InMemoryRepository
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+ANALYZE = "analyze"
+
+
+def job_key(document_id: str) -> str:
+    return f"{ANALYZE}:{document_id}"
+
+
+class AnalysisPending(Exception):
+    """The analysis outlasted the request's wait; it carries on in the queue as `job_id`."""
+
+    def __init__(self, document_id: str, job_id: str) -> None:
+        super().__init__(f"Analysis of {document_id} queued as job {job_id}")
+        self.document_id = document_id
+        self.job_id = job_id
+
+
+def _error_for(job: Job) -> Optional[HTTPException]:
+    if job.status == "failed":
+        return HTTPException(status_code=500, detail=f"Analysis failed: {job.error}")
+    if job.status == "cancelled" and job.error == DELETED:
+        return HTTPException(status_code=404, detail="Document not found")
+    if job.status == "cancelled":
+        return HTTPException(status_code=409, detail="Analysis was cancelled or superseded")
+    return None
+
+
+class QueuedAnalysis:
+    """Hands analyses to worker processes through the shared work queue.
+
+    Drop-in for `AnalysisFacade.analyze`/`cancel` on API nodes. A single collector task follows
+    the queue's change feed from where it stood when this process started, mirrors job progress
+    into the local status cache, imports finished results into the repository (so /result,
+    search and analytics work as before) and wakes the requests waiting on them. Jobs that
+    finished before the process started are not replayed; `load` imports one when its document
+    is first asked for.
+    """
+
+    def __init__(
+        self,
+        queue: SQLiteWorkQueue,
+        repository: InMemoryRepository,
+        executors: Optional[ExecutorPool] = None,
+        poll_interval_s: float = 0.5,
+        wait_timeout_s: float = 300.0,
+        retention_s: float = 7 * 86400,
+    ) -> None:
+        self.queue = queue
+        self.repository = repository
+        self.executors = executors
+        self.poll_interval_s = poll_interval_s
+        self.wait_timeout_s = wait_timeout_s
+        self.retention_s = retention_s
+        self._version = queue.current_version()
+        # The collector and on-demand catch-ups must not apply the same batch twice
+        self._poll_lock = asyncio.Lock()
+        self._waiters: Dict[str, List[asyncio.Future[AnalysisResult]]] = {}
+
+    async def analyze(
+        self, document_id: str, contract_type: str = "general", tenant: Optional[str] = None
+    ) -> AnalysisResult:
+        document = self.repository.get_document(document_id)
+        if not document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        if not document.stored_path:
+            raise HTTPException(status_code=400, detail="Document file missing on disk")
+
+        payload = {"document_id": document_id, "contract_type": contract_type, "tenant": tenant}
+        job, created = await self._io(self.queue.enqueue, ANALYZE, payload, job_key(document_id))
+        if created:
+            self.repository.save_status(DocumentStatus(document_id=document_id, stage="queued", progress=0, message="분석 대기 중"))
+
+        future: asyncio.Future[AnalysisResult] = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(job.id, []).append(future)
+        try:
+            current = await self._io(self.queue.get, job.id)
+            if current is not None and current.status in FINISHED and current.version <= self._version:
+                # Finished before this request started waiting; the feed will not report it again
+                await self._apply(current)
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.wait_timeout_s)
+        except asyncio.TimeoutError:
+            raise AnalysisPending(document_id, job.id) from None
+        finally:
+            waiters = self._waiters.get(job.id, [])
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters:
+                self._waiters.pop(job.id, None)
+
+    def cancel(self, document_id: str) -> bool:
+        if not self.queue.cancel(job_key(document_id)):
+            return False
+        self.repository.save_status(DocumentStatus(document_id=document_id, stage="cancelled", progress=0, message="분석 취소됨"))
+        return True
+
+    def on_result_removed(self, document_id: str) -> None:
+        """Repository removal listener: drop the result copies the queue keeps for the document."""
+        self.queue.forget(job_key(document_id))
+
+    # -- change feed ------------------------------------------------------
+
+    async def run(self) -> None:
+        """Follow the queue until cancelled; also purges old finished jobs about hourly."""
+        purged_at = time.monotonic()
+        while True:
+            try:
+                while await self.poll():
+                    pass
+                if self.retention_s > 0 and time.monotonic() - purged_at > 3600:
+                    purged_at = time.monotonic()
+                    logger.info("Purged %d finished queue jobs", await self._io(self.queue.purge, self.retention_s))
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Work queue poll failed: %s", exc)
+            await asyncio.sleep(self.poll_interval_s)
+
+    async def poll(self) -> int:
+        """Apply one batch of queue changes; returns how many jobs changed."""
+        async with self._poll_lock:
+            jobs = await self._io(self.queue.changes, self._version)
+            for job in jobs:
+                self._version = max(self._version, job.version)
+                if job.kind == ANALYZE:
+                    await self._apply(job)
+        return len(jobs)
+
+    async def catch_up(self) -> None:
+        """Apply every pending change now rather than on the collector's next tick.
+
+        For lookups that miss: the analysis may have finished moments ago on behalf of another
+        API process sharing the queue (a pre-fork sibling or a replica).
+        """
+        while await self.poll():
+            pass
+
+    async def load(self, document_id: str) -> None:
+        """Bring the document's status and result up to date before a lookup.
+
+        Applies pending changes, then, for a document this process knows nothing about, the
+        latest job for it, which may have finished before the process started.
+        """
+        await self.catch_up()
+        if (
+            self.repository.get_analysis_result(document_id) is None
+            and self.repository.get_status(document_id).stage == "idle"
+        ):
+            job = await self._io(self.queue.latest, job_key(document_id))
+            if job is not None:
+                await self._apply(job)
+
+    async def _apply(self, job: Job) -> None:
+        document_id = job.payload["document_id"]
+        waiters = self._waiters.get(job.id, [])
+        if job.status == "done":
+            result = await self._io(AnalysisResult.model_validate_json, job.result or "{}")
+            # Listeners (search, analytics) index every clause, so keep that off the loop too
+            await self._io(self.repository.save_analysis_result, result)
+            self.repository.save_status(DocumentStatus(document_id=document_id, stage="done", progress=100, message="분석 완료"))
+            self._settle(waiters, result=result)
+        elif job.status == "failed":
+            self.repository.save_status(
+                DocumentStatus(document_id=document_id, stage="failed", progress=0, message=job.error or "분석 실패")
+            )
+            self._settle(waiters, error=_error_for(job))
+        elif job.status == "cancelled" and job.error == DELETED:
+            # The document is gone; `prune_deleted` drops what this process still holds of it
+            self._settle(waiters, error=_error_for(job))
+        elif job.status == "cancelled":
+            # A superseding job changes the status again right after in the same feed
+            self.repository.save_status(DocumentStatus(document_id=document_id, stage="cancelled", progress=0, message="분석 취소됨"))
+            self._settle(waiters, error=_error_for(job))
+        else:
+            stage, message = job.stage or "queued", job.message or "분석 대기 중"
+            self.repository.save_status(
+                DocumentStatus(document_id=document_id, stage=stage, progress=job.progress, message=message)
+            )
+
+    @staticmethod
+    def _settle(
+        waiters: List[asyncio.Future[AnalysisResult]],
+        result: Optional[AnalysisResult] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        for future in waiters:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def _io(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.executors is None:
+            return await asyncio.to_thread(fn, *args)
+        return await self.executors.run_thread(fn, *args)
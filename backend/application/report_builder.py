@@ -35,6 +35,15 @@ def render_report_md(result: AnalysisResult) -> str:
         score = clause.risk.score if clause.risk else 0
         lines.append(f"| {idx} | {level} | {category} | {summary} | {score} | {explanation} |")
     lines.append("")
+    improved = [(idx, clause) for idx, clause in enumerate(result.clauses, start=1) if clause.improvement]
+    if improved:
+        lines.append("## 수정 제안")
+        for idx, clause in improved:
+            suggestion = clause.improvement.suggestion.replace("\n", " ")
+            lines.append(f"- **{idx}. {clause.category or 'general'}**: {suggestion}")
+            if clause.improvement.rationale:
+                lines.append(f"  - 이유: {clause.improvement.rationale}")
+        lines.append("")
     return "\n".join(lines)
 
 
@@ -53,6 +62,13 @@ def render_report_html(result: AnalysisResult) -> str:
             f"<td>{summary}</td><td>{score}</td><td>{explanation}</td></tr>"
         )
     rows = "\n".join(row_list)
+    improvement_items = [
+        f"<li><strong>{idx}. {clause.category or 'general'}</strong>: {clause.improvement.suggestion}"
+        f"<br /><span class=\"meta\">이유: {clause.improvement.rationale or '-'}</span></li>"
+        for idx, clause in enumerate(result.clauses, start=1)
+        if clause.improvement
+    ]
+    improvements = f"<h2>수정 제안</h2>\n    <ul>{''.join(improvement_items)}</ul>" if improvement_items else ""
     return f"""
 <!doctype html>
 <html lang="ko">
@@ -83,6 +99,14 @@ def render_report_html(result: AnalysisResult) -> str:
         {rows}
       </tbody>
     </table>
+    {improvements}
   </body>
 </html>
 """
+
+
+def render_report_pdf(result: AnalysisResult) -> bytes:
+    """Render the HTML report to PDF; raises ImportError when WeasyPrint is unavailable."""
+    from weasyprint import HTML  # type: ignore
+
+    return HTML(string=render_report_html(result)).write_pdf()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from backend.domain.models import AnalysisResult, Clause, ClausePage, ResultSummary
+
+RISK_LEVEL_ORDER: Dict[str, int] = {"low": 0, "medium": 1, "high": 2}
+SORT_OPTIONS = {"risk_desc", "risk_asc", "position"}
+CLAUSE_FIELDS = {
+    "id",
+    "raw_text",
+    "summary",
+    "category",
+    "risk",
+    "reasoning",
+    "improvement",
+    "start",
+    "end",
+    "article_no",
+    "children",
+}
+
+
+def parse_fields(fields: Optional[str]) -> Optional[set[str]]:
+    """Parse a comma-separated field list; `id` is always kept so clients can address clauses."""
+    if not fields:
+        return None
+    selected = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = selected - CLAUSE_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown clause fields: {', '.join(sorted(unknown))}")
+    return selected | {"id"}
+
+
+def _ordered_positions(result: AnalysisResult, risk_index: Sequence[int], sort: str) -> Iterable[int]:
+    if sort == "position":
+        return range(len(result.clauses))
+    if sort == "risk_asc":
+        return reversed(risk_index)
+    return risk_index
+
+
+def _meets_level(clause: Clause, min_rank: int) -> bool:
+    level = clause.risk.level if clause.risk else "low"
+    return RISK_LEVEL_ORDER.get(level, 0) >= min_rank
+
+
+def query_clauses(
+    result: AnalysisResult,
+    risk_index: Sequence[int],
+    sort: str = "risk_desc",
+    min_level: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 50,
+    fields: Optional[set[str]] = None,
+) -> ClausePage:
+    """Return one page of clauses, served from the precomputed risk index."""
+    if sort not in SORT_OPTIONS:
+        raise ValueError(f"Unsupported sort: {sort}")
+    if min_level is not None and min_level not in RISK_LEVEL_ORDER:
+        raise ValueError(f"Unsupported risk level: {min_level}")
+    page = max(page, 1)
+    page_size = max(page_size, 1)
+
+    positions = _ordered_positions(result, risk_index, sort)
+    if min_level:
+        min_rank = RISK_LEVEL_ORDER[min_level]
+        positions = [idx for idx in positions if _meets_level(result.clauses[idx], min_rank)]
+    else:
+        positions = list(positions)
+
+    start = (page - 1) * page_size
+    selected: List[Clause] = [result.clauses[idx] for idx in positions[start : start + page_size]]
+    return ClausePage(
+        document_id=result.document_id,
+        contract_type=result.contract_type,
+        overall_risk_score=result.overall_risk_score,
+        total=len(positions),
+        page=page,
+        page_size=page_size,
+        clauses=[clause.model_dump(include=fields) for clause in selected],
+    )
+
+
+def summarize_result(result: AnalysisResult) -> ResultSummary:
+    """Counts by risk level and category without any clause bodies."""
+    by_level: Counter[str] = Counter({level: 0 for level in RISK_LEVEL_ORDER})
+    by_category: Counter[str] = Counter()
+    for clause in result.clauses:
+        by_level[clause.risk.level if clause.risk else "low"] += 1
+        by_category[clause.category or "general"] += 1
+    return ResultSummary(
+        document_id=result.document_id,
+        contract_type=result.contract_type,
+        auto_contract_type=result.auto_contract_type,
+        overall_risk_score=result.overall_risk_score,
+        overall_risk_level=result.overall_risk_level,
+        clause_count=len(result.clauses),
+        by_level=dict(by_level),
+        by_category=dict(by_category),
+    )
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
-from statistics import mean
-from typing import Dict, List, Optional
+import functools
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from backend.domain.models import AnalysisResult, Clause, ClauseRisk
+from backend.domain.risk_columns import RiskColumns
+from backend.infrastructure.metrics.tracing import span
+
+
+@functools.lru_cache(maxsize=None)
+def keyword_pattern(keywords: Tuple[str, ...]) -> "re.Pattern[str]":
+    """One regex for "any of these keywords"; a single search beats a generator of `in` checks."""
+    return re.compile("|".join(map(re.escape, keywords)))
 
 
 class RiskPolicy:
@@ -18,6 +27,20 @@ class RiskPolicy:
     ) -> ClauseRisk:
         raise NotImplementedError
 
+    def score_batch(
+        self,
+        clauses: Sequence[Clause],
+        hints: Sequence[str],
+        llm_scores: Sequence[Optional[int]],
+        llm_levels: Sequence[Optional[str]],
+    ) -> RiskColumns:
+        """Score many clauses into columns; falls back to `score` for policies without a batch path."""
+        columns = RiskColumns()
+        for clause, hint, llm_score, llm_level in zip(clauses, hints, llm_scores, llm_levels):
+            risk = self.score(clause, hint, llm_score=llm_score, llm_level=llm_level)
+            columns.append(risk.score, risk.level, risk.explanation)
+        return columns
+
 
 class BaseRiskPolicy(RiskPolicy):
     """Default policy using hint/LLM score with minimal heuristics."""
@@ -39,6 +62,27 @@ class BaseRiskPolicy(RiskPolicy):
             return 25
         return 40
 
+    def _bonus(self, text: str, lowered: str, category: str) -> int:
+        """Contract-type-specific score adjustment; the default policy adds nothing."""
+        return 0
+
+    def _level(self, score: int, llm_score: Optional[int], llm_level: Optional[str]) -> str:
+        if llm_score is None and llm_level:
+            return llm_level
+        return self._level_from_score(score)
+
+    def _score_one(
+        self,
+        text: str,
+        category: Optional[str],
+        hint: str,
+        llm_score: Optional[int],
+        llm_level: Optional[str],
+    ) -> Tuple[int, str]:
+        score = llm_score if llm_score is not None else self._score_from_hint(hint)
+        score = min(100, score + self._bonus(text, text.lower(), (category or "").lower()))
+        return score, self._level(score, llm_score, llm_level)
+
     def score(
         self,
         clause: Clause,
@@ -46,56 +90,60 @@ class BaseRiskPolicy(RiskPolicy):
         llm_score: Optional[int] = None,
         llm_level: Optional[str] = None,
     ) -> ClauseRisk:
-        score = llm_score if llm_score is not None else self._score_from_hint(hint)
-        level = self._level_from_score(score)
-        if llm_score is None and llm_level:
-            level = llm_level
+        score, level = self._score_one(clause.raw_text or "", clause.category, hint, llm_score, llm_level)
         return ClauseRisk(score=score, level=level, explanation=hint)
 
+    def score_batch(
+        self,
+        clauses: Sequence[Clause],
+        hints: Sequence[str],
+        llm_scores: Sequence[Optional[int]],
+        llm_levels: Sequence[Optional[str]],
+    ) -> RiskColumns:
+        score_one = self._score_one
+        # Keywords never span whitespace, so the uncollapsed slice scores like raw_text would
+        scored = [
+            score_one(clause.scan_text(), clause.category, hint, llm_score, llm_level)
+            for clause, hint, llm_score, llm_level in zip(clauses, hints, llm_scores, llm_levels)
+        ]
+        columns = RiskColumns()
+        columns.extend([score for score, _ in scored], [level for _, level in scored], hints[: len(scored)])
+        return columns
+
 
 class EmploymentRiskPolicy(BaseRiskPolicy):
     """Weights termination/probation/penalty clauses higher for employment contracts."""
 
-    def score(
-        self,
-        clause: Clause,
-        hint: str,
-        llm_score: Optional[int] = None,
-        llm_level: Optional[str] = None,
-    ) -> ClauseRisk:
-        base = super().score(clause, hint, llm_score, llm_level)
-        text = (clause.raw_text or "").lower()
-        category = (clause.category or "").lower()
-        risky_keywords = ["해지", "수습", "penalty", "손해배상", "위약금", "책임"]
-        if category in {"termination", "penalty", "responsibility"} or any(k in text for k in risky_keywords):
-            base.score = min(100, base.score + 10)
-        if "근로시간" in clause.raw_text or "overtime" in text:
-            base.score = min(100, base.score + 5)
-        base.level = self._level_from_score(base.score)
-        return base
+    risky_keywords = ("해지", "수습", "penalty", "손해배상", "위약금", "책임")
+
+    def _bonus(self, text: str, lowered: str, category: str) -> int:
+        bonus = 0
+        if category in {"termination", "penalty", "responsibility"} or keyword_pattern(self.risky_keywords).search(lowered):
+            bonus += 10
+        if "근로시간" in text or "overtime" in lowered:
+            bonus += 5
+        return bonus
+
+    def _level(self, score: int, llm_score: Optional[int], llm_level: Optional[str]) -> str:
+        return self._level_from_score(score)
 
 
 class LeaseRiskPolicy(BaseRiskPolicy):
     """Weights deposit/maintenance/penalty clauses higher for lease contracts."""
 
-    def score(
-        self,
-        clause: Clause,
-        hint: str,
-        llm_score: Optional[int] = None,
-        llm_level: Optional[str] = None,
-    ) -> ClauseRisk:
-        base = super().score(clause, hint, llm_score, llm_level)
-        text = (clause.raw_text or "").lower()
-        category = (clause.category or "").lower()
-        deposit_hits = ["보증금", "deposit", "담보"]
-        maintenance_hits = ["수리", "보수", "원상복구", "maintenance", "repair"]
-        if category in {"payment", "penalty"} or any(k in text for k in deposit_hits):
-            base.score = min(100, base.score + 10)
-        if any(k in text for k in maintenance_hits):
-            base.score = min(100, base.score + 8)
-        base.level = self._level_from_score(base.score)
-        return base
+    deposit_hits = ("보증금", "deposit", "담보")
+    maintenance_hits = ("수리", "보수", "원상복구", "maintenance", "repair")
+
+    def _bonus(self, text: str, lowered: str, category: str) -> int:
+        bonus = 0
+        if category in {"payment", "penalty"} or keyword_pattern(self.deposit_hits).search(lowered):
+            bonus += 10
+        if keyword_pattern(self.maintenance_hits).search(lowered):
+            bonus += 8
+        return bonus
+
+    def _level(self, score: int, llm_score: Optional[int], llm_level: Optional[str]) -> str:
+        return self._level_from_score(score)
 
 
 class RiskAnalyzer:
@@ -113,6 +161,20 @@ class RiskAnalyzer:
         key = (contract_type or "general").lower()
         return self.policies.get(key, self.policies["general"])
 
+    def score_columns(
+        self,
+        clauses: Sequence[Clause],
+        risk_data: Sequence[Dict[str, Optional[str | int]]],
+        contract_type: str = "general",
+    ) -> RiskColumns:
+        """Batch scoring without per-clause pydantic objects."""
+        policy = self.choose_policy(contract_type)
+        hints = [str(rd.get("risk_reason") or rd.get("hint") or "") for rd in risk_data]
+        llm_scores = [rd.get("risk_score") for rd in risk_data]
+        llm_levels = [rd.get("risk_level") for rd in risk_data]
+        with span("risk.policy", policy=type(policy).__name__, clauses=len(clauses)):
+            return policy.score_batch(clauses, hints, llm_scores, llm_levels)
+
     def analyze(
         self,
         document_id: str,
@@ -120,14 +182,14 @@ class RiskAnalyzer:
         risk_data: List[Dict[str, Optional[str | int]]],
         contract_type: str = "general",
     ) -> AnalysisResult:
-        policy = self.choose_policy(contract_type)
-        for clause, rd in zip(clauses, risk_data):
-            hint = str(rd.get("risk_reason") or rd.get("hint") or "")
-            llm_score = rd.get("risk_score")
-            llm_level = rd.get("risk_level")
-            clause.risk = policy.score(clause, hint, llm_score=llm_score, llm_level=llm_level)
-
-        overall = mean([clause.risk.score for clause in clauses]) if clauses else 0.0
+        scored = clauses[: len(risk_data)]
+        columns = self.score_columns(scored, risk_data, contract_type=contract_type)
+        # ClauseRisk objects are built from the columns when a clause's risk is first read
+        for idx, clause in enumerate(scored):
+            clause.bind_risk(columns, idx)
+
+        unscored = sum(clause.risk.score for clause in clauses[len(scored) :])
+        overall = (sum(columns.scores) + unscored) / len(clauses) if clauses else 0.0
         return AnalysisResult(
             document_id=document_id,
             clauses=clauses,
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import re
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set
+
+from backend.domain.models import Clause, ContractTemplate, TemplateClause
+from backend.infrastructure.storage.template_store import TemplateStore
+
+# Blanks a standard form leaves for the parties: underlines, ○○, empty boxes and brackets
+_BLANKS = re.compile(r"_{2,}|[○◯□☐]+|[(（\[【]\s*[)）\]】]")
+_SPACE = re.compile(r"\s+")
+# Dates typed into the spaces of e.g. "20  년  월  일"
+_FREE_FILL = re.compile(r"[\d\s.\-/:]+")
+# What a party writes into a blank: a date, time, checkmark or a short name/place
+_FILL_MAX_CHARS = 30
+_FILL_MAX_WORDS = 3
+_NUMBER = re.compile(r"\d+(?:\s*[.,:/\-~]\s*\d+)*\.?")
+_SENTENCE_PUNCT = re.compile(r"[.,:;!?\"'“”‘’「」『』<>()（）\[\]【】…]")
+# Predicate endings and case particles mean a sentence was written in, not a value
+_SENTENCE_WORD = re.compile(r"(?:다|요|함|음|됨|는|을|를|에게|에서|으로)$")
+# Calendar dates and clock times: the only numbers a reused analysis stays right for. Amounts,
+# rates and periods ("____%", "○○개월") change what a clause means, so they go to the provider.
+_DATE_OR_TIME = re.compile(
+    r"\d{2,4}\s*[.\-/년]\s*\d{1,2}\s*[.\-/월]\s*\d{1,2}\s*일?\.?|\d{1,2}\s*:\s*\d{2}"
+)
+# Terms that shift obligations or money; a blank filled with them is added wording, not a value
+_RISK_TERMS = re.compile(r"위약|몰수|배상|손해|해지|해제|책임|면책|벌금|공제|포기|감액|삭감|지연|이자|반환|환불|수습|보증")
+SLOT = "\x00"
+_SHINGLE = 3
+# Template clauses sharing the most shingles with a document clause that `_align` tries
+_NEAREST = 3
+
+
+def skeleton(text: str) -> str:
+    """Clause text with whitespace collapsed and every blank replaced by a single SLOT marker."""
+    return _SPACE.sub(" ", _BLANKS.sub(SLOT, text)).strip()
+
+
+def _shingles(skel: str) -> Set[str]:
+    compact = skel.replace(SLOT, "").replace(" ", "")
+    return {compact[i : i + _SHINGLE] for i in range(len(compact) - _SHINGLE + 1)}
+
+
+def is_fill(text: str, date_part: bool = False) -> bool:
+    """True when `text`, typed into a blank, is a value the blank template's analysis still fits.
+
+    Accepted are dates and times ("2024. 3. 1.", "09:00"), checkmarks, and names or places of at
+    most a few words, optionally in the blank's own brackets. Other numbers count only when
+    `date_part` says the blank is part of a date ("20__년 __월"). Amounts, rates and periods,
+    obligation or penalty terms, and anything longer or with sentence punctuation or a sentence
+    ending are not fills: the clause goes to the provider.
+    """
+    text = text.strip()
+    if len(text) >= 2 and text[0] in "(（[【" and text[-1] in ")）]】":
+        text = text[1:-1].strip()
+    if not text:
+        return True
+    if len(text) > _FILL_MAX_CHARS or _RISK_TERMS.search(text):
+        return False
+    if any(char.isdigit() for char in _DATE_OR_TIME.sub("", text)) and not (
+        date_part and _NUMBER.fullmatch(text)
+    ):
+        return False
+    words = _NUMBER.sub("0", text.replace("(주)", "")).split()
+    if len(words) > _FILL_MAX_WORDS or _SENTENCE_PUNCT.search(" ".join(words)):
+        return False
+    return not any(_SENTENCE_WORD.search(word) for word in words)
+
+
+def fills_only(template_skel: str, document_skel: str) -> bool:
+    """True when `document_skel` is the template clause with nothing but its blanks filled in.
+
+    Any template wording that is dropped or replaced is a deviation. Inserted text is accepted
+    inside or next to a blank only if `is_fill` holds for it, and date numbers are also accepted
+    where the template has a space (the form's "20  년  월  일"); anything else is a deviation,
+    so the clause goes to the provider.
+    """
+    if template_skel == document_skel:
+        return True
+    # A sentence split by chance matches into short pieces still has to fit the blanks' budget
+    budget = _FILL_MAX_CHARS * max(1, template_skel.count(SLOT))
+    opcodes = SequenceMatcher(None, template_skel, document_skel, autojunk=False).get_opcodes()
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            continue
+        removed, added = template_skel[i1:i2], document_skel[j1:j2]
+        if removed.strip(SLOT + " "):
+            return False
+        before = template_skel[i1 - 1] if i1 > 0 else " "
+        after = template_skel[i2] if i2 < len(template_skel) else " "
+        date_part = _in_date(template_skel, i1, i2)
+        if SLOT in removed or SLOT in (before, after):
+            budget -= len(added)
+            if budget < 0 or not is_fill(added, date_part=date_part):
+                return False
+            continue
+        if added and not (
+            _FREE_FILL.fullmatch(added)
+            and (removed or " " in (before, after))
+            and (date_part or _DATE_OR_TIME.fullmatch(added.strip()))
+        ):
+            return False
+    return True
+
+
+def _in_date(skel: str, start: int, stop: int) -> bool:
+    """True when template text `skel[start:stop]` is followed by a year/month/day-of-month unit."""
+    following = skel[stop:].lstrip(SLOT + " ")
+    if following.startswith(("년", "월")):
+        return True
+    # "일" is a day of the month after "월"; elsewhere ("__일 전까지") it counts days
+    return following.startswith("일") and skel[:start].rstrip(SLOT + " ").endswith("월")
+
+
+def build_template(
+    name: str,
+    contract_type: str,
+    clauses: List[Clause],
+    risk_data: List[dict],
+    filename: Optional[str] = None,
+) -> ContractTemplate:
+    return ContractTemplate(
+        id=str(uuid.uuid4()),
+        name=name,
+        contract_type=contract_type,
+        filename=filename,
+        clauses=[
+            TemplateClause(
+                text=clause.raw_text,
+                article_no=clause.article_no,
+                summary=clause.summary,
+                category=clause.category,
+                reasoning=clause.reasoning,
+                risk_reason=data.get("risk_reason") or "",
+                risk_score=data.get("risk_score"),
+                risk_level=data.get("risk_level"),
+            )
+            for clause, data in zip(clauses, risk_data)
+        ],
+    )
+
+
+@dataclass
+class _Fingerprint:
+    skeletons: List[str]
+    exact: Dict[str, int]
+    by_article: Dict[int, List[int]]
+    shingles: Set[str]
+    # shingle -> template clauses containing it; rare shingles only, common ones say nothing
+    by_shingle: Dict[str, List[int]]
+
+
+@dataclass
+class TemplateMatch:
+    template: ContractTemplate
+    similarity: float
+    # document clause index -> template clause whose stored analysis applies to it
+    reused: Dict[int, TemplateClause] = field(default_factory=dict)
+
+    def deviating(self, clauses: List[Clause]) -> List[Clause]:
+        return [clause for idx, clause in enumerate(clauses) if idx not in self.reused]
+
+    def merge(self, clauses: List[Clause], fresh_risk_data: List[dict]) -> List[dict]:
+        """Copy stored annotations onto reused clauses; return risk hints in document order.
+
+        `fresh_risk_data` holds the provider's hints for `deviating(clauses)`, in that order.
+        """
+        fresh = iter(fresh_risk_data)
+        risk_data: List[dict] = []
+        for idx, clause in enumerate(clauses):
+            stored = self.reused.get(idx)
+            if stored is None:
+                risk_data.append(next(fresh))
+                continue
+            clause.summary = stored.summary or clause.summary
+            clause.category = stored.category or clause.category
+            clause.reasoning = stored.reasoning or clause.reasoning
+            risk_data.append(
+                {"risk_reason": stored.risk_reason, "risk_score": stored.risk_score, "risk_level": stored.risk_level}
+            )
+        return risk_data
+
+
+class TemplateMatcher:
+    """Matches a document's clauses against registered templates.
+
+    The template is chosen by character-shingle overlap of the whole clause list; each document
+    clause is then aligned to a template clause (exact skeleton, same article number, same
+    position, or the clauses sharing the most distinctive shingles) and reused only if it differs by filled-in
+    blanks alone.
+    """
+
+    def __init__(self, store: TemplateStore, min_similarity: float = 0.6) -> None:
+        self.store = store
+        self.min_similarity = min_similarity
+        self._fingerprints: Dict[str, _Fingerprint] = {}
+
+    def _fingerprint(self, template: ContractTemplate) -> _Fingerprint:
+        cached = self._fingerprints.get(template.id)
+        if cached is None:
+            skeletons = [skeleton(clause.text) for clause in template.clauses]
+            by_article: Dict[int, List[int]] = {}
+            for idx, clause in enumerate(template.clauses):
+                if clause.article_no is not None:
+                    by_article.setdefault(clause.article_no, []).append(idx)
+            by_shingle: Dict[str, List[int]] = {}
+            for idx, skel in enumerate(skeletons):
+                for shingle in _shingles(skel):
+                    by_shingle.setdefault(shingle, []).append(idx)
+            # Boilerplate such as "한다." appears in most clauses and would make lookups O(n)
+            common = max(_NEAREST, len(skeletons) // 4)
+            cached = _Fingerprint(
+                skeletons=skeletons,
+                exact={skel: idx for idx, skel in reversed(list(enumerate(skeletons)))},
+                by_article=by_article,
+                shingles=set(by_shingle),
+                by_shingle={shingle: ids for shingle, ids in by_shingle.items() if len(ids) <= common},
+            )
+            self._fingerprints[template.id] = cached
+        return cached
+
+    def match(self, clauses: List[Clause]) -> Optional[TemplateMatch]:
+        self.store.reload_if_changed()
+        templates = self.store.list()
+        if not templates or not clauses:
+            return None
+        # Templates are immutable, so only deletions can leave stale fingerprints behind
+        for stale in set(self._fingerprints) - {template.id for template in templates}:
+            self._fingerprints.pop(stale, None)
+
+        skeletons = [skeleton(clause.raw_text) for clause in clauses]
+        document_shingles = set().union(*map(_shingles, skeletons))
+        if not document_shingles:
+            return None
+        best: Optional[ContractTemplate] = None
+        best_similarity = 0.0
+        for template in templates:
+            fingerprint = self._fingerprint(template)
+            if not fingerprint.shingles:
+                continue
+            common = len(fingerprint.shingles & document_shingles)
+            # Both directions, so neither a fragment nor a much longer contract counts as a copy
+            similarity = min(common / len(fingerprint.shingles), common / len(document_shingles))
+            if similarity > best_similarity:
+                best, best_similarity = template, similarity
+        if best is None or best_similarity < self.min_similarity:
+            return None
+
+        fingerprint = self._fingerprint(best)
+        match = TemplateMatch(template=best, similarity=round(best_similarity, 4))
+        for idx, (clause, skel) in enumerate(zip(clauses, skeletons)):
+            aligned = self._align(fingerprint, clause, idx, skel)
+            if aligned is not None:
+                match.reused[idx] = best.clauses[aligned]
+        return match
+
+    @staticmethod
+    def _align(fingerprint: _Fingerprint, clause: Clause, idx: int, skel: str) -> Optional[int]:
+        exact = fingerprint.exact.get(skel)
+        if exact is not None:
+            return exact
+        candidates = list(fingerprint.by_article.get(clause.article_no, ())) if clause.article_no is not None else []
+        if idx < len(fingerprint.skeletons):
+            candidates.append(idx)
+        # Clauses may have been reordered or renumbered: also try the template clauses sharing the
+        # most distinctive shingles, found through the index rather than by comparing every one
+        shared: Counter[int] = Counter()
+        for shingle in _shingles(skel):
+            shared.update(fingerprint.by_shingle.get(shingle, ()))
+        candidates.extend(candidate for candidate, _ in shared.most_common(_NEAREST))
+        for candidate in dict.fromkeys(candidates):
+            if fills_only(fingerprint.skeletons[candidate], skel):
+                return candidate
+        return None
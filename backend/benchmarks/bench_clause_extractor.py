@@ -0,0 +1,80 @@
+"""Clause splitting time and memory versus the previous multi-pass regex splitter.
+
+``legacy`` and ``legacy-clauses`` are the old ``split_into_clauses`` and ``build_clauses``;
+``spans`` and ``clauses`` are their replacements. ``kept`` is what the result still holds once
+the call returns, ``peak`` the most allocated during it (the input text is not counted).
+
+Run with ``python -m backend.benchmarks.bench_clause_extractor``.
+"""
+from __future__ import annotations
+
+import re
+import time
+import tracemalloc
+from typing import Callable, List
+
+from backend.application.clause_extractor import ClauseExtractor
+from backend.domain.models import Clause
+
+# Roughly one A4 page of a Korean contract: two 조 with 항/호 structure
+_PAGE = (
+    "제{n}조 (계약 조건)  본 조항은 갑과 을 사이의 권리와 의무를 정한다.\n"
+    "① 갑은 매월 말일까지   급여를 지급한다.\n"
+    " 1. 기본급은 별도 합의에 따른다.\n"
+    " 2. 수당은 근로시간에 비례한다.\n"
+    "② 을은 계약 해지 시 30일 전에 통보하여야 하며 위약금을 부담한다.\n\n"
+    "제{m}조 (기타) 본 계약에 정하지 않은 사항은 관계 법령에 따른다.\n\n"
+)
+
+
+def _legacy_split(text: str) -> List[str]:
+    normalized = text.replace("\r\n", "\n").replace("\r", "\n")
+    heading_pattern = r"(?=제\s*\d+\s*조)"
+    if re.search(heading_pattern, normalized):
+        chunks = re.split(heading_pattern, normalized)
+        clauses = [f"{match}{body}".strip() for match, body in zip(re.findall(heading_pattern, normalized), chunks[1:])]
+    else:
+        clauses = [c.strip() for c in re.split(r"\n\s*\n", normalized) if c.strip()]
+    return [re.sub(r"\s{2,}", " ", clause).strip() for clause in clauses]
+
+
+def _legacy_clauses(text: str) -> List[Clause]:
+    return [Clause(id=f"clause-{idx}", raw_text=raw) for idx, raw in enumerate(_legacy_split(text), start=1)]
+
+
+def make_document(pages: int) -> str:
+    return "".join(_PAGE.format(n=2 * i + 1, m=2 * i + 2) for i in range(pages))
+
+
+def _measure(label: str, pages: int, fn: Callable[[str], object], text: str, repeats: int = 5) -> None:
+    # Fastest of a few runs for time; one traced run for memory, since tracing slows Python down
+    elapsed = min(_timed(fn, text) for _ in range(repeats))
+    tracemalloc.start()
+    result = fn(text)
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(result)  # type: ignore[arg-type]
+    print(
+        f"{label:<15} pages={pages:>5} clauses={count:>6} time={elapsed * 1000:8.1f}ms "
+        f"kept={kept / 1024:8.0f}KiB peak={peak / 1024:8.0f}KiB"
+    )
+
+
+def _timed(fn: Callable[[str], object], text: str) -> float:
+    started = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    extractor = ClauseExtractor()
+    for pages in (10, 100, 1000):
+        text = make_document(pages)
+        _measure("legacy", pages, _legacy_split, text)
+        _measure("spans", pages, extractor.split_spans, text)
+        _measure("legacy-clauses", pages, _legacy_clauses, text)
+        _measure("clauses", pages, extractor.build_clauses, text)
+
+
+if __name__ == "__main__":
+    main()
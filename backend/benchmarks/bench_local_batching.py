@@ -0,0 +1,143 @@
+"""Throughput and latency of dynamic batching versus serial calls for the local CPU provider.
+
+Without arguments a simulated forward pass is used (fixed cost plus a small per-row cost),
+which isolates the batcher itself. Pass a model name to run the real in-process engine, e.g.
+``python -m backend.benchmarks.bench_local_batching --model sshleifer/tiny-gpt2``.
+
+With ``--check`` and a (tiny) model, it instead verifies the engine: batched greedy answers
+must match serial ones despite left padding, and prompts longer than the model's context
+(a whole long contract) must still generate. Exits non-zero on failure.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+from backend.application.clause_extractor import ClauseExtractor
+from backend.benchmarks.corpus import generate_contract
+from backend.infrastructure.llm.batching import DynamicBatcher
+
+FORWARD_FIXED_MS = 40.0
+FORWARD_PER_ROW_MS = 4.0
+
+
+def _simulated_forward(rows: int) -> None:
+    time.sleep((FORWARD_FIXED_MS + FORWARD_PER_ROW_MS * rows) / 1000)
+
+
+async def _simulated_batch(items: List[str]) -> List[str]:
+    await asyncio.to_thread(_simulated_forward, len(items))
+    return [f"ok:{item}" for item in items]
+
+
+async def _drive(call: Callable[[str], Awaitable[str]], requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(idx: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await call(f"제{idx}조 근로자는 급여를 지급받는다.")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(idx) for idx in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "throughput_rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def _report(label: str, stats: dict, mean_batch: float) -> None:
+    print(
+        f"{label:<10} throughput={stats['throughput_rps']:7.1f} req/s "
+        f"p50={stats['p50_ms']:8.1f}ms p95={stats['p95_ms']:8.1f}ms mean_batch={mean_batch:4.1f}"
+    )
+
+
+async def _run(model: str | None, requests: int, concurrency: int, max_batch_size: int, max_wait_ms: float) -> None:
+    if model:
+        from backend.infrastructure.llm.local_provider import LocalLLMProvider
+
+        provider = LocalLLMProvider(model=model, max_batch_size=1, max_wait_ms=0)
+        serial = provider.batcher
+        batched: DynamicBatcher = DynamicBatcher(
+            provider._generate_batch, max_batch_size, max_wait_ms, key=lambda request: request[2]
+        )
+        system = "You summarize Korean contract clauses concisely."
+
+        async def serial_call(text: str) -> str:
+            return await serial.submit((system, text, 16))
+
+        async def batched_call(text: str) -> str:
+            return await batched.submit((system, text, 16))
+    else:
+        serial = DynamicBatcher(_simulated_batch, max_batch_size=1, max_wait_ms=0)
+        batched = DynamicBatcher(_simulated_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        serial_call = serial.submit
+        batched_call = batched.submit
+
+    _report("serial", await _drive(serial_call, requests, concurrency), serial.mean_batch_size)
+    _report("batched", await _drive(batched_call, requests, concurrency), batched.mean_batch_size)
+
+
+async def _check(model: str, max_batch_size: int) -> bool:
+    from backend.infrastructure.llm.local_provider import LocalLLMProvider
+
+    provider = LocalLLMProvider(model=model, max_batch_size=max_batch_size, max_wait_ms=50)
+    serial: DynamicBatcher = DynamicBatcher(provider._generate_batch, max_batch_size=1, max_wait_ms=0)
+    system = "You summarize Korean contract clauses concisely."
+    # Clauses of different lengths, so shorter rows are padded in the batch
+    clauses = [clause.raw_text for clause in ClauseExtractor().build_clauses(generate_contract("employment", 12))]
+    requests = [(system, text[: 40 + 60 * idx], 12) for idx, text in enumerate(clauses[:max_batch_size])]
+    expected = [await serial.submit(request) for request in requests]
+    batched = await asyncio.gather(*(provider.batcher.submit(request) for request in requests))
+    mismatched = sum(a != b for a, b in zip(expected, batched))
+    ok = mismatched == 0 and provider.batcher.mean_batch_size > 1
+    print(
+        f"batching   rows={len(requests)} mean_batch={provider.batcher.mean_batch_size:4.1f} "
+        f"mismatched={mismatched} {'ok' if ok else 'FAILED'}"
+    )
+
+    long_text = "\n\n".join(clauses) * 50
+    fitted = provider._fit(system, long_text, 16)
+    prompt_tokens = len(provider.tokenizer(provider._render(system, fitted))["input_ids"]) + 16
+    try:
+        await provider._invoke(system, long_text, max_new_tokens=16)
+        generated = True
+    except Exception as exc:  # noqa: BLE001
+        print(f"long prompt failed: {exc}")
+        generated = False
+    fits = generated and prompt_tokens <= provider.context_tokens
+    print(
+        f"long input chars={len(long_text)} prompt+answer={prompt_tokens} context={provider.context_tokens} "
+        f"{'ok' if fits else 'FAILED'}"
+    )
+    return ok and fits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=None, help="Hugging Face model id; omit for a simulated forward pass")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=20.0)
+    parser.add_argument("--check", action="store_true", help="verify batched generation with --model instead")
+    args = parser.parse_args()
+    if args.check:
+        if not args.model:
+            parser.error("--check needs --model")
+        sys.exit(0 if asyncio.run(_check(args.model, args.max_batch_size)) else 1)
+    asyncio.run(_run(args.model, args.requests, args.concurrency, args.max_batch_size, args.max_wait_ms))
+
+
+if __name__ == "__main__":
+    main()
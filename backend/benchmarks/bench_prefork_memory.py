@@ -0,0 +1,172 @@
+"""Per-worker memory of the pre-fork launcher versus ``uvicorn --workers``.
+
+Each server is started with the current environment, so the models it loads are whatever
+the settings select, e.g.::
+
+    LLM_PROVIDER=local LOCAL_MODEL=Qwen/Qwen2.5-0.5B-Instruct \\
+        python -m backend.benchmarks.bench_prefork_memory --workers 4 --warm 8
+
+Once every worker is up (and, with ``--warm``, analyses that run the model have been served),
+the RSS, PSS and private memory of each worker is read from ``/proc/<pid>/smaps_rollup``. Summed
+PSS is the real footprint: RSS counts the shared weights again in every worker. The pre-fork
+server gets a scratch ``WORK_QUEUE_PATH`` unless one is set; its analysis worker runs the warm-up
+analyses and is counted with the helper processes. Linux only.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import httpx
+
+from backend.infrastructure.metrics.process_memory import memory_usage
+
+_MiB = 1024 * 1024
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_CONTRACT = "\n".join(f"제{i}조 (목적) 근로자는 급여를 지급받는다. 위약금 {i} 해지 가능." for i in range(1, 6))
+
+
+def _children(pid: int) -> List[int]:
+    found = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # The command name may contain spaces; fields after it are fixed
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except (FileNotFoundError, ProcessLookupError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            found.append(int(stat.parent.name))
+    return found
+
+
+def _descendants(pid: int) -> List[int]:
+    pending, found = _children(pid), []
+    while pending:
+        child = pending.pop()
+        found.append(child)
+        pending.extend(_children(child))
+    return found
+
+
+def _wait_ready(proc: subprocess.Popen, base_url: str, workers: int, timeout_s: float) -> List[int]:
+    """PIDs of the API workers, once each has answered a request.
+
+    Asked rather than read from the process tree: pre-fork analysis workers are forked from the
+    same master with the same command line.
+    """
+    deadline = time.monotonic() + timeout_s
+    pids: Set[int] = set()
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            # Fresh connections so the kernel hands them to different workers
+            runtime = httpx.get(f"{base_url}/api/runtime", timeout=2, headers={"connection": "close"})
+            pids.add(runtime.json()["process"]["pid"])
+        except (httpx.HTTPError, ValueError, KeyError):
+            time.sleep(0.5)
+            continue
+        if len(pids) >= workers:
+            return sorted(pids)
+        time.sleep(0.05)
+    raise TimeoutError(f"{workers} workers not ready after {timeout_s:.0f}s")
+
+
+def _warm(base_url: str, requests: int) -> None:
+    with httpx.Client(base_url=base_url, timeout=600) as client:
+        for _ in range(requests):
+            upload = client.post("/api/documents", files={"file": ("warm.txt", _CONTRACT.encode(), "text/plain")})
+            upload.raise_for_status()
+            # Fresh connections so the kernel spreads requests across the workers
+            client.post(f"/api/documents/{upload.json()['documentId']}/analyze", json={}, headers={"connection": "close"})
+
+
+def _measure(mode: str, workers: int, port: int, timeout_s: float, warm: int, settle_s: float) -> dict:
+    # Runs in a scratch directory so the servers' data/ does not land in the checkout
+    scratch = tempfile.mkdtemp(prefix="cg-prefork-")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, (str(_REPO_ROOT), os.environ.get("PYTHONPATH"))))}
+    if mode == "prefork":
+        command = [sys.executable, "-m", "backend.prefork", "--workers", str(workers), "--port", str(port)]
+        # Required there; its analysis worker then runs the --warm analyses
+        env.setdefault("WORK_QUEUE_PATH", str(Path(scratch) / "queue.sqlite3"))
+    else:
+        command = [sys.executable, "-m", "uvicorn", "backend.main:app", "--workers", str(workers), "--port", str(port)]
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=scratch, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        worker_pids = _wait_ready(proc, base_url, workers, timeout_s)
+        ready_s = time.perf_counter() - started
+        if warm:
+            _warm(base_url, warm)
+        time.sleep(settle_s)
+        per_worker = {pid: memory_usage(pid) for pid in worker_pids}
+        master = memory_usage(proc.pid)
+        helpers = [pid for pid in _descendants(proc.pid) if pid not in per_worker]
+        helper_pss = sum(memory_usage(pid)["pss"] for pid in helpers if Path(f"/proc/{pid}").exists())
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    return {
+        "mode": mode,
+        "workers": workers,
+        "ready_s": round(ready_s, 2),
+        "master_pss_mib": round(master["pss"] / _MiB, 1),
+        "helper_processes": len(helpers),
+        "helper_pss_mib": round(helper_pss / _MiB, 1),
+        "per_worker_mib": [
+            {key: round(value / _MiB, 1) for key, value in usage.items() if key in ("rss", "pss", "private")}
+            for usage in per_worker.values()
+        ],
+        "total_pss_mib": round((master["pss"] + helper_pss + sum(u["pss"] for u in per_worker.values())) / _MiB, 1),
+    }
+
+
+def _report(result: dict) -> None:
+    workers: List[Dict[str, float]] = result["per_worker_mib"]
+    mean = {key: sum(w[key] for w in workers) / len(workers) for key in ("rss", "pss", "private")}
+    print(
+        f"{result['mode']:<8} workers={result['workers']} ready={result['ready_s']:6.1f}s "
+        f"per-worker rss={mean['rss']:7.1f} pss={mean['pss']:7.1f} private={mean['private']:7.1f} MiB | "
+        f"master pss={result['master_pss_mib']:7.1f} helpers pss={result['helper_pss_mib']:7.1f} "
+        f"total pss={result['total_pss_mib']:8.1f} MiB"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", default="prefork,uvicorn", help="comma-separated: prefork, uvicorn")
+    parser.add_argument("--warm", type=int, default=0, help="analyses to run before measuring")
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds to wait before measuring")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds to wait for the workers")
+    parser.add_argument("--json", type=Path, default=None, help="also write the results here")
+    args = parser.parse_args(argv)
+    if not Path("/proc/self/smaps_rollup").exists():
+        parser.error("needs Linux /proc/<pid>/smaps_rollup")
+
+    results = []
+    for mode in (m.strip() for m in args.modes.split(",") if m.strip()):
+        result = _measure(mode, args.workers, args.port, args.timeout, args.warm, args.settle)
+        _report(result)
+        results.append(result)
+    if args.json is not None:
+        payload = {"results": results, "env": {k: v for k, v in os.environ.items() if k.startswith(("LLM_", "LOCAL_", "OCR_"))}}
+        args.json.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""`RiskAnalyzer.analyze` end to end for 100k clauses, against the pre-column implementation.
+
+Run with ``python -m backend.benchmarks.bench_risk_scoring``.
+
+Both arms get the same input: fresh `Clause` objects that point into one shared document text,
+as `ClauseExtractor.build_clauses` produces them. Building the clauses is not timed; scoring,
+the overall score and the `AnalysisResult` are. Times are the best of ``--repeat`` runs.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from statistics import mean
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.application.risk_analyzer import RiskAnalyzer
+from backend.domain.models import AnalysisResult, Clause, ClauseRisk, ClauseSpan
+
+N_CLAUSES = 100_000
+_TEXTS = (
+    "근로자는 수습 기간 중  해지될 수 있다.",
+    "임금은 매월 25일에 지급한다.",
+    "근로시간은 주 40시간으로\n 한다.",
+    "본 계약에 정하지 않은 사항은 관계 법령에 따른다.",
+)
+
+
+class _LegacyEmploymentPolicy:
+    """The pre-column implementation: ClauseRisk built in the base and mutated per subclass."""
+
+    def _level_from_score(self, score: int) -> str:
+        return "high" if score >= 75 else "medium" if score >= 50 else "low"
+
+    def score(self, clause: Clause, hint: str, llm_score: Optional[int] = None, llm_level: Optional[str] = None) -> ClauseRisk:
+        score = llm_score if llm_score is not None else 40
+        base = ClauseRisk(score=score, level=self._level_from_score(score), explanation=hint)
+        text = (clause.raw_text or "").lower()
+        category = (clause.category or "").lower()
+        if category in {"termination", "penalty", "responsibility"} or any(
+            k in text for k in ["해지", "수습", "penalty", "손해배상", "위약금", "책임"]
+        ):
+            base.score = min(100, base.score + 10)
+        if "근로시간" in clause.raw_text or "overtime" in text:
+            base.score = min(100, base.score + 5)
+        base.level = self._level_from_score(base.score)
+        return base
+
+
+def _legacy_analyze(document_id: str, clauses: List[Clause], risk_data: List[Dict], contract_type: str) -> AnalysisResult:
+    """`RiskAnalyzer.analyze` as it was before the column path."""
+    policy = _LegacyEmploymentPolicy()
+    for clause, rd in zip(clauses, risk_data):
+        hint = str(rd.get("risk_reason") or rd.get("hint") or "")
+        clause.risk = policy.score(clause, hint, llm_score=rd.get("risk_score"), llm_level=rd.get("risk_level"))
+    overall = mean([clause.risk.score for clause in clauses]) if clauses else 0.0
+    return AnalysisResult(document_id=document_id, clauses=clauses, overall_risk_score=overall, contract_type=contract_type)
+
+
+def _inputs(n: int) -> Tuple[List[Clause], List[Dict]]:
+    source = "\n".join(_TEXTS[i % len(_TEXTS)] for i in range(n))
+    clauses: List[Clause] = []
+    offset = 0
+    for idx in range(n):
+        end = offset + len(_TEXTS[idx % len(_TEXTS)])
+        clause = Clause.from_span(f"clause-{idx + 1}", source, ClauseSpan("조", idx + 1, offset, end))
+        clause.category = "termination" if idx % 3 == 0 else "general"
+        clauses.append(clause)
+        offset = end + 1
+    risk_data = [{"risk_reason": "Medium risk: 검토 필요", "risk_score": (i * 7) % 90} for i in range(n)]
+    return clauses, risk_data
+
+
+def _measure(label: str, fn: Callable[..., AnalysisResult], n: int, repeat: int) -> List[int]:
+    best = float("inf")
+    for _ in range(repeat):
+        clauses, risk_data = _inputs(n)
+        started = time.perf_counter()
+        result = fn("bench", clauses, risk_data, "employment")
+        best = min(best, time.perf_counter() - started)
+    clauses, risk_data = _inputs(n)
+    tracemalloc.start()
+    fn("bench", clauses, risk_data, "employment")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} clauses={len(result.clauses)} time={best * 1000:8.1f}ms peak={peak / 1024 / 1024:7.1f}MiB")
+    return [clause.risk.score for clause in result.clauses]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clauses", type=int, default=N_CLAUSES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    legacy = _measure("legacy", _legacy_analyze, args.clauses, args.repeat)
+    current = _measure("analyze", RiskAnalyzer().analyze, args.clauses, args.repeat)
+    if legacy != current:
+        raise SystemExit("scores differ between the two implementations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Deterministic synthetic Korean contracts for benchmarks.
+
+``generate_contract("lease", 500, headings=False)`` returns a lease contract with 500 clauses
+separated by blank lines; with headings every clause starts with ``제N조 (제목)`` and some carry
+①/1. sub-items, which exercises the nested splitter.
+"""
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Tuple
+
+CONTRACT_KINDS = ("employment", "lease", "general")
+
+# (title, body) pairs; bodies mix risky keywords (위약금, 해지, 손해배상) with neutral ones
+_CLAUSES: Dict[str, List[Tuple[str, str]]] = {
+    "employment": [
+        ("근로계약기간", "근로계약기간은 {d}년 {m}월 1일부터 1년간으로 하며 수습 기간은 3개월로 한다."),
+        ("임금", "사용자는 매월 {d}일에 기본급 {amount}원을 근로자 명의 계좌로 지급한다."),
+        ("근로시간", "근로시간은 주 40시간으로 하되 연장근로는 당사자 합의에 따라 주 12시간 이내로 한다."),
+        ("계약 해지", "사용자는 근로자가 업무 지시를 따르지 않는 경우 언제든지 즉시 계약을 해지할 수 있다."),
+        ("손해배상", "근로자는 고의 또는 과실로 회사에 손해를 끼친 경우 그 손해 전액을 배상할 책임을 진다."),
+        ("위약금", "근로자가 계약기간 중 퇴사하는 경우 교육비 {amount}원을 위약금으로 지급하여야 한다."),
+        ("비밀유지", "근로자는 재직 중 및 퇴직 후 {d}년간 회사의 영업비밀을 누설하여서는 아니 된다."),
+        ("휴가", "근로자는 근로기준법에 따른 연차유급휴가를 사용할 수 있다."),
+    ],
+    "lease": [
+        ("목적물", "임대인은 서울특별시 {d}구 소재 주택을 임차인에게 주거용으로 임대한다."),
+        ("보증금", "임차인은 계약 시 보증금 {amount}원 중 계약금을 지급하고 잔금은 입주일에 지급한다."),
+        ("차임", "차임은 월 {amount}원으로 하며 매월 {d}일에 선불로 지급한다."),
+        ("계약 해지", "임차인이 차임을 2기 이상 연체한 경우 임대인은 즉시 계약을 해지할 수 있다."),
+        ("원상회복", "임차인은 계약 종료 시 목적물을 원상으로 회복하여 반환하며 모든 수리 비용을 부담한다."),
+        ("위약금", "당사자 일방이 계약을 위반한 경우 보증금의 {d}0%를 위약금으로 지급한다."),
+        ("보증금 반환", "임대인은 계약 종료 후 보증금을 반환하되 반환 시기는 임대인이 정한다."),
+        ("관리비", "관리비는 임차인이 부담하며 세부 항목은 관리규약에 따른다."),
+    ],
+    "general": [
+        ("목적", "본 계약은 갑과 을 사이의 용역 제공에 관한 권리와 의무를 정함을 목적으로 한다."),
+        ("대금 지급", "갑은 용역 완료 후 {d}일 이내에 대금 {amount}원을 을에게 지급한다."),
+        ("계약기간", "계약기간은 {d}개월로 하며 만료 1개월 전까지 이의가 없으면 동일 조건으로 연장된다."),
+        ("손해배상", "을은 용역 수행 중 발생한 모든 손해에 대하여 무제한 배상 책임을 진다."),
+        ("해지", "갑은 사전 통보 없이 언제든지 본 계약을 해지할 수 있다."),
+        ("비밀유지", "당사자는 본 계약과 관련하여 알게 된 상대방의 정보를 제3자에게 누설하지 아니한다."),
+        ("분쟁 해결", "본 계약에 관한 분쟁은 갑의 주소지 관할 법원을 전속 관할로 한다."),
+        ("기타", "본 계약에 정하지 않은 사항은 관계 법령과 일반 상관례에 따른다."),
+    ],
+}
+
+_TITLES = {"employment": "근로계약서", "lease": "주택임대차계약서", "general": "용역계약서"}
+
+_SUB_ITEMS = (
+    "당사자는 상호 협의하여 세부 사항을 정한다.",
+    "통지는 서면으로 하여야 효력이 있다.",
+    "위반 시 상대방은 손해배상을 청구할 수 있다.",
+)
+
+
+def generate_contract(kind: str, clauses: int, headings: bool = True, seed: int = 0) -> str:
+    """Build a contract of `kind` with exactly `clauses` top-level clauses."""
+    if kind not in _CLAUSES:
+        raise ValueError(f"Unknown contract kind: {kind}")
+    rng = random.Random(f"{kind}:{clauses}:{headings}:{seed}")
+    templates = _CLAUSES[kind]
+    parts = []
+    for number in range(1, clauses + 1):
+        title, body = templates[rng.randrange(len(templates))]
+        body = body.format(d=rng.randint(1, 28), m=rng.randint(1, 12), amount=f"{rng.randint(10, 900) * 10_000:,}")
+        if not headings:
+            parts.append(body)
+            continue
+        lines = [f"제{number}조 ({title}) {body}"]
+        # Roughly every third clause gets 항 and 호 so nesting is part of the workload
+        if rng.random() < 0.35:
+            lines.append(f"① {rng.choice(_SUB_ITEMS)}")
+            lines.append(f"② {rng.choice(_SUB_ITEMS)}")
+            if rng.random() < 0.5:
+                lines.append(f"1. {rng.choice(_SUB_ITEMS)}")
+                lines.append(f"2. {rng.choice(_SUB_ITEMS)}")
+        parts.append("\n".join(lines))
+    text = "\n\n".join(parts) + "\n"
+    if not headings:
+        # Without 제N조 every paragraph is a clause, so a title line would add one
+        return text
+    return _TITLES[kind] + "\n\n" + text
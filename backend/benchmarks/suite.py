@@ -0,0 +1,227 @@
+"""Benchmark suite over the synthetic contract corpus with JSON baselines.
+
+Run ``python -m backend.benchmarks.suite --output backend/benchmarks/baselines/local.json`` to
+record a baseline and ``python -m backend.benchmarks.suite --compare <baseline.json>`` to flag
+cases whose fastest run got slower than ``--threshold`` (default 1.25x, 1.5x with ``--quick``)
+and by more than ``--min-delta-ms``; the exit status is 1 on regression. The fastest of N runs
+is gated rather than the median because scheduler and GC noise only ever adds time.
+``--quick`` trims sizes and repeats for a fast smoke run, ``--filter extractor`` selects cases.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, UploadFile
+
+from backend.application.analysis_facade import AnalysisFacade
+from backend.application.clause_extractor import ClauseExtractor
+from backend.application.llm_agent import LLMAgent
+from backend.application.llm_scheduler import LLMScheduler
+from backend.application.ocr_service import OCRService
+from backend.application.report_builder import render_report_html, render_report_md
+from backend.application.risk_analyzer import RiskAnalyzer
+from backend.benchmarks.corpus import CONTRACT_KINDS, generate_contract
+from backend.infrastructure.llm.dummy_provider import DummyLLMProvider
+from backend.infrastructure.llm.json_stream import FieldCallback
+from backend.infrastructure.storage.repository import InMemoryRepository
+
+
+class LatencyProvider(DummyLLMProvider):
+    """Dummy answers after a log-normal delay, approximating a hosted model's response times."""
+
+    def __init__(self, median_ms: float = 40.0, sigma: float = 0.5, seed: int = 0) -> None:
+        super().__init__()
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.rng = random.Random(seed)
+
+    async def _delay(self) -> None:
+        await asyncio.sleep(self.median_ms * self.rng.lognormvariate(0, self.sigma) / 1000)
+
+    async def analyze_clause(self, clause_text: str, on_field: Optional[FieldCallback] = None) -> dict:
+        await self._delay()
+        return await super().analyze_clause(clause_text, on_field)
+
+    async def infer_contract_type(self, clauses) -> str | None:
+        await self._delay()
+        return await super().infer_contract_type(clauses)
+
+
+class _TextOCR(OCRService):
+    async def extract_text(self, file_path: Path, content_type: Optional[str] = None) -> str:
+        return file_path.read_text(encoding="utf-8")
+
+
+def _timeit(fn: Callable[[], object], repeats: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"min_ms": min(samples), "median_ms": statistics.median(samples), "repeats": repeats}
+
+
+class Suite:
+    def __init__(self, quick: bool, pattern: Optional[str]) -> None:
+        self.quick = quick
+        self.pattern = pattern
+        self.sizes = (10, 200) if quick else (10, 200, 2000)
+        self.repeats = 5 if quick else 9
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def _selected(self, name: str) -> bool:
+        return self.pattern is None or self.pattern in name
+
+    def record(self, name: str, fn: Callable[[], object], repeats: Optional[int] = None, **extra: float) -> None:
+        if not self._selected(name):
+            return
+        fn()  # warm-up: regex compilation, imports, caches
+        stats = {**_timeit(fn, repeats or self.repeats), **extra}
+        self.results[name] = stats
+        print(f"{name:<52} median={stats['median_ms']:10.2f}ms min={stats['min_ms']:10.2f}ms")
+
+    # -- microbenchmarks ----------------------------------------------------
+
+    def extractor(self) -> None:
+        extractor = ClauseExtractor()
+        for kind in CONTRACT_KINDS:
+            for headings in (True, False):
+                for size in self.sizes:
+                    text = generate_contract(kind, size, headings=headings)
+                    label = "headings" if headings else "plain"
+                    self.record(f"extractor.build_clauses/{kind}/{label}/{size}", lambda: extractor.build_clauses(text))
+
+    def risk(self) -> None:
+        analyzer = RiskAnalyzer()
+        size = self.sizes[-1]
+        for kind in CONTRACT_KINDS:
+            clauses = ClauseExtractor().build_clauses(generate_contract(kind, size))
+            provider = DummyLLMProvider()
+            risk_data = [asyncio.run(provider.analyze_clause(c.raw_text)) for c in clauses]
+            policy = type(analyzer.choose_policy(kind)).__name__
+            self.record(
+                f"risk.analyze/{policy}/{size}",
+                lambda: analyzer.analyze("bench", clauses, risk_data, contract_type=kind),
+            )
+
+    def dummy_provider(self) -> None:
+        provider = DummyLLMProvider()
+        clauses = ClauseExtractor().build_clauses(generate_contract("employment", 200))
+        texts = [clause.raw_text for clause in clauses]
+        methods = ("analyze_clause", "summarize_clause", "classify_clause", "analyze_risk", "suggest_improvement")
+        for method in methods:
+            call = getattr(provider, method)
+
+            async def _all() -> None:
+                for text in texts:
+                    await call(text)
+
+            self.record(f"dummy.{method}/200", lambda: asyncio.run(_all()))
+        self.record("dummy.infer_contract_type/200", lambda: asyncio.run(provider.infer_contract_type(clauses)))
+
+    def reports(self) -> None:
+        size = self.sizes[-1]
+        facade = self._facade(DummyLLMProvider())
+        result = asyncio.run(self._analyze(facade, generate_contract("lease", size), "lease"))
+        self.record(f"report.markdown/{size}", lambda: render_report_md(result))
+        self.record(f"report.html/{size}", lambda: render_report_html(result))
+
+    # -- end to end ---------------------------------------------------------
+
+    def _facade(self, provider: DummyLLMProvider) -> AnalysisFacade:
+        storage = Path(tempfile.mkdtemp(prefix="cg-bench-"))
+        return AnalysisFacade(
+            repository=InMemoryRepository(storage),
+            ocr_service=_TextOCR(),
+            clause_extractor=ClauseExtractor(),
+            llm_agent=LLMAgent(provider, scheduler=LLMScheduler(max_concurrency=8)),
+            risk_analyzer=RiskAnalyzer(),
+        )
+
+    @staticmethod
+    async def _analyze(facade: AnalysisFacade, text: str, contract_type: str):
+        upload = UploadFile(
+            file=io.BytesIO(text.encode("utf-8")), filename="contract.txt", headers=Headers({"content-type": "text/plain"})
+        )
+        document = await facade.register_document(upload)
+        return await facade.analyze(document.id, contract_type=contract_type)
+
+    def end_to_end(self) -> None:
+        sizes = self.sizes[:2]
+        for kind in CONTRACT_KINDS:
+            for size in sizes:
+                facade = self._facade(LatencyProvider())
+                text = generate_contract(kind, size)
+                # Each run costs at least a few provider round trips, so fewer repeats suffice
+                self.record(
+                    f"e2e.analyze/{kind}/{size}/latency40ms",
+                    lambda: asyncio.run(self._analyze(facade, text, kind)),
+                    repeats=3,
+                )
+
+    def run(self) -> Dict[str, Dict[str, float]]:
+        self.extractor()
+        self.risk()
+        self.dummy_provider()
+        self.reports()
+        self.end_to_end()
+        return self.results
+
+
+def _compare(results: Dict[str, Dict[str, float]], baseline_path: Path, threshold: float, min_delta_ms: float) -> int:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    regressions = 0
+    print(f"\ncompared with {baseline_path} (fastest run, threshold {threshold:.2f}x and +{min_delta_ms:g}ms)")
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["min_ms"], stats["min_ms"]
+        ratio = after / max(before, 1e-6)
+        flag = "REGRESSION" if ratio > threshold and after - before > min_delta_ms else ""
+        regressions += bool(flag)
+        print(f"{name:<52} {before:10.2f}ms -> {after:10.2f}ms {ratio:6.2f}x {flag}")
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and fewer repeats")
+    parser.add_argument("--filter", default=None, help="only run cases whose name contains this string")
+    parser.add_argument("--output", type=Path, default=None, help="write results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, default=None, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=None, help="slowdown ratio (default 1.25, 1.5 with --quick)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    results = Suite(args.quick, args.filter).run()
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nbaseline written to {args.output}")
+    if args.compare is not None:
+        threshold = args.threshold or (1.5 if args.quick else 1.25)
+        return _compare(results, args.compare, threshold, args.min_delta_ms)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
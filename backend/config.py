@@ -7,11 +7,46 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     storage_path: Path = Path("data/documents")
+    storage_compression: str = "none"  # options: none, zstd
+    storage_compression_level: int = 3
+    storage_retention_days: float = 0.0  # 0 = keep documents forever
+    storage_compaction_interval_s: float = 3600.0  # 0 disables the background task
+    search_index_path: Path = Path("data/index/clauses.jsonl")
+    improvement_store_path: Path = Path("data/index/improvements.jsonl")
+    template_store_path: Path = Path("data/index/templates.jsonl")
+    template_min_similarity: float = 0.6  # share of clause text a document must have in common with a template
+    profile_path: Path = Path("data/profiles")
     ocr_language: str = "kor+eng"
     openai_model: str = "gpt-4o-mini"
     openai_api_key: str | None = None
-    llm_provider: str = "dummy"  # options: dummy, openai, hf
+    openai_base_url: str | None = None  # OpenAI-compatible endpoint, e.g. http://localhost:8100/v1
+    openai_max_retries: int = 2
+    openai_stream: bool = True  # stream clause analyses and act on each field as it arrives
+    openai_response_format: str = "json_schema"  # options: json_schema, json_object, none
+    # Per-field output-token caps for clause analyses, e.g. {"reasoning": 120}; unset fields keep the defaults
+    openai_field_token_caps: dict[str, int] = {}
+    llm_provider: str = "dummy"  # options: dummy, openai, hf, local
     hf_model: str = "meta-llama/Meta-Llama-3-8B-Instruct"
     hf_token: str | None = None
     hf_api_url: str | None = None
+    llm_max_concurrency: int = 8
+    llm_rpm: int = 0  # provider requests/minute budget, 0 = unlimited
+    llm_tpm: int = 0  # provider tokens/minute budget, 0 = unlimited
+    local_model: str = "Qwen/Qwen2.5-0.5B-Instruct"
+    local_max_batch_size: int = 8
+    local_max_wait_ms: float = 20.0
+    local_num_threads: int | None = None
+    executor_thread_workers: int = 4
+    executor_process_workers: int = 0  # >0 renders PDF reports in worker processes instead of threads
+    work_queue_path: Path | None = None  # shared SQLite queue; set to hand analyses to `python -m backend.worker`
+    work_queue_lease_s: float = 30.0
+    work_queue_max_attempts: int = 3
+    work_queue_journal_mode: str = "wal"  # "delete" for a queue file on network storage
+    work_queue_wait_s: float = 300.0  # analyze requests answer 202 after this and the client polls
+    work_queue_retention_days: float = 7.0
+    worker_concurrency: int = 2
+    prefork_workers: int = 0  # `python -m backend.prefork` API workers, 0 = one per CPU
+    prefork_analysis_workers: int = 1  # forked work-queue consumers sharing the preloaded models
+    prefork_torch_threads: int | None = None  # torch threads per forked process, default CPUs / processes
+    admin_token: str | None = None  # required for profiling; unset disables it
     model_config = SettingsConfigDict(env_file=(".env", "config/.env"), extra="ignore")
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import re
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, model_validator
+
+_WHITESPACE_RUN = re.compile(r"\s{2,}")
 
 
 class Document(BaseModel):
@@ -20,13 +23,157 @@ class ClauseRisk(BaseModel):
     explanation: str = ""
 
 
+class ClauseImprovement(BaseModel):
+    suggestion: str
+    rationale: str = ""
+    risk_delta: int = 0
+
+
+class ClauseSpan:
+    """Offsets of a 조/항/호 unit inside the normalized document text.
+
+    A slotted record rather than a model: a long contract has one per 항/호, and they only
+    become dicts when a clause is serialized.
+    """
+
+    __slots__ = ("kind", "number", "start", "end", "children")
+
+    def __init__(
+        self, kind: str, number: Optional[int], start: int, end: int, children: Sequence["ClauseSpan"] = ()
+    ) -> None:
+        self.kind = kind  # "조", "항" or "호"
+        self.number = number
+        self.start = start
+        self.end = end
+        # Most 호 have no children; they share the empty tuple until `add` is called
+        self.children: Sequence[ClauseSpan] = children
+
+    def add(self, child: "ClauseSpan") -> None:
+        if isinstance(self.children, list):
+            self.children.append(child)
+        else:
+            self.children = [*self.children, child]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "number": self.number,
+            "start": self.start,
+            "end": self.end,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ClauseSpan":
+        return cls(
+            data["kind"],
+            data.get("number"),
+            data["start"],
+            data["end"],
+            [cls.from_dict(child) for child in data["children"]] if data.get("children") else (),
+        )
+
+
 class Clause(BaseModel):
     id: str
-    raw_text: str
     summary: Optional[str] = None
     category: Optional[str] = None
-    risk: ClauseRisk = Field(default_factory=ClauseRisk)
     reasoning: Optional[str] = None
+    improvement: Optional[ClauseImprovement] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+    article_no: Optional[int] = None
+    # Either explicit text or a reference to the shared document text sliced by start/end
+    _text: Optional[str] = PrivateAttr(default=None)
+    _source: Optional[str] = PrivateAttr(default=None)
+    _spans: Sequence[ClauseSpan] = PrivateAttr(default=())
+    # A ClauseRisk, or a (RiskColumns, row) pair until `risk` is first read
+    _risk: Any = PrivateAttr(default=None)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _capture_raw_text(cls, data, handler):
+        text = children = risk = None
+        if isinstance(data, dict) and ("raw_text" in data or "children" in data or "risk" in data):
+            data = dict(data)
+            text = data.pop("raw_text", None)
+            children = data.pop("children", None)
+            risk = data.pop("risk", None)
+        clause = handler(data)
+        if text is not None:
+            clause._text = text
+        if children:
+            clause._spans = [span if isinstance(span, ClauseSpan) else ClauseSpan.from_dict(span) for span in children]
+        if risk is not None:
+            clause._risk = risk if isinstance(risk, ClauseRisk) else ClauseRisk.model_validate(risk)
+        return clause
+
+    @classmethod
+    def from_span(cls, clause_id: str, source: str, span: ClauseSpan) -> "Clause":
+        clause = cls(id=clause_id, start=span.start, end=span.end, article_no=span.number)
+        clause._source = source
+        clause._spans = span.children
+        return clause
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def children(self) -> List[Dict[str, Any]]:
+        """Nested 항/호 spans, built from the span records when the clause is serialized."""
+        return [span.to_dict() for span in self._spans]
+
+    # The accessors below read __pydantic_private__ directly: going through pydantic's
+    # __getattr__ for private attributes costs more than the work itself on large documents
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def raw_text(self) -> str:
+        private = self.__pydantic_private__
+        text = private["_text"]
+        if text is None:
+            source = private["_source"]
+            if source is None or self.start is None or self.end is None:
+                return ""
+            # Materialized on first access only; the document text stays the single copy until then
+            text = private["_text"] = _WHITESPACE_RUN.sub(" ", source[self.start : self.end])
+        return text
+
+    @raw_text.setter
+    def raw_text(self, value: str) -> None:
+        self._text = value
+
+    def scan_text(self) -> str:
+        """The clause's text for keyword checks, without materializing `raw_text`.
+
+        Whitespace runs are not collapsed here, so only use it for matching that ignores them.
+        """
+        private = self.__pydantic_private__
+        text = private["_text"]
+        if text is not None:
+            return text
+        source = private["_source"]
+        if source is None or self.start is None or self.end is None:
+            return ""
+        return source[self.start : self.end]
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def risk(self) -> ClauseRisk:
+        private = self.__pydantic_private__
+        risk = private["_risk"]
+        if risk is None:
+            risk = private["_risk"] = ClauseRisk()
+        elif not isinstance(risk, ClauseRisk):
+            columns, row = risk
+            risk = private["_risk"] = columns.risk_at(row)
+        return risk
+
+    @risk.setter
+    def risk(self, value: ClauseRisk) -> None:
+        self._risk = value
+
+    def bind_risk(self, columns: Any, row: int) -> None:
+        """Take the risk from row `row` of a `RiskColumns` batch; the ClauseRisk is built on first read."""
+        self.__pydantic_private__["_risk"] = (columns, row)
 
 
 class DocumentStatus(BaseModel):
@@ -42,6 +189,11 @@ class AnalysisResult(BaseModel):
     overall_risk_score: float = 0.0
     contract_type: str = "general"
     auto_contract_type: Optional[str] = None
+    # Registered standard form the clauses were matched against, and how many reused its analysis
+    template_id: Optional[str] = None
+    template_clauses_reused: int = 0
+    # Wall-clock seconds per pipeline stage (extract, split, llm, risk) for this run
+    stage_durations: Dict[str, float] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     @property
@@ -53,6 +205,49 @@ class AnalysisResult(BaseModel):
         return "low"
 
 
+class TemplateClause(BaseModel):
+    """One clause of a registered template together with its stored LLM analysis."""
+
+    text: str
+    article_no: Optional[int] = None
+    summary: Optional[str] = None
+    category: Optional[str] = None
+    reasoning: Optional[str] = None
+    risk_reason: str = ""
+    risk_score: Optional[int] = None
+    risk_level: Optional[str] = None
+
+
+class ContractTemplate(BaseModel):
+    id: str
+    name: str
+    contract_type: str = "general"
+    filename: Optional[str] = None
+    clauses: List[TemplateClause] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ClausePage(BaseModel):
+    document_id: str
+    contract_type: str = "general"
+    overall_risk_score: float = 0.0
+    total: int = 0
+    page: int = 1
+    page_size: int = 50
+    clauses: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class ResultSummary(BaseModel):
+    document_id: str
+    contract_type: str = "general"
+    auto_contract_type: Optional[str] = None
+    overall_risk_score: float = 0.0
+    overall_risk_level: str = "low"
+    clause_count: int = 0
+    by_level: Dict[str, int] = Field(default_factory=dict)
+    by_category: Dict[str, int] = Field(default_factory=dict)
+
+
 class User(BaseModel):
     id: str
     display_name: str
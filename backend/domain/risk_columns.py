@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from array import array
+from typing import List, Sequence
+
+from backend.domain.models import ClauseRisk
+
+RISK_LEVELS = ("low", "medium", "high")
+_LEVEL_CODES = {level: code for code, level in enumerate(RISK_LEVELS)}
+
+
+class RiskColumns:
+    """Column-oriented risk scores for a batch of clauses.
+
+    Scores and levels live in compact byte arrays; clauses are bound to their row with
+    `Clause.bind_risk`, and `risk_at` builds the pydantic `ClauseRisk` only when a clause's risk
+    is read (serialization, reports, indexes).
+    """
+
+    __slots__ = ("scores", "levels", "explanations", "extra_levels")
+
+    def __init__(self) -> None:
+        self.scores = array("B")
+        self.levels = array("B")
+        self.explanations: List[str] = []
+        # Level labels outside low/medium/high (custom policies) are kept by position
+        self.extra_levels: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def append(self, score: int, level: str, explanation: str) -> None:
+        code = _LEVEL_CODES.get(level)
+        if code is None:
+            self.extra_levels[len(self.scores)] = level
+            code = 0
+        self.scores.append(min(100, max(0, int(score))))
+        self.levels.append(code)
+        self.explanations.append(explanation)
+
+    def extend(self, scores: Sequence[int], levels: Sequence[str], explanations: Sequence[str]) -> None:
+        """Append whole columns at once; cheaper than `append` per row for large batches."""
+        base = len(self.scores)
+        codes = _LEVEL_CODES
+        level_codes = array("B")
+        for offset, level in enumerate(levels):
+            code = codes.get(level)
+            if code is None:
+                self.extra_levels[base + offset] = level
+                code = 0
+            level_codes.append(code)
+        self.scores.extend([min(100, max(0, int(score))) for score in scores])
+        self.levels.extend(level_codes)
+        self.explanations.extend(explanations)
+
+    def level_at(self, idx: int) -> str:
+        return self.extra_levels.get(idx) or RISK_LEVELS[self.levels[idx]]
+
+    def risk_at(self, idx: int) -> ClauseRisk:
+        return ClauseRisk(score=self.scores[idx], level=self.level_at(idx), explanation=self.explanations[idx])
+
+    def mean_score(self) -> float:
+        return sum(self.scores) / len(self.scores) if self.scores else 0.0
@@ -0,0 +1 @@
+"Executor pools for CPU-bound pipeline stages."
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+class ExecutorPool:
+    """Keeps synchronous pipeline work off the event loop.
+
+    `run_thread` is for blocking work in general: file I/O, compression, native libraries, and
+    pure-Python stages whose inputs or outputs are large, since the interpreter switches threads
+    every few milliseconds and the loop stays responsive. `run_cpu` uses a process pool and only
+    pays off when the computation far outweighs pickling its arguments and result (PDF
+    rendering); with `process_workers=0`, or after the process pool breaks, it falls back to the
+    thread pool.
+    """
+
+    def __init__(self, thread_workers: int = 4, process_workers: int = 0) -> None:
+        self.thread_workers = max(1, thread_workers)
+        self.process_workers = max(0, process_workers)
+        self.threads = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="cg-worker")
+        self.processes: Optional[ProcessPoolExecutor] = self._new_process_pool()
+
+    def _new_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.process_workers == 0:
+            return None
+        # spawn avoids forking a process that already runs threads (uvicorn, executors, torch)
+        return ProcessPoolExecutor(max_workers=self.process_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def run_thread(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.threads, functools.partial(fn, *args, **kwargs))
+
+    async def run_cpu(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.processes is None:
+            return await self.run_thread(fn, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.processes, functools.partial(fn, *args, **kwargs))
+        except BrokenProcessPool:
+            logger.warning("Process pool broke (worker killed?); recreating it and retrying %s in a thread", fn)
+            self.processes.shutdown(wait=False, cancel_futures=True)
+            self.processes = self._new_process_pool()
+            return await self.run_thread(fn, *args, **kwargs)
+
+    async def warm_up(self) -> None:
+        """Start worker processes now instead of on the first request."""
+        if self.processes is not None:
+            loop = asyncio.get_running_loop()
+            pids = await asyncio.gather(*(loop.run_in_executor(self.processes, _worker_pid) for _ in range(self.process_workers)))
+            logger.info("Executor worker processes ready: %s", sorted(set(pids)))
+
+    def shutdown(self) -> None:
+        self.threads.shutdown(wait=False, cancel_futures=True)
+        if self.processes is not None:
+            self.processes.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        return {"thread_workers": self.thread_workers, "process_workers": self.process_workers}
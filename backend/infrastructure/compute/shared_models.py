@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import os
+import sys
+from typing import Any, Callable, Dict, List, TypeVar
+
+from backend.config import Settings
+from backend.infrastructure.llm.factory import create_provider
+from backend.infrastructure.ocr.tesseract_ocr_adapter import TesseractOCRAdapter
+
+T = TypeVar("T")
+
+# Providers whose weights live in this process; remote APIs are cheap to build per worker
+IN_PROCESS_PROVIDERS = {"local"}
+
+_MODELS: Dict[str, Any] = {}
+
+
+def shared_model(key: str, factory: Callable[[], T]) -> T:
+    """The instance stored under `key`, built on first use.
+
+    A pre-fork master fills this before forking, so its workers reuse the loaded weights
+    instead of each loading a private copy.
+    """
+    model = _MODELS.get(key)
+    if model is None:
+        model = _MODELS[key] = factory()
+    return model
+
+
+def ocr_model(settings: Settings) -> TesseractOCRAdapter:
+    return shared_model("ocr", lambda: TesseractOCRAdapter(language=settings.ocr_language))
+
+
+def llm_provider(settings: Settings) -> object:
+    return shared_model("llm", lambda: create_provider(settings))
+
+
+def preload(settings: Settings) -> List[str]:
+    """Load every in-process model now; returns the keys that were loaded."""
+    ocr_model(settings)
+    if settings.llm_provider.lower().strip() in IN_PROCESS_PROVIDERS:
+        llm_provider(settings)
+    return sorted(_MODELS)
+
+
+def limit_torch_threads(threads: int) -> None:
+    """Cap torch's intra-op thread pool, and OpenMP/MKL pools started later, for this process."""
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[name] = str(threads)
+    # Importing torch costs hundreds of MiB; when no model needs it the environment is enough
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
@@ -0,0 +1 @@
+"HTTP response helpers."
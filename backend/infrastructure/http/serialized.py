@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Bodies smaller than this are sent as-is; compression overhead outweighs the savings
+MIN_COMPRESS_BYTES = 1024
+
+
+class SerializedPayload:
+    """JSON bytes of a model, serialized once, with lazily compressed variants and an ETag."""
+
+    __slots__ = ("body", "digest", "_encoded")
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._encoded: Dict[str, bytes] = {}
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        # Compressed variants get their own tag so caches never mix encodings
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> "SerializedPayload":
+        # pydantic-core serializes straight to JSON bytes without a dict round-trip
+        return cls(model.model_dump_json().encode("utf-8"))
+
+    def encoded(self, encoding: str) -> bytes:
+        cached = self._encoded.get(encoding)
+        if cached is None:
+            if encoding == "br" and brotli is not None:
+                cached = brotli.compress(self.body, quality=5)
+            elif encoding == "gzip":
+                cached = gzip.compress(self.body, compresslevel=6)
+            else:
+                cached = self.body
+            self._encoded[encoding] = cached
+        return cached
+
+
+def _choose_encoding(accept_encoding: str, size: int) -> Optional[str]:
+    if size < MIN_COMPRESS_BYTES:
+        return None
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if "br" in accepted and brotli is not None:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def negotiated_encoding(request: Request, payload: SerializedPayload) -> Optional[str]:
+    """Encoding `cached_json_response` will use, so callers can compress ahead of time off the loop."""
+    return _choose_encoding(request.headers.get("accept-encoding", ""), len(payload.body))
+
+
+def _etag_matches(if_none_match: str, digest: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        tag = candidate.strip().removeprefix("W/").strip('"')
+        # All encoding variants share the same content digest
+        if tag.split("-")[0] == digest:
+            return True
+    return False
+
+
+def cached_json_response(request: Request, payload: SerializedPayload) -> Response:
+    """Serve pre-serialized JSON, answering 304 for a matching If-None-Match."""
+    encoding = _choose_encoding(request.headers.get("accept-encoding", ""), len(payload.body))
+    headers = {"ETag": payload.etag(encoding), "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, payload.digest):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is None:
+        return Response(content=payload.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=payload.encoded(encoding), media_type="application/json", headers=headers)
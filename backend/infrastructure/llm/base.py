@@ -1,13 +1,85 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import Any, Mapping, Optional, Sequence
+
+from backend.infrastructure.llm.json_stream import FieldCallback
+
+# Answer field order: short fields the scorer needs first, the long free text last
+ANALYSIS_FIELDS = ("category", "risk_score", "risk_level", "summary", "risk_reason", "reasoning")
+CATEGORIES = ("payment", "termination", "responsibility", "penalty", "confidentiality", "general")
+RISK_LEVELS = ("low", "medium", "high")
+# Enum fields of the answer and their allowed values, as in the structured-output schema
+ANALYSIS_CHOICES = {"category": CATEGORIES, "risk_level": RISK_LEVELS}
+
+# Contract type prompts see at most this much of the document, a few hundred tokens
+CONTRACT_TYPE_SAMPLE_CHARS = 1500
+CONTRACT_TYPE_CLAUSE_CHARS = 200
+
+
+def contract_type_sample(
+    clauses: Sequence[Any], max_chars: int = CONTRACT_TYPE_SAMPLE_CHARS, clause_chars: int = CONTRACT_TYPE_CLAUSE_CHARS
+) -> str:
+    """A bounded excerpt of the document to infer its contract type from.
+
+    All clauses joined overflow the model context on long contracts (and, batched, pad every
+    other row to that length). The start of evenly spaced clauses, first one included, shows
+    the subject matter as well.
+    """
+    count = max(1, max_chars // clause_chars)
+    step = max(1, -(-len(clauses) // count))
+    return "\n\n".join(getattr(clause, "raw_text", "")[:clause_chars] for clause in clauses[::step][:count])
+
+
+def clause_analysis(data: Mapping[str, Any], raw: str) -> dict:
+    """Normalize a (possibly partial) `analyze_clause` answer.
+
+    Fields the model never got to stay empty; a missing score is left to the risk policy rather
+    than replaced by a made-up one.
+    """
+    if not data:
+        return {
+            "summary": raw[:200],
+            "category": "general",
+            "risk_score": None,
+            "risk_level": None,
+            "risk_reason": raw,
+            "reasoning": "",
+        }
+    try:
+        score: Optional[int] = max(0, min(100, int(data["risk_score"])))
+    except (KeyError, TypeError, ValueError):
+        score = None
+    category = data.get("category")
+    level = data.get("risk_level")
+    return {
+        "summary": data.get("summary"),
+        "category": category if category in CATEGORIES else "general",
+        "risk_score": score,
+        "risk_level": level if level in RISK_LEVELS else None,
+        "risk_reason": data.get("risk_reason") or "",
+        "reasoning": data.get("reasoning") or "",
+    }
+
+
+def report_fields(result: dict, on_field: Optional[FieldCallback]) -> dict:
+    """For providers that get the whole answer at once: report its fields in answer order."""
+    if on_field is not None:
+        for name in ANALYSIS_FIELDS:
+            if name in result:
+                on_field(name, result[name])
+    return result
 
 
 class LLMProvider(ABC):
     """Interface for LLM providers."""
 
-    async def analyze_clause(self, clause_text: str) -> dict:
-        """Optional: return structured analysis with summary/category/risk."""
+    async def analyze_clause(self, clause_text: str, on_field: Optional[FieldCallback] = None) -> dict:
+        """Optional: return structured analysis with summary/category/risk.
+
+        `on_field(name, value)` is called as each field becomes known; streaming providers call
+        it while the rest of the answer is still being generated.
+        """
         raise NotImplementedError
 
     @abstractmethod
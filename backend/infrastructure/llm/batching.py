@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_Pending = Tuple[T, "asyncio.Future[R]", float]
+
+
+class DynamicBatcher(Generic[T, R]):
+    """Merges concurrent `submit` calls into batches for a single `run_batch` call.
+
+    Items are grouped by `key` (for example the generation budget), so one batch never mixes
+    items that `run_batch` could not serve in a single pass. A group is dispatched as soon as
+    `max_batch_size` of its items are queued or `max_wait_ms` has passed since its oldest item
+    arrived. Callers that were cancelled while queued are dropped from the batch instead of
+    spending compute on them.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        key: Optional[Callable[[T], Hashable]] = None,
+    ) -> None:
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.key = key or (lambda item: None)
+        self.batches = 0
+        self.items = 0
+        # Insertion-ordered, so the first group is the one holding the oldest waiting item
+        self._pending: Dict[Hashable, List[_Pending]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task[None]] = None
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # Events and futures are bound to an event loop; rebuild when called from a new one
+            self._loop = loop
+            self._pending = {}
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+        future: asyncio.Future[R] = loop.create_future()
+        assert self._wakeup is not None
+        self._pending.setdefault(self.key(item), []).append((item, future, loop.time()))
+        self._wakeup.set()
+        return await future
+
+    async def _wait(self, timeout: Optional[float] = None) -> None:
+        """Sleep until something is submitted or `timeout` passes; no item is held while waiting."""
+        assert self._wakeup is not None
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _collect(self) -> List[Tuple[T, asyncio.Future[R]]]:
+        assert self._loop is not None
+        while not self._pending:
+            await self._wait()
+        group = next(iter(self._pending))
+        deadline = self._pending[group][0][2] + self.max_wait
+        while len(self._pending[group]) < self.max_batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            await self._wait(remaining)
+        waiting = self._pending.pop(group)
+        if len(waiting) > self.max_batch_size:
+            # The rest keep their arrival times and go to the back of the line
+            self._pending[group] = waiting[self.max_batch_size :]
+        return [(item, future) for item, future, _ in waiting[: self.max_batch_size]]
+
+    async def _run(self) -> None:
+        while True:
+            batch = [(item, future) for item, future in await self._collect() if not future.done()]
+            if not batch:
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = await self.run_batch([item for item, _ in batch])
+            except Exception as exc:  # noqa: BLE001
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from backend.infrastructure.llm.base import LLMProvider
+from typing import Optional
+
+from backend.infrastructure.llm.base import LLMProvider, report_fields
+from backend.infrastructure.llm.json_stream import FieldCallback
 
 
 class DummyLLMProvider(LLMProvider):
@@ -62,7 +65,7 @@ class DummyLLMProvider(LLMProvider):
 
         return f"{label}: " + " ".join(reasons)
 
-    async def analyze_clause(self, clause_text: str) -> dict:
+    async def analyze_clause(self, clause_text: str, on_field: Optional[FieldCallback] = None) -> dict:
         summary = await self.summarize_clause(clause_text)
         category = await self.classify_clause(clause_text)
         risk_text = await self.analyze_risk(clause_text)
@@ -72,14 +75,15 @@ class DummyLLMProvider(LLMProvider):
             score = 90
         elif risk_text.lower().startswith("medium"):
             score = 65
-        return {
-            "summary": summary,
+        result = {
             "category": category,
             "risk_score": score,
             "risk_level": "high" if score >= 75 else "medium" if score >= 50 else "low",
+            "summary": summary,
             "risk_reason": risk_text,
             "reasoning": f"Detected keywords for category '{category}', risk label inferred from heuristic.",
         }
+        return report_fields(result, on_field)
 
     async def infer_contract_type(self, clauses) -> str | None:
         text = " ".join([getattr(c, "raw_text", "") for c in clauses])
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import logging
+
+from backend.config import Settings
+from backend.infrastructure.llm.dummy_provider import DummyLLMProvider
+from backend.infrastructure.llm.openai_provider import OpenAILLMProvider
+
+logger = logging.getLogger(__name__)
+
+
+def create_provider(settings: Settings) -> object:
+    """Build the provider selected by `LLM_PROVIDER`; shared by the API and the queue workers."""
+    provider_choice = settings.llm_provider.lower().strip()
+
+    if provider_choice == "openai":
+        provider = OpenAILLMProvider(
+            api_key=settings.openai_api_key,
+            model=settings.openai_model,
+            base_url=settings.openai_base_url,
+            max_retries=settings.openai_max_retries,
+            stream=settings.openai_stream,
+            response_format=settings.openai_response_format,
+            field_token_caps=settings.openai_field_token_caps,
+        )
+        logger.info("Using OpenAI LLM provider with model %s", settings.openai_model)
+        return provider
+    if provider_choice in {"hf", "huggingface"}:
+        try:
+            from backend.infrastructure.llm.hf_provider import HuggingFaceLLMProvider
+
+            provider = HuggingFaceLLMProvider(
+                model=settings.hf_model,
+                token=settings.hf_token,
+                api_url=settings.hf_api_url,
+            )
+            logger.info("Using Hugging Face provider with model %s", settings.hf_model)
+            return provider
+        except Exception as exc:  # pragma: no cover - fallback path
+            logger.warning("Hugging Face provider init failed, falling back to DummyLLMProvider: %s", exc)
+            return DummyLLMProvider()
+    if provider_choice == "local":
+        try:
+            from backend.infrastructure.llm.local_provider import LocalLLMProvider
+
+            provider = LocalLLMProvider(
+                model=settings.local_model,
+                max_batch_size=settings.local_max_batch_size,
+                max_wait_ms=settings.local_max_wait_ms,
+                num_threads=settings.local_num_threads,
+            )
+            logger.info("Using local CPU provider with model %s", settings.local_model)
+            return provider
+        except Exception as exc:  # pragma: no cover - fallback path
+            logger.warning("Local provider init failed, falling back to DummyLLMProvider: %s", exc)
+            return DummyLLMProvider()
+    logger.info("Using Dummy LLM provider")
+    return DummyLLMProvider()
@@ -4,7 +4,8 @@ import asyncio
 import json
 from typing import Optional
 
-from backend.infrastructure.llm.base import LLMProvider
+from backend.infrastructure.llm.base import ANALYSIS_CHOICES, LLMProvider, clause_analysis, contract_type_sample, report_fields
+from backend.infrastructure.llm.json_stream import FieldCallback, parse_partial_json
 
 try:
     from huggingface_hub import InferenceClient
@@ -67,7 +68,7 @@ class HuggingFaceLLMProvider(LLMProvider):
         system = "You point out potential risks in contract clauses in Korean, concisely."
         return await self._invoke(system, user_prompt, max_new_tokens=128)
 
-    async def analyze_clause(self, clause_text: str) -> dict:
+    async def analyze_clause(self, clause_text: str, on_field: Optional[FieldCallback] = None) -> dict:
         system = (
             "You are a Korean contract analysis agent. Use only the given clause text; do NOT invent amounts, dates, or names. "
             "If a field is missing, set it to null. Return JSON with fields: "
@@ -76,34 +77,16 @@ class HuggingFaceLLMProvider(LLMProvider):
             "Output JSON only."
         )
         raw = await self._invoke(system, clause_text, max_new_tokens=196)
-        try:
-            data = json.loads(raw)
-            return {
-                "summary": data.get("summary") or raw,
-                "category": data.get("category") or "general",
-                "risk_score": int(data.get("risk_score", 0)),
-                "risk_level": data.get("risk_level") or "low",
-                "risk_reason": data.get("risk_reason") or "",
-                "reasoning": data.get("reasoning") or "",
-            }
-        except Exception:
-            return {
-                "summary": raw[:200],
-                "category": "general",
-                "risk_score": 40,
-                "risk_level": "medium",
-                "risk_reason": raw,
-                "reasoning": "",
-            }
+        # Keeps whatever fields a truncated or fenced answer does contain
+        return report_fields(clause_analysis(parse_partial_json(raw, ANALYSIS_CHOICES), raw), on_field)
 
     async def infer_contract_type(self, clauses) -> str | None:
         prompt = (
             "다음 계약 조항이 어떤 계약 유형에 속하는지 하나로 분류하세요. employment(근로/용역), lease(임대차), general 중 하나. "
             "JSON {\"type\": \"...\", \"reason\": \"...\"} 만 반환."
         )
-        joined = "\n\n".join([getattr(c, "raw_text", "") for c in clauses])
         try:
-            raw = await self._invoke(prompt, joined, max_new_tokens=64)
+            raw = await self._invoke(prompt, contract_type_sample(clauses), max_new_tokens=64)
             data = json.loads(raw)
             return data.get("type")
         except Exception:
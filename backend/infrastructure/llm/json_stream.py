@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Collection, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+# Called with (field, value) as soon as a top-level field of the answer is known
+FieldCallback = Callable[[str, Any], None]
+
+_INCOMPLETE_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{0,3})?$")
+
+
+def _decode_string(raw: str) -> str:
+    # A cut-off stream can end inside an escape sequence; drop it rather than fail the field
+    raw = _INCOMPLETE_ESCAPE.sub("", raw)
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return raw
+
+
+def _decode_scalar(raw: str) -> Any:
+    raw = raw.strip()
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return raw or None
+
+
+class StreamingJSONParser:
+    """Incremental parser for the flat JSON object an LLM streams back, one chunk at a time.
+
+    `feed` returns the top-level fields that completed in that chunk, so early fields (category,
+    risk_score) can be used while later ones are still being generated. Leading prose or a
+    ```json fence before the object is skipped.
+
+    `field_caps` bounds string fields in streamed chunks (one chunk is about one token): once a
+    field runs past its cap, the text so far is reported as final and the rest of it is skipped.
+    With `fields` given, `exhausted` tells the caller it can stop reading because every expected
+    field is final. `finish` salvages what a truncated answer contains instead of discarding it.
+    Fields listed in `choices` are enums: a value outside the allowed ones, such as "termin" cut
+    off from "termination", is dropped rather than reported.
+    """
+
+    def __init__(
+        self,
+        field_caps: Optional[Mapping[str, int]] = None,
+        fields: Sequence[str] = (),
+        choices: Optional[Mapping[str, Collection[str]]] = None,
+    ) -> None:
+        self.field_caps = dict(field_caps or {})
+        self.fields = tuple(fields)
+        self.choices = dict(choices or {})
+        self.values: Dict[str, Any] = {}
+        self.tokens: Dict[str, int] = {}
+        self.capped: Set[str] = set()
+        self.closed = False
+        self.chunks = 0
+        self._state = "start"
+        self._key = ""
+        self._buf: List[str] = []
+        self._escape = False
+        self._depth = 0
+        self._nested_string = False
+
+    @property
+    def exhausted(self) -> bool:
+        return self.closed or (bool(self.fields) and all(name in self.values for name in self.fields))
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.chunks += 1
+        completed: List[Tuple[str, Any]] = []
+        touched: Set[str] = set()
+        for ch in chunk:
+            if self.closed:
+                break
+            self._step(ch, completed, touched)
+        for name in touched:
+            self.tokens[name] = self.tokens.get(name, 0) + 1
+            cap = self.field_caps.get(name)
+            if cap is not None and self.tokens[name] >= cap and name == self._key and self._state == "string":
+                value = _decode_string("".join(self._buf))
+                self.capped.add(name)
+                self._buf = []
+                self._complete(name, value, completed)
+        return completed
+
+    def finish(self) -> Dict[str, Any]:
+        """All fields received; a string cut off mid-value is kept as far as it got.
+
+        A cut-off number or literal is dropped: "8" out of "82" would be wrong, not just short.
+        So is a cut-off enum value that is not one of its `choices`.
+        """
+        values = dict(self.values)
+        if self._state == "string" and self._key not in values:
+            value = _decode_string("".join(self._buf))
+            if self._allowed(self._key, value):
+                values[self._key] = value
+        return values
+
+    def _allowed(self, name: str, value: Any) -> bool:
+        allowed = self.choices.get(name)
+        return allowed is None or value in allowed
+
+    def _complete(self, name: str, value: Any, completed: List[Tuple[str, Any]]) -> None:
+        # A capped field was already reported; its real end only moves the parser on
+        if name in self.values or not self._allowed(name, value):
+            return
+        self.values[name] = value
+        completed.append((name, value))
+
+    def _step(self, ch: str, completed: List[Tuple[str, Any]], touched: Set[str]) -> None:
+        state = self._state
+        if state == "start":
+            if ch == "{":
+                self._state = "key_or_end"
+        elif state == "key_or_end":
+            if ch == '"':
+                self._state, self._buf = "key", []
+            elif ch == "}":
+                self.closed = True
+        elif state == "key":
+            if self._escape:
+                self._escape = False
+                self._buf.append(ch)
+            elif ch == "\\":
+                self._escape = True
+                self._buf.append(ch)
+            elif ch == '"':
+                self._key, self._buf = _decode_string("".join(self._buf)), []
+                self._state = "colon"
+            else:
+                self._buf.append(ch)
+        elif state == "colon":
+            if ch == ":":
+                self._state = "value"
+        elif state == "value":
+            if ch.isspace():
+                return
+            if ch == '"':
+                self._state = "string"
+            elif ch in "{[":
+                self._state, self._buf, self._depth, self._nested_string = "nested", [ch], 1, False
+            else:
+                self._state, self._buf = "scalar", [ch]
+                touched.add(self._key)
+        elif state == "string":
+            keep = self._key not in self.capped
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                if keep:
+                    self._complete(self._key, _decode_string("".join(self._buf)), completed)
+                self._buf = []
+                self._state = "after_value"
+                return
+            if keep:
+                self._buf.append(ch)
+                touched.add(self._key)
+        elif state == "nested":
+            self._buf.append(ch)
+            if self._nested_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._nested_string = False
+                return
+            if ch == '"':
+                self._nested_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    raw = "".join(self._buf)
+                    try:
+                        value: Any = json.loads(raw)
+                    except json.JSONDecodeError:
+                        value = raw
+                    self._complete(self._key, value, completed)
+                    self._state, self._buf = "after_value", []
+        elif state == "scalar":
+            if ch in ",}" or ch.isspace():
+                self._complete(self._key, _decode_scalar("".join(self._buf)), completed)
+                self._buf = []
+                self._state = "key_or_end" if ch == "," else "after_value"
+                if ch == "}":
+                    self.closed = True
+            else:
+                self._buf.append(ch)
+                touched.add(self._key)
+        elif state == "after_value":
+            if ch == ",":
+                self._state = "key_or_end"
+            elif ch == "}":
+                self.closed = True
+
+
+def parse_partial_json(raw: str, choices: Optional[Mapping[str, Collection[str]]] = None) -> Dict[str, Any]:
+    """Fields of a possibly fenced or truncated JSON object; empty when there is none."""
+    parser = StreamingJSONParser(choices=choices)
+    parser.feed(raw)
+    return parser.finish()
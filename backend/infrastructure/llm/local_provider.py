@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Dict, List, Optional, Tuple
+
+from backend.infrastructure.llm.base import ANALYSIS_CHOICES, LLMProvider, clause_analysis, contract_type_sample, report_fields
+from backend.infrastructure.llm.batching import DynamicBatcher
+from backend.infrastructure.llm.json_stream import FieldCallback, parse_partial_json
+from backend.infrastructure.metrics.prometheus import LLM_TOKENS
+
+try:
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+except ImportError as exc:  # pragma: no cover - optional dependency
+    raise ImportError("Install torch and transformers to use LocalLLMProvider.") from exc
+
+# (system prompt, user prompt, max new tokens)
+_Request = Tuple[str, str, int]
+
+
+class LocalLLMProvider(LLMProvider):
+    """Offline provider running a small instruction-tuned model on CPU in-process.
+
+    Concurrent calls, including calls from different documents, are merged by a
+    `DynamicBatcher` into one padded `generate` forward pass.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+        num_threads: Optional[int] = None,
+    ) -> None:
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.model = model
+        self.tokenizer = AutoTokenizer.from_pretrained(model)
+        # Decoder-only models must be left-padded so every row continues from its own prompt
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.engine = AutoModelForCausalLM.from_pretrained(model, torch_dtype=torch.float32)
+        self.engine.eval()
+        self.context_tokens = int(getattr(self.engine.config, "max_position_embeddings", 0) or self.tokenizer.model_max_length)
+        self._template_tokens: Dict[str, int] = {}
+        self.batcher: DynamicBatcher[_Request, str] = DynamicBatcher(
+            self._generate_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            # One generate call runs to a single max_new_tokens; a 196-token call must not make
+            # an 8-token one wait for it
+            key=lambda request: request[2],
+        )
+
+    def _render(self, system_prompt: str, user_prompt: str) -> str:
+        if getattr(self.tokenizer, "chat_template", None):
+            return self.tokenizer.apply_chat_template(
+                [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+                tokenize=False,
+                add_generation_prompt=True,
+            )
+        return f"{system_prompt}\n\n{user_prompt}\n"
+
+    def _generate_sync(self, requests: List[_Request]) -> List[str]:
+        prompts = [self._render(system, user) for system, user, _ in requests]
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True)
+        with torch.inference_mode():
+            output = self.engine.generate(
+                **inputs,
+                max_new_tokens=requests[0][2],
+                do_sample=False,
+                pad_token_id=self.tokenizer.pad_token_id,
+            )
+        prompt_len = inputs["input_ids"].shape[1]
+        texts = []
+        completion_tokens = 0
+        for row in output:
+            generated = row[prompt_len:]
+            completion_tokens += int((generated != self.tokenizer.pad_token_id).sum())
+            texts.append(self.tokenizer.decode(generated, skip_special_tokens=True).strip())
+        LLM_TOKENS.inc(int(inputs["attention_mask"].sum()), provider="LocalLLMProvider", model=self.model, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, provider="LocalLLMProvider", model=self.model, kind="completion")
+        return texts
+
+    async def _generate_batch(self, requests: List[_Request]) -> List[str]:
+        # torch releases the GIL during generate, so the event loop stays responsive
+        return await asyncio.to_thread(self._generate_sync, requests)
+
+    def _fit(self, system_prompt: str, user_prompt: str, max_new_tokens: int) -> str:
+        """Cut the user prompt so the rendered prompt and the answer fit in the model's context."""
+        overhead = self._template_tokens.get(system_prompt)
+        if overhead is None:
+            overhead = len(self.tokenizer(self._render(system_prompt, ""), add_special_tokens=False)["input_ids"])
+            self._template_tokens[system_prompt] = overhead
+        budget = max(0, self.context_tokens - max_new_tokens - overhead - 2)
+        if not self.tokenizer.is_fast:
+            ids = self.tokenizer(user_prompt, add_special_tokens=False)["input_ids"]
+            return user_prompt if len(ids) <= budget else self.tokenizer.decode(ids[:budget], skip_special_tokens=True)
+        # Cut the string at a token boundary rather than decoding tokens, which need not round-trip
+        offsets = self.tokenizer(user_prompt, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        if len(offsets) <= budget:
+            return user_prompt
+        return user_prompt[: offsets[budget - 1][1]] if budget else ""
+
+    async def _invoke(self, system_prompt: str, user_prompt: str, max_new_tokens: int = 128) -> str:
+        return await self.batcher.submit((system_prompt, self._fit(system_prompt, user_prompt, max_new_tokens), max_new_tokens))
+
+    async def summarize_clause(self, clause_text: str) -> str:
+        user_prompt = (
+            "한글 계약 조항을 한 문장으로 요약하세요. 법률 자문 표현은 피하고 핵심만 적어주세요.\n\n"
+            f"조항:\n{clause_text}\n\n요약:"
+        )
+        system = "You summarize Korean contract clauses concisely."
+        return await self._invoke(system, user_prompt, max_new_tokens=96)
+
+    async def classify_clause(self, clause_text: str) -> str:
+        user_prompt = (
+            "계약 조항을 카테고리 하나로 반환하세요. "
+            "가능한 라벨: payment, termination, responsibility, penalty, confidentiality, general.\n\n"
+            f"조항:\n{clause_text}\n\n라벨:"
+        )
+        system = "You classify contract clauses into one label."
+        return await self._invoke(system, user_prompt, max_new_tokens=8)
+
+    async def analyze_risk(self, clause_text: str) -> str:
+        user_prompt = (
+            "계약 조항의 잠재적 위험을 간단히 설명하세요. "
+            "법률 자문이 아님을 전제로, 한국어로 짧게 위험 신호만 적어주세요.\n\n"
+            f"조항:\n{clause_text}\n\n위험 설명:"
+        )
+        system = "You point out potential risks in contract clauses in Korean, concisely."
+        return await self._invoke(system, user_prompt, max_new_tokens=128)
+
+    async def analyze_clause(self, clause_text: str, on_field: Optional[FieldCallback] = None) -> dict:
+        system = (
+            "You are a Korean contract analysis agent. Use only the given clause text; do NOT invent amounts, dates, or names. "
+            "If a field is missing, set it to null. Return JSON with fields: "
+            "summary, category(one of payment, termination, responsibility, penalty, confidentiality, general), "
+            "risk_score(0-100 integer), risk_level(low|medium|high), risk_reason(short Korean explanation), reasoning(short bullet style). "
+            "Output JSON only."
+        )
+        raw = await self._invoke(system, clause_text, max_new_tokens=196)
+        # Keeps whatever fields a truncated or fenced answer does contain
+        return report_fields(clause_analysis(parse_partial_json(raw, ANALYSIS_CHOICES), raw), on_field)
+
+    async def infer_contract_type(self, clauses) -> str | None:
+        prompt = (
+            "다음 계약 조항이 어떤 계약 유형에 속하는지 하나로 분류하세요. employment(근로/용역), lease(임대차), general 중 하나. "
+            "JSON {\"type\": \"...\", \"reason\": \"...\"} 만 반환."
+        )
+        try:
+            raw = await self._invoke(prompt, contract_type_sample(clauses), max_new_tokens=64)
+            data = json.loads(raw)
+            return data.get("type")
+        except Exception:
+            return None
+
+    async def suggest_improvement(self, clause_text: str) -> dict:
+        prompt = (
+            "다음 계약 조항을 더 공정하고 균형 있게 수정한 제안을 JSON으로 반환하세요. "
+            "필드: suggestion(수정안), rationale(이유), risk_delta(정수, 위험 감소는 음수). "
+        )
+        try:
+            raw = await self._invoke(prompt, clause_text, max_new_tokens=196)
+            data = json.loads(raw)
+            return {
+                "suggestion": data.get("suggestion") or clause_text,
+                "rationale": data.get("rationale") or "",
+                "risk_delta": int(data.get("risk_delta", 0)),
+            }
+        except Exception:
+            return {"suggestion": clause_text, "rationale": "", "risk_delta": 0}
@@ -1,93 +1,198 @@
 from __future__ import annotations
 
+import json
 import os
-from typing import Optional
-
-from backend.infrastructure.llm.base import LLMProvider
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from backend.infrastructure.llm.base import (
+    ANALYSIS_CHOICES,
+    ANALYSIS_FIELDS,
+    CATEGORIES,
+    RISK_LEVELS,
+    LLMProvider,
+    clause_analysis,
+    contract_type_sample,
+    report_fields,
+)
+from backend.infrastructure.llm.json_stream import FieldCallback, StreamingJSONParser, parse_partial_json
+from backend.infrastructure.metrics.prometheus import LLM_FIELDS_CAPPED, LLM_TOKENS
 
 try:
     from openai import AsyncOpenAI
 except ImportError:  # pragma: no cover - optional dependency
     AsyncOpenAI = None
 
+# Output-token caps for the free-text analysis fields; the schema already bounds the others
+DEFAULT_FIELD_TOKEN_CAPS: Dict[str, int] = {"summary": 120, "risk_reason": 160, "reasoning": 240}
+# Keys, punctuation and the short enum/number fields on top of the capped text
+_JSON_OVERHEAD_TOKENS = 64
+RESPONSE_FORMATS = ("json_schema", "json_object", "none")
+
+# Property order is generation order under structured outputs: scoring fields come first
+_ANALYSIS_SCHEMA = {
+    "name": "clause_analysis",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "required": list(ANALYSIS_FIELDS),
+        "properties": {
+            "category": {"type": "string", "enum": list(CATEGORIES)},
+            "risk_score": {"type": "integer"},
+            "risk_level": {"type": "string", "enum": list(RISK_LEVELS)},
+            "summary": {"type": ["string", "null"]},
+            "risk_reason": {"type": "string"},
+            "reasoning": {"type": "string"},
+        },
+    },
+}
+
 
 class OpenAILLMProvider(LLMProvider):
     """Thin wrapper around OpenAI chat completions."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini") -> None:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        base_url: Optional[str] = None,
+        max_retries: int = 2,
+        stream: bool = True,
+        response_format: str = "json_schema",
+        field_token_caps: Optional[Mapping[str, int]] = None,
+    ) -> None:
         if AsyncOpenAI is None:
             raise ImportError("Install openai>=1.0.0 to use OpenAILLMProvider.")
-        self.client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        # base_url lets the provider target any OpenAI-compatible server, e.g. the load-test mock
+        self.client = AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=base_url or os.getenv("OPENAI_BASE_URL"),
+            max_retries=max_retries,
+        )
         self.model = model
-
-    async def _call(self, system_prompt: str, user_prompt: str) -> str:
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError(f"response_format must be one of {', '.join(RESPONSE_FORMATS)}")
+        self.stream = stream
+        self.response_format = response_format
+        self.field_token_caps = {**DEFAULT_FIELD_TOKEN_CAPS, **(field_token_caps or {})}
+        self.analysis_max_tokens = sum(self.field_token_caps.values()) + _JSON_OVERHEAD_TOKENS
+
+    def _format(self, schema: Optional[dict] = None) -> Optional[dict]:
+        if self.response_format == "none":
+            return None
+        if self.response_format == "json_schema" and schema is not None:
+            return {"type": "json_schema", "json_schema": schema}
+        return {"type": "json_object"}
+
+    def _request(self, system_prompt: str, user_prompt: str, max_tokens: int, response_format: Optional[dict]) -> dict:
+        request = {
+            "model": self.model,
+            "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-            temperature=0.1,
+            "temperature": 0.1,
+            "max_tokens": max_tokens,
+        }
+        if response_format is not None:
+            request["response_format"] = response_format
+        return request
+
+    def _record_usage(self, prompt_tokens: Optional[int], completion_tokens: int) -> None:
+        if prompt_tokens is not None:
+            LLM_TOKENS.inc(prompt_tokens, provider="OpenAILLMProvider", model=self.model, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, provider="OpenAILLMProvider", model=self.model, kind="completion")
+
+    async def _call(
+        self, system_prompt: str, user_prompt: str, max_tokens: int = 256, response_format: Optional[dict] = None
+    ) -> str:
+        response = await self.client.chat.completions.create(
+            **self._request(system_prompt, user_prompt, max_tokens, response_format)
         )
+        if response.usage is not None:
+            self._record_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
         return response.choices[0].message.content or ""
 
+    async def _stream_fields(
+        self, system_prompt: str, user_prompt: str, on_field: Optional[FieldCallback]
+    ) -> Tuple[Dict[str, object], str]:
+        """Stream the analysis answer, reporting each field as it completes.
+
+        Reading stops once every field is final, which includes fields cut off at their cap;
+        closing the stream then ends generation instead of paying for text that is dropped.
+        """
+        parser = StreamingJSONParser(self.field_token_caps, ANALYSIS_FIELDS, ANALYSIS_CHOICES)
+        raw: List[str] = []
+        usage = None
+        stream = await self.client.chat.completions.create(
+            **self._request(system_prompt, user_prompt, self.analysis_max_tokens, self._format(_ANALYSIS_SCHEMA)),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        try:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                raw.append(delta)
+                for name, value in parser.feed(delta):
+                    if on_field is not None:
+                        on_field(name, value)
+                if parser.exhausted:
+                    break
+        finally:
+            await stream.close()
+        for name in parser.capped:
+            LLM_FIELDS_CAPPED.inc(model=self.model, field=name)
+        if usage is not None:
+            self._record_usage(usage.prompt_tokens, usage.completion_tokens)
+        else:
+            # Stopped before the usage chunk: count streamed chunks, about one token each
+            self._record_usage(None, parser.chunks)
+        return parser.finish(), "".join(raw)
+
     async def summarize_clause(self, clause_text: str) -> str:
         system = "You are a contract clause summarizer. Answer in Korean in one sentence."
-        return await self._call(system, clause_text)
+        return await self._call(system, clause_text, max_tokens=self.field_token_caps["summary"])
 
     async def classify_clause(self, clause_text: str) -> str:
         system = "You are a classifier that returns one label: payment, termination, responsibility, penalty, confidentiality, or general."
-        return await self._call(system, clause_text)
+        return await self._call(system, clause_text, max_tokens=16)
 
     async def analyze_risk(self, clause_text: str) -> str:
         system = (
             "You highlight potential risks in contract clauses. "
             "Provide concise Korean explanation and avoid legal advice language."
         )
-        return await self._call(system, clause_text)
+        return await self._call(system, clause_text, max_tokens=self.field_token_caps["risk_reason"])
 
-    async def analyze_clause(self, clause_text: str) -> dict:
+    async def analyze_clause(self, clause_text: str, on_field: Optional[FieldCallback] = None) -> dict:
         system = (
             "You are a Korean contract analysis agent. Use only the provided clause text; do NOT invent amounts, dates, or names. "
-            "If a field is missing in the clause, set it to null. Return JSON with fields: "
-            "summary, category(one of payment, termination, responsibility, penalty, confidentiality, general), "
-            "risk_score(0-100 integer), risk_level(low|medium|high), risk_reason(short Korean explanation). "
-            "reasoning(bullet-style short reasoning). Output JSON only."
+            "If a field is missing in the clause, set it to null. Return JSON with fields in this order: "
+            "category(one of payment, termination, responsibility, penalty, confidentiality, general), "
+            "risk_score(0-100 integer), risk_level(low|medium|high), summary(one sentence), "
+            "risk_reason(short Korean explanation), reasoning(at most three short bullets). Output JSON only."
         )
-        raw = await self._call(system, clause_text)
-        try:
-            import json
-
-            data = json.loads(raw)
-            return {
-                "summary": data.get("summary") or raw,
-                "category": data.get("category") or "general",
-                "risk_score": int(data.get("risk_score", 0)),
-                "risk_level": data.get("risk_level") or "low",
-                "risk_reason": data.get("risk_reason") or "",
-                "reasoning": data.get("reasoning") or "",
-            }
-        except Exception:
-            # Fallback: keep raw text in reason
-            return {
-                "summary": raw[:200],
-                "category": "general",
-                "risk_score": 40,
-                "risk_level": "medium",
-                "risk_reason": raw,
-                "reasoning": "",
-            }
+        if self.stream:
+            data, raw = await self._stream_fields(system, clause_text, on_field)
+            return clause_analysis(data, raw)
+        raw = await self._call(system, clause_text, self.analysis_max_tokens, self._format(_ANALYSIS_SCHEMA))
+        # A reply cut off at max_tokens still carries its leading fields
+        return report_fields(clause_analysis(parse_partial_json(raw, ANALYSIS_CHOICES), raw), on_field)
 
     async def infer_contract_type(self, clauses) -> str | None:
-        joined = "\n\n".join([getattr(c, "raw_text", "") for c in clauses])
+        joined = contract_type_sample(clauses)
         prompt = (
             "다음 계약 조항들이 어떤 계약 유형인지 하나로 분류하세요. employment(근로/용역), lease(임대차), general 중 선택하고, 근거 한 문장을 함께 JSON으로 반환하세요. "
             f"조항들:\n{joined}\nJSON: {{\"type\": \"employment|lease|general\", \"reason\": \"근거\"}}"
         )
         try:
-            import json
-
-            raw = await self._call("You classify contract type.", prompt)
+            raw = await self._call("You classify contract type.", prompt, max_tokens=96, response_format=self._format())
             data = json.loads(raw)
             return data.get("type")
         except Exception:
@@ -100,9 +205,9 @@ class OpenAILLMProvider(LLMProvider):
             f"조항:\n{clause_text}\nJSON:"
         )
         try:
-            import json
-
-            raw = await self._call("You improve risky contract clauses.", prompt)
+            raw = await self._call(
+                "You improve risky contract clauses.", prompt, max_tokens=400, response_format=self._format()
+            )
             data = json.loads(raw)
             return {
                 "suggestion": data.get("suggestion") or clause_text,
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from backend.infrastructure.metrics.prometheus import REGISTRY, Histogram
+
+LOOP_LAG = REGISTRY.register(
+    Histogram(
+        "cg_event_loop_lag_seconds",
+        "How late the event loop woke a periodic probe.",
+        buckets=(0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+    )
+)
+
+
+class LoopLagMonitor:
+    """Sleeps `interval_s` in a loop and records how much later than scheduled it woke up.
+
+    Any synchronous work on the loop longer than a few milliseconds shows up as lag.
+    """
+
+    def __init__(self, interval_s: float = 0.05, window: int = 1200) -> None:
+        self.interval_s = interval_s
+        self.recent: Deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            lag = max(0.0, time.perf_counter() - expected)
+            self.recent.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+
+    def snapshot(self) -> dict:
+        lags = sorted(self.recent)
+        if not lags:
+            return {"samples": 0, "interval_ms": self.interval_s * 1000}
+        return {
+            "samples": len(lags),
+            "interval_ms": self.interval_s * 1000,
+            "p50_ms": round(lags[len(lags) // 2] * 1000, 3),
+            "p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000, 3),
+            "window_max_ms": round(lags[-1] * 1000, 3),
+            "max_ms": round(self.max_lag * 1000, 3),
+        }
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import resource
+import sys
+from pathlib import Path
+from typing import Dict, Union
+
+_SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared",
+    "Shared_Dirty": "shared",
+    "Private_Clean": "private",
+    "Private_Dirty": "private",
+    "Swap": "swap",
+}
+
+
+def memory_usage(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """Memory of one process in bytes.
+
+    ``rss`` counts shared pages in full in every process that maps them, so it overstates pre-fork
+    workers; ``pss`` splits each shared page between its sharers (the sum over all workers is the
+    real footprint) and ``private`` is what the process alone would free on exit. Linux only;
+    elsewhere just the peak RSS of the current process is reported.
+    """
+    rollup = Path(f"/proc/{pid}/smaps_rollup")
+    if not rollup.exists():
+        if pid != "self":
+            raise FileNotFoundError(rollup)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        return {"max_rss": peak if sys.platform == "darwin" else peak * 1024}
+    usage = {"rss": 0, "pss": 0, "shared": 0, "private": 0, "swap": 0}
+    for line in rollup.read_text().splitlines():
+        name, _, rest = line.partition(":")
+        key = _SMAPS_FIELDS.get(name)
+        if key is not None:
+            usage[key] += int(rest.split()[0]) * 1024
+    return usage
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] | None = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (non-cumulative count per bucket with a trailing +Inf slot, [sum])
+        self.series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self.series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total[0]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Prometheus text-format registry; collectors contribute lines computed at scrape time."""
+
+    def __init__(self) -> None:
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, documentation: str, samples: Dict[str, float], label: str = "") -> List[str]:
+    """Render a gauge family for collectors; keys of `samples` become values of `label`."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for key, value in samples.items():
+        lines.append(f"{name}{_format_labels((label,), (key,)) if label else ''} {value}")
+    return lines
+
+
+REGISTRY = Registry()
+
+STAGE_DURATION: Histogram = REGISTRY.register(  # type: ignore[assignment]
+    Histogram(
+        "cg_stage_duration_seconds",
+        "Analysis pipeline stage duration.",
+        ("stage", "provider", "model", "contract_type"),
+    )
+)
+LLM_CALL_DURATION: Histogram = REGISTRY.register(  # type: ignore[assignment]
+    Histogram("cg_llm_call_duration_seconds", "Duration of one LLM provider call.", ("provider", "model", "method"))
+)
+LLM_CALLS: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("cg_llm_calls_total", "LLM provider calls by outcome.", ("provider", "model", "method", "outcome"))
+)
+LLM_TOKENS: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("cg_llm_tokens_total", "Tokens reported by the LLM backend.", ("provider", "model", "kind"))
+)
+LLM_FALLBACKS: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("cg_llm_fallbacks_total", "Clauses that fell back to the [LLM error] defaults.", ("provider", "model"))
+)
+LLM_FIELDS_CAPPED: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("cg_llm_fields_capped_total", "Streamed answer fields cut off at their output-token cap.", ("model", "field"))
+)
+CACHE_HITS: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("cg_cache_hits_total", "Cache hits by cache.", ("cache",))
+)
+CACHE_MISSES: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("cg_cache_misses_total", "Cache misses by cache.", ("cache",))
+)
+OCR_PAGES: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("cg_ocr_pages_total", "Pages or images run through text extraction.", ("engine",))
+)
+TEMPLATE_CLAUSES: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter(
+        "cg_template_clauses_total",
+        "Clauses of template-matched documents, reused from the template or sent to the LLM.",
+        ("outcome",),
+    )
+)
+
+
+def provider_labels(provider: object) -> Dict[str, str]:
+    return {"provider": type(provider).__name__, "model": str(getattr(provider, "model", "") or "none")}
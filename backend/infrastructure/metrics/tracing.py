@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_NOOP: ContextManager[None] = nullcontext()
+
+
+class Trace:
+    """Span timeline for one profiled request.
+
+    The active trace lives in a context variable, so tasks created by the request and work sent
+    to `asyncio.to_thread` record into it as well.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, name: str, started: float, ended: float, attrs: Dict[str, Any]) -> None:
+        span = {
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 3),
+            "duration_ms": round((ended - started) * 1000, 3),
+            "thread": threading.current_thread().name,
+            **attrs,
+        }
+        with self._lock:
+            self.spans.append(span)
+
+    def timeline(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return sorted(self.spans, key=lambda span: span["start_ms"])
+
+
+@contextmanager
+def activate(trace: Trace) -> Iterator[Trace]:
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def record_span(name: str, started: float, ended: float, **attrs: Any) -> None:
+    """Record an already-timed block (perf_counter bounds) into the active trace, if any."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(name, started, ended, attrs)
+
+
+def span(name: str, **attrs: Any) -> ContextManager[None]:
+    """Time a block into the active trace; a shared no-op context when nothing is being profiled."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP
+    return _recording_span(trace, name, attrs)
+
+
+@contextmanager
+def _recording_span(trace: Trace, name: str, attrs: Dict[str, Any]) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.record(name, started, time.perf_counter(), attrs)
@@ -5,6 +5,8 @@ from pathlib import Path
 from typing import Optional
 
 from backend.application.ocr_service import OCRService
+from backend.infrastructure.metrics.prometheus import OCR_PAGES
+from backend.infrastructure.metrics.tracing import span
 
 try:
     import easyocr  # type: ignore
@@ -47,7 +49,9 @@ class TesseractOCRAdapter(OCRService):
                 return "OCR unavailable: install easyocr, torch, and pillow."
 
         try:
-            lines = self.reader.readtext(str(file_path), detail=0, paragraph=True)
+            with span("ocr.image", engine="easyocr"):
+                lines = self.reader.readtext(str(file_path), detail=0, paragraph=True)
+            OCR_PAGES.inc(engine="easyocr")
             return "\n".join(lines).strip()
         except Exception:
             # As a last resort, attempt simple file read for text-like inputs
@@ -61,7 +65,11 @@ class TesseractOCRAdapter(OCRService):
         if fitz is not None:
             try:
                 with fitz.open(str(file_path)) as doc:
-                    pages = [page.get_text("text") or "" for page in doc]
+                    pages = []
+                    for number, page in enumerate(doc, start=1):
+                        with span("ocr.page", engine="pymupdf", page=number):
+                            pages.append(page.get_text("text") or "")
+                OCR_PAGES.inc(len(pages), engine="pymupdf")
                 text = "\n\n".join(pages).strip()
                 if text:
                     return text
@@ -71,7 +79,11 @@ class TesseractOCRAdapter(OCRService):
         if pdfplumber is not None:
             try:
                 with pdfplumber.open(str(file_path)) as pdf:
-                    pages = [page.extract_text() or "" for page in pdf.pages]
+                    pages = []
+                    for number, page in enumerate(pdf.pages, start=1):
+                        with span("ocr.page", engine="pdfplumber", page=number):
+                            pages.append(page.extract_text() or "")
+                OCR_PAGES.inc(len(pages), engine="pdfplumber")
                 return "\n\n".join(pages).strip()
             except Exception:
                 pass
@@ -0,0 +1 @@
+"Durable work queue shared by API and worker processes."
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+ACTIVE = ("queued", "leased")
+FINISHED = ("done", "failed", "cancelled")
+_IS_ACTIVE = "status IN ('queued', 'leased')"
+# `error` of jobs whose document was deleted
+DELETED = "deleted"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    stage TEXT NOT NULL DEFAULT '',
+    progress INTEGER NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    error TEXT,
+    version INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status);
+CREATE INDEX IF NOT EXISTS jobs_version ON jobs (version);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO counters (name, value) SELECT 'version', COALESCE(MAX(version), 0) FROM jobs;
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    key: Optional[str]
+    payload: dict
+    status: str
+    attempts: int
+    worker: Optional[str]
+    lease_until: Optional[float]
+    stage: str
+    progress: int
+    message: str
+    result: Optional[str]
+    error: Optional[str]
+    version: int
+    created_at: float
+    updated_at: float
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        data = dict(row)
+        data["payload"] = json.loads(data["payload"])
+        return cls(**data)
+
+
+class SQLiteWorkQueue:
+    """Job queue in a SQLite file shared by API processes (producers) and workers (consumers).
+
+    A worker `claim`s a job under a lease and keeps it with `heartbeat`; a lease that runs out
+    (crashed or hung worker) puts the job back in the queue until `max_attempts` is used up.
+    Every change bumps a global `version`, so readers can follow progress and results with
+    `changes(since)` instead of polling each job. Jobs sharing a `key` (one per document) are
+    coalesced: enqueueing the same payload returns the active job, a different one supersedes it.
+
+    WAL mode needs all processes on one host; for a file on network storage pass
+    ``journal_mode="delete"`` and make sure the file system supports POSIX locks.
+    """
+
+    def __init__(self, path: Path, lease_s: float = 30.0, max_attempts: int = 3, journal_mode: str = "wal") -> None:
+        self.path = path
+        self.lease_s = lease_s
+        self.max_attempts = max(1, max_attempts)
+        self.journal_mode = journal_mode
+        # sqlite3 connections must not be shared across threads, so each thread opens its own
+        self._local = threading.local()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; writes use explicit BEGIN IMMEDIATE so claims never race
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _next_version(conn: sqlite3.Connection) -> int:
+        # A counter rather than MAX(version) + 1: purging the newest rows must not hand out a
+        # version that readers following the feed have already passed
+        conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'version'")
+        return conn.execute("SELECT value FROM counters WHERE name = 'version'").fetchone()[0]
+
+    def _update(self, conn: sqlite3.Connection, job_id: str, condition: str, params: Sequence, **fields) -> bool:
+        fields["version"] = self._next_version(conn)
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        cursor = conn.execute(
+            f"UPDATE jobs SET {assignments} WHERE id = ? AND {condition}", (*fields.values(), job_id, *params)
+        )
+        return cursor.rowcount == 1
+
+    # -- producers --------------------------------------------------------
+
+    def enqueue(self, kind: str, payload: dict, key: Optional[str] = None) -> Tuple[Job, bool]:
+        """Add a job; returns it and whether it is new (False when an identical one was active)."""
+        body = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+        with self._transaction() as conn:
+            if key is not None:
+                for row in conn.execute(f"SELECT * FROM jobs WHERE key = ? AND {_IS_ACTIVE}", (key,)).fetchall():
+                    if row["payload"] == body:
+                        return Job.from_row(row), False
+                    self._update(conn, row["id"], _IS_ACTIVE, (), status="cancelled", error="superseded")
+            now = time.time()
+            job_id = str(uuid.uuid4())
+            conn.execute(
+                "INSERT INTO jobs (id, kind, key, payload, status, version, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, key, body, self._next_version(conn), now, now),
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row), True
+
+    def cancel(self, key: str) -> bool:
+        with self._transaction() as conn:
+            rows = conn.execute(f"SELECT id FROM jobs WHERE key = ? AND {_IS_ACTIVE}", (key,)).fetchall()
+            for row in rows:
+                self._update(conn, row["id"], _IS_ACTIVE, (), status="cancelled", error="cancelled")
+        return bool(rows)
+
+    def forget(self, key: str) -> int:
+        """Cancel a deleted document's active jobs and drop the results stored with finished ones.
+
+        Rows stay (marked ``error = 'deleted'``) rather than being removed, so the change feed
+        reports the deletion and versions never go backwards; `purge` removes them later.
+        """
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND (result IS NOT NULL OR error IS NOT ?)", (key, DELETED)
+            ).fetchall()
+            for row in rows:
+                self._update(
+                    conn, row["id"], "1", (), status="cancelled", error=DELETED, result=None, worker=None, lease_until=None
+                )
+        return len(rows)
+
+    # -- consumers --------------------------------------------------------
+
+    def claim(self, worker: str, kinds: Optional[Sequence[str]] = None) -> Optional[Job]:
+        now = time.time()
+        with self._transaction() as conn:
+            # Expired leases belong to workers that crashed or hung
+            for row in conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = 'leased' AND lease_until < ?", (now,)
+            ).fetchall():
+                if row["attempts"] >= self.max_attempts:
+                    error = f"lease expired after {row['attempts']} attempts"
+                    self._update(conn, row["id"], "status = 'leased'", (), status="failed", error=error)
+                else:
+                    self._update(conn, row["id"], "status = 'leased'", (), status="queued", worker=None)
+
+            query = "SELECT * FROM jobs WHERE status = 'queued'"
+            params: List[object] = []
+            if kinds:
+                query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+                params.extend(kinds)
+            row = conn.execute(query + " ORDER BY created_at LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            self._update(
+                conn,
+                row["id"],
+                "status = 'queued'",
+                (),
+                status="leased",
+                worker=worker,
+                lease_until=now + self.lease_s,
+                attempts=row["attempts"] + 1,
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        return Job.from_row(row)
+
+    def heartbeat(
+        self,
+        job_id: str,
+        worker: str,
+        stage: Optional[str] = None,
+        progress: Optional[int] = None,
+        message: Optional[str] = None,
+    ) -> bool:
+        """Extend the lease and record progress; False means the job is no longer this worker's."""
+        fields: Dict[str, object] = {"lease_until": time.time() + self.lease_s}
+        for name, value in (("stage", stage), ("progress", progress), ("message", message)):
+            if value is not None:
+                fields[name] = value
+        with self._transaction() as conn:
+            return self._update(conn, job_id, "worker = ? AND status = 'leased'", (worker,), **fields)
+
+    def complete(self, job_id: str, worker: str, result: str) -> bool:
+        with self._transaction() as conn:
+            return self._update(
+                conn,
+                job_id,
+                "worker = ? AND status = 'leased'",
+                (worker,),
+                status="done",
+                result=result,
+                stage="done",
+                progress=100,
+                lease_until=None,
+            )
+
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return False
+            status = "queued" if retry and row["attempts"] < self.max_attempts else "failed"
+            return self._update(
+                conn,
+                job_id,
+                "worker = ? AND status = 'leased'",
+                (worker,),
+                status=status,
+                error=error,
+                worker=None,
+                lease_until=None,
+            )
+
+    # -- readers ----------------------------------------------------------
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row is not None else None
+
+    def latest(self, key: str) -> Optional[Job]:
+        """The most recently changed job for `key`, finished or not."""
+        row = self._connect().execute(
+            "SELECT * FROM jobs WHERE key = ? ORDER BY version DESC LIMIT 1", (key,)
+        ).fetchone()
+        return Job.from_row(row) if row is not None else None
+
+    def current_version(self) -> int:
+        """Version of the latest change; `changes(current_version())` returns only later ones."""
+        return self._connect().execute("SELECT value FROM counters WHERE name = 'version'").fetchone()[0]
+
+    def changes(self, since: int, limit: int = 200) -> List[Job]:
+        rows = self._connect().execute(
+            "SELECT * FROM jobs WHERE version > ? ORDER BY version LIMIT ?", (since, limit)
+        ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def purge(self, older_than_s: float) -> int:
+        """Delete finished jobs (and their stored results) last touched before the cutoff."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed', 'cancelled') AND updated_at < ?",
+                (time.time() - older_than_s,),
+            )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        counts = {status: 0 for status in (*ACTIVE, *FINISHED)}
+        for row in conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        oldest = conn.execute("SELECT MIN(created_at) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        return {
+            "jobs": counts,
+            "oldest_queued_age_s": round(time.time() - oldest, 3) if oldest is not None else 0.0,
+            "lease_s": self.lease_s,
+            "max_attempts": self.max_attempts,
+        }
@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.domain.models import AnalysisResult
+from backend.domain.risk_columns import RISK_LEVELS
+from backend.infrastructure.storage.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+_HANGUL = re.compile(r"[가-힣]")
+
+# Field weights: a hit in the summary or category says more than one in a long clause body
+FIELD_WEIGHTS = (("raw_text", 1.0), ("summary", 2.0), ("category", 3.0))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Korean runs become character bigrams (so 위약금 matches 위약금을), other words stay whole."""
+    tokens: List[str] = []
+    for word in _WORD.findall(text.lower()):
+        if _HANGUL.search(word):
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def journal_record(result: AnalysisResult) -> dict:
+    return {
+        "document_id": result.document_id,
+        "contract_type": result.contract_type or "general",
+        "clauses": [
+            {
+                "id": clause.id,
+                "raw_text": clause.raw_text,
+                "summary": clause.summary,
+                "category": clause.category,
+                "level": clause.risk.level if clause.risk else "low",
+                "score": clause.risk.score if clause.risk else 0,
+            }
+            for clause in result.clauses
+        ],
+    }
+
+
+def append_journal_line(journal_path: Path, lock_path: Path, line: str) -> None:
+    with file_lock(lock_path):
+        with journal_path.open("a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+
+class SearchJournalWriter:
+    """Write side of the search journal, for processes that produce results but never search.
+
+    Analysis workers append each result's line before reporting the job done, so API nodes
+    importing the result from the queue find it there instead of each appending it again.
+    """
+
+    def __init__(self, journal_path: Path) -> None:
+        self.journal_path = journal_path
+        self.lock_path = journal_path.with_name(journal_path.name + ".lock")
+        journal_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def on_result_saved(self, result: AnalysisResult) -> None:
+        append_journal_line(self.journal_path, self.lock_path, json.dumps(journal_record(result), ensure_ascii=False))
+
+
+class ClauseSearchIndex:
+    """Incremental BM25 inverted index over clause text, summary and category.
+
+    Persistence is an append-only JSONL journal with one line per saved document; a later line
+    for the same document supersedes earlier ones, and the journal is rewritten once superseded
+    lines outnumber live ones, or right away when a document is deleted. Several processes (API
+    replicas, pre-fork workers, analysis workers) may share it, so appends and rewrites hold a
+    lock file next to the journal, and the index picks up lines other processes appended before
+    each search or save. Only the process that produced a result writes its line: saving a
+    result whose line is already in the journal (one imported from the work queue) only indexes
+    it.
+    """
+
+    def __init__(self, journal_path: Optional[Path] = None) -> None:
+        self.journal_path = journal_path
+        self.lock_path = journal_path.with_name(journal_path.name + ".lock") if journal_path is not None else None
+        # Indexing runs in worker threads; re-entrant because saving may trigger compaction
+        self._lock = threading.RLock()
+        self._reset()
+        if journal_path is not None:
+            journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._follow_journal()
+
+    def _reset(self) -> None:
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.document_ids: List[str] = []
+        self.clause_ids: List[str] = []
+        self.positions: List[int] = []
+        self.summaries: List[Optional[str]] = []
+        self.categories: List[Optional[str]] = []
+        # Per-clause numeric columns in buffer-backed arrays so queries can view them from NumPy
+        self.levels = bytearray()
+        self.risk_scores = bytearray()
+        self.contract_types = array("H")
+        self.contract_type_names: List[str] = []
+        self.lengths = array("d")
+        self.alive = bytearray()
+        self.by_document: Dict[str, List[int]] = {}
+        self.live_count = 0
+        self.total_length = 0.0
+        self.journal_lines = 0
+        # document -> hash of its latest journal line, to tell lines already indexed
+        self.fingerprints: Dict[str, int] = {}
+        # (inode, bytes read) of the journal; a new inode means it was rewritten
+        self._journal_position: Tuple[int, int] = (0, 0)
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    # -- indexing ---------------------------------------------------------
+
+    def on_result_saved(self, result: AnalysisResult) -> None:
+        with self._lock:
+            record = journal_record(result)
+            line = json.dumps(record, ensure_ascii=False)
+            self._follow_journal()
+            if self.fingerprints.get(result.document_id) == hash(line):
+                # The producing process wrote it and _follow_journal has indexed it
+                return
+            self._apply(record)
+            self.fingerprints[result.document_id] = hash(line)
+            self._append_journal(line)
+
+    def on_result_removed(self, document_id: str) -> None:
+        """Drop a deleted document, and rewrite the journal so its clause text is gone from disk too."""
+        with self._lock:
+            self._remove_document(document_id)
+            if self.journal_path is not None:
+                # Always rewritten: the journal may hold lines other processes appended for it
+                self.compact_journal(removed=(document_id,))
+
+    def _apply(self, record: dict) -> None:
+        document_id = record["document_id"]
+        self._remove_document(document_id)
+        contract_code = self._contract_code(record["contract_type"])
+        keys: List[int] = []
+        for position, clause in enumerate(record["clauses"]):
+            key = len(self.document_ids)
+            weighted: Counter[str] = Counter()
+            for field, weight in FIELD_WEIGHTS:
+                for token in tokenize(clause.get(field) or ""):
+                    weighted[token] += weight
+            for token, tf in weighted.items():
+                self.postings.setdefault(token, {})[key] = tf
+            length = float(sum(weighted.values()))
+            self.document_ids.append(document_id)
+            self.clause_ids.append(clause["id"])
+            self.positions.append(position)
+            level = clause.get("level") or "low"
+            self.levels.append(RISK_LEVELS.index(level) if level in RISK_LEVELS else 0)
+            self.contract_types.append(contract_code)
+            self.risk_scores.append(min(100, max(0, int(clause.get("score") or 0))))
+            self.summaries.append(clause.get("summary"))
+            self.categories.append(clause.get("category"))
+            self.lengths.append(length)
+            self.alive.append(1)
+            self.total_length += length
+            keys.append(key)
+        self.by_document[document_id] = keys
+        self.live_count += len(keys)
+
+    def _contract_code(self, contract_type: str) -> int:
+        if contract_type not in self.contract_type_names:
+            self.contract_type_names.append(contract_type)
+        return self.contract_type_names.index(contract_type)
+
+    def _remove_document(self, document_id: str) -> None:
+        self.fingerprints.pop(document_id, None)
+        # Tombstone only; dead clauses are skipped at query time and dropped in bulk
+        for key in self.by_document.pop(document_id, []):
+            self.alive[key] = 0
+            self.live_count -= 1
+            self.total_length -= self.lengths[key]
+        if len(self.alive) - self.live_count > max(1024, self.live_count):
+            self._compact_rows()
+
+    def _compact_rows(self) -> None:
+        """Drop tombstoned rows from every column and renumber the live ones, postings included."""
+        keep = [key for key, alive in enumerate(self.alive) if alive]
+        remap = dict(zip(keep, range(len(keep))))
+        for token in list(self.postings):
+            live = {remap[key]: tf for key, tf in self.postings[token].items() if key in remap}
+            if live:
+                self.postings[token] = live
+            else:
+                del self.postings[token]
+        self.document_ids = [self.document_ids[key] for key in keep]
+        self.clause_ids = [self.clause_ids[key] for key in keep]
+        self.positions = [self.positions[key] for key in keep]
+        self.summaries = [self.summaries[key] for key in keep]
+        self.categories = [self.categories[key] for key in keep]
+        self.levels = bytearray(self.levels[key] for key in keep)
+        self.risk_scores = bytearray(self.risk_scores[key] for key in keep)
+        self.contract_types = array("H", (self.contract_types[key] for key in keep))
+        self.lengths = array("d", (self.lengths[key] for key in keep))
+        self.alive = bytearray(b"\x01") * len(keep)
+        self.by_document = {document_id: [remap[key] for key in keys] for document_id, keys in self.by_document.items()}
+
+    # -- persistence ------------------------------------------------------
+
+    def _append_journal(self, line: str) -> None:
+        if self.journal_path is None or self.lock_path is None:
+            return
+        append_journal_line(self.journal_path, self.lock_path, line)
+        self.journal_lines += 1
+        if self.journal_lines > 2 * max(len(self.by_document), 64):
+            self.compact_journal()
+
+    def compact_journal(self, removed: Iterable[str] = ()) -> None:
+        """Rewrite the journal keeping only the latest line per document, minus `removed` ones.
+
+        Judged from the journal itself rather than this index, which may not have seen lines
+        other processes appended.
+        """
+        with self._lock:
+            if self.journal_path is None or self.lock_path is None:
+                return
+            with file_lock(self.lock_path):
+                if not self.journal_path.exists():
+                    return
+                # Catch up first, so the rewritten file holds nothing this index has not seen
+                self._follow_journal()
+                for document_id in removed:
+                    self._remove_document(document_id)
+                latest: Dict[str, str] = {}
+                with self.journal_path.open(encoding="utf-8") as fh:
+                    for line in fh:
+                        try:
+                            document_id = json.loads(line)["document_id"]
+                        except (json.JSONDecodeError, KeyError):
+                            continue
+                        # Re-inserted so the rewritten journal keeps the order of latest saves
+                        latest.pop(document_id, None)
+                        latest[document_id] = line
+                for document_id in removed:
+                    latest.pop(document_id, None)
+                fd, tmp_name = tempfile.mkstemp(dir=self.journal_path.parent, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    fh.writelines(latest.values())
+                os.replace(tmp_name, self.journal_path)
+                stat = self.journal_path.stat()
+                self._journal_position = (stat.st_ino, stat.st_size)
+            self.journal_lines = len(latest)
+
+    def _follow_journal(self) -> None:
+        """Index lines appended since the last call, re-reading the journal once it was rewritten."""
+        if self.journal_path is None:
+            return
+        with self._lock:
+            try:
+                stat = self.journal_path.stat()
+            except FileNotFoundError:
+                return
+            inode, offset = self._journal_position
+            if stat.st_ino != inode or stat.st_size < offset:
+                # Compacted by another process, possibly without documents it deleted
+                self._reset()
+                offset = 0
+            elif stat.st_size == offset:
+                return
+            with self.journal_path.open("rb") as fh:
+                fh.seek(offset)
+                data = fh.read()
+            # A line still being written has no newline yet; it is picked up next time
+            complete = data[: data.rfind(b"\n") + 1]
+            for raw in complete.decode("utf-8").splitlines():
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt search journal line in %s", self.journal_path)
+                    continue
+                self.journal_lines += 1
+                if self.fingerprints.get(record["document_id"]) != hash(line):
+                    self._apply(record)
+                    self.fingerprints[record["document_id"]] = hash(line)
+            self._journal_position = (stat.st_ino, offset + len(complete))
+
+    # -- querying ---------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        level: Optional[str] = None,
+        contract_type: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Tuple[int, List[dict]]:
+        """Return (total hits, one page of hits) ranked by BM25; every query token must match."""
+        with self._lock:
+            self._follow_journal()
+            tokens = list(dict.fromkeys(tokenize(query)))
+            if not tokens or self.live_count == 0:
+                return 0, []
+            postings = [self.postings.get(token) for token in tokens]
+            if any(not posting for posting in postings):
+                return 0, []
+            postings.sort(key=len)
+
+            # Set intersection and BM25 both run in C / NumPy; only dict lookups stay in Python
+            matched = set(postings[0]).intersection(*postings[1:]) if len(postings) > 1 else postings[0].keys()
+            keys = np.fromiter(matched, dtype=np.int64, count=len(matched))
+            mask = np.frombuffer(self.alive, dtype=np.uint8)[keys] == 1
+            if level is not None:
+                if level not in RISK_LEVELS:
+                    return 0, []
+                mask &= np.frombuffer(self.levels, dtype=np.uint8)[keys] == RISK_LEVELS.index(level)
+            if contract_type is not None:
+                if contract_type not in self.contract_type_names:
+                    return 0, []
+                code = self.contract_type_names.index(contract_type)
+                mask &= np.frombuffer(self.contract_types, dtype=np.uint16)[keys] == code
+            keys = keys[mask]
+            if keys.size == 0:
+                return 0, []
+
+            n_docs = self.live_count
+            avg_length = self.total_length / n_docs if n_docs else 1.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * np.frombuffer(self.lengths, dtype=np.float64)[keys] / avg_length)
+            scores = np.zeros(keys.size, dtype=np.float64)
+            key_list = keys.tolist()
+            alive = np.frombuffer(self.alive, dtype=np.uint8)
+            has_dead = len(self.alive) > n_docs
+            for posting in postings:
+                df = len(posting)
+                if has_dead:
+                    # Postings keep tombstoned clauses until the next compaction; count live ones only
+                    df = int(alive[np.fromiter(posting, dtype=np.int64, count=df)].sum())
+                idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                tf = np.fromiter(map(posting.__getitem__, key_list), dtype=np.float64, count=keys.size)
+                scores += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            page = max(page, 1)
+            page_size = max(page_size, 1)
+            limit = min(page * page_size, keys.size)
+            top = np.argpartition(-scores, limit - 1)[:limit] if limit < keys.size else np.arange(keys.size)
+            top = top[np.argsort(-scores[top], kind="stable")][(page - 1) * page_size :]
+            hits = []
+            for idx in top.tolist():
+                key = key_list[idx]
+                hits.append(
+                    {
+                        "document_id": self.document_ids[key],
+                        "clause_id": self.clause_ids[key],
+                        "position": self.positions[key],
+                        "relevance": round(float(scores[idx]), 4),
+                        "risk_score": self.risk_scores[key],
+                        "level": RISK_LEVELS[self.levels[key]],
+                        "category": self.categories[key],
+                        "contract_type": self.contract_type_names[self.contract_types[key]],
+                        "summary": self.summaries[key],
+                    }
+                )
+            return int(keys.size), hits
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from backend.infrastructure.storage.file_lock import file_lock
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIONS = ("none", "zstd")
+MANIFEST = "meta.json"
+# Held by whichever process runs retention/compaction; its mtime marks the last finished run
+MAINTENANCE_LOCK = ".maintenance.lock"
+_ZSTD_SUFFIX = ".zst"
+_SAFE_NAME = re.compile(r"[^\w.\-]+")
+# Legacy flat uploads (`{uuid}_{filename}`) and `tempfile.mkstemp(suffix=".tmp")` leftovers
+_ORPHAN_TOP_LEVEL = re.compile(
+    r"^(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}_.+|tmp\w+\.tmp)$", re.IGNORECASE
+)
+
+
+@dataclass
+class StoredDocument:
+    """Manifest kept next to a document's files; enough to rebuild the repository on restart."""
+
+    document_id: str
+    filename: str
+    content_type: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    # kind ("upload", "text") -> {"name", "size", "stored_size"}
+    files: Dict[str, Dict[str, object]] = field(default_factory=dict)
+
+    @property
+    def stored_bytes(self) -> int:
+        return sum(int(meta["stored_size"]) for meta in self.files.values())
+
+    @property
+    def original_bytes(self) -> int:
+        return sum(int(meta["size"]) for meta in self.files.values())
+
+
+class StorageManager:
+    """Sharded on-disk layout for uploads and extracted text.
+
+    Each document lives in ``root/<id[:2]>/<id[2:4]>/<id>/`` with a ``meta.json`` manifest, so
+    no directory grows past a few hundred entries. Files are optionally zstd-compressed at rest;
+    `materialize` hands OCR a plain file. Usage totals are kept in memory and refreshed by
+    `compact`, which also migrates files into the current layout and compression and runs GC.
+
+    Several processes may share the root (API replicas, analysis workers, pre-fork workers), so
+    GC judges a document by the manifest on disk, not by what this process has loaded, and only
+    one process at a time runs `compact`.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        compression: str = "none",
+        compression_level: int = 3,
+        retention_days: float = 0.0,
+        orphan_grace_s: float = 3600.0,
+    ) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported storage compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("Install zstandard to store documents zstd-compressed.")
+        self.root = root
+        self.compression = compression
+        self.compression_level = compression_level
+        self.retention_s = retention_days * 86400
+        self.orphan_grace_s = orphan_grace_s
+        self.manifests: Dict[str, StoredDocument] = {}
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    # -- layout -----------------------------------------------------------
+
+    def document_dir(self, document_id: str) -> Path:
+        key = _SAFE_NAME.sub("_", document_id)
+        return self.root / key[:2] / key[2:4] / key
+
+    def _load(self) -> None:
+        seen = set()
+        for manifest_path in self.root.glob(f"*/*/*/{MANIFEST}"):
+            stored = self._read_manifest(manifest_path)
+            if stored is not None:
+                seen.add(stored.document_id)
+                with self._lock:
+                    self.manifests[stored.document_id] = stored
+        # Deleted by another process since they were loaded
+        for document_id in [doc_id for doc_id in self.manifests if doc_id not in seen]:
+            if not (self.document_dir(document_id) / MANIFEST).exists():
+                with self._lock:
+                    self.manifests.pop(document_id, None)
+
+    def reload(self) -> None:
+        """Re-read every manifest, picking up documents other processes stored or deleted."""
+        self._load()
+
+    def exists(self, document_id: str) -> bool:
+        return (self.document_dir(document_id) / MANIFEST).exists()
+
+    @staticmethod
+    def _read_manifest(manifest_path: Path) -> Optional[StoredDocument]:
+        try:
+            return StoredDocument(**json.loads(manifest_path.read_text(encoding="utf-8")))
+        except (OSError, TypeError, json.JSONDecodeError):
+            logger.warning("Skipping unreadable storage manifest %s", manifest_path)
+            return None
+
+    def refresh(self, document_id: str) -> Optional[StoredDocument]:
+        """Pick up a document another process (an API node) stored after this one started."""
+        manifest_path = self.document_dir(document_id) / MANIFEST
+        if not manifest_path.exists():
+            return None
+        stored = self._read_manifest(manifest_path)
+        if stored is not None:
+            with self._lock:
+                self.manifests[document_id] = stored
+        return stored
+
+    def _save_manifest(self, stored: StoredDocument) -> None:
+        self._atomic_write(self.document_dir(stored.document_id) / MANIFEST, json.dumps(asdict(stored)).encode("utf-8"))
+
+    @staticmethod
+    def _atomic_write(target: Path, data: bytes) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_name, target)
+
+    # -- reads and writes -------------------------------------------------
+
+    def _encode(self, data: bytes) -> bytes:
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=self.compression_level).compress(data)
+        return data
+
+    @staticmethod
+    def _decode(path: Path) -> bytes:
+        data = path.read_bytes()
+        if path.name.endswith(_ZSTD_SUFFIX):
+            if zstandard is None:
+                raise ImportError(f"Install zstandard to read compressed file {path}.")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return data
+
+    def _put(self, stored: StoredDocument, kind: str, name: str, data: bytes) -> Path:
+        directory = self.document_dir(stored.document_id)
+        encoded = self._encode(data)
+        if self.compression == "zstd":
+            name += _ZSTD_SUFFIX
+        target = directory / name
+        self._atomic_write(target, encoded)
+        previous = stored.files.get(kind)
+        if previous and previous["name"] != name:
+            (directory / str(previous["name"])).unlink(missing_ok=True)
+        stored.files[kind] = {"name": name, "size": len(data), "stored_size": len(encoded)}
+        self._save_manifest(stored)
+        return target
+
+    def write_upload(self, document_id: str, filename: str, content_type: Optional[str], data: bytes) -> Path:
+        stored = StoredDocument(document_id=document_id, filename=filename, content_type=content_type)
+        suffix = Path(filename).suffix.lower()
+        target = self._put(stored, "upload", f"upload{_SAFE_NAME.sub('', suffix)}", data)
+        with self._lock:
+            self.manifests[document_id] = stored
+        return target
+
+    def upload_path(self, document_id: str) -> Optional[Path]:
+        """Current path of a document's upload; compaction renames it when re-encoding."""
+        stored = self.manifests.get(document_id)
+        if stored is not None and "upload" in stored.files:
+            path = self.document_dir(document_id) / str(stored.files["upload"]["name"])
+            if path.exists():
+                return path
+        # Re-encoded by another process since this one read the manifest
+        stored = self.refresh(document_id)
+        if stored is None or "upload" not in stored.files:
+            return None
+        return self.document_dir(document_id) / str(stored.files["upload"]["name"])
+
+    def write_text(self, document_id: str, text: str) -> None:
+        stored = self.manifests.get(document_id)
+        if stored is not None:
+            self._put(stored, "text", "text.txt", text.encode("utf-8"))
+
+    def read_text(self, document_id: str) -> Optional[str]:
+        stored = self.manifests.get(document_id)
+        if stored is None or "text" not in stored.files:
+            return None
+        return self._decode(self.document_dir(document_id) / str(stored.files["text"]["name"])).decode("utf-8")
+
+    @contextmanager
+    def materialize(self, stored_path: Path) -> Iterator[Path]:
+        """Yield a plain copy of a stored file, decompressing to a temp file when needed."""
+        if not stored_path.name.endswith(_ZSTD_SUFFIX):
+            yield stored_path
+            return
+        plain_suffix = Path(stored_path.name[: -len(_ZSTD_SUFFIX)]).suffix
+        fd, tmp_name = tempfile.mkstemp(suffix=plain_suffix)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(self._decode(stored_path))
+            yield Path(tmp_name)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+    def delete(self, document_id: str) -> None:
+        with self._lock:
+            self.manifests.pop(document_id, None)
+        shutil.rmtree(self.document_dir(document_id), ignore_errors=True)
+
+    # -- maintenance ------------------------------------------------------
+
+    def expired(self, now: Optional[float] = None) -> List[str]:
+        if self.retention_s <= 0:
+            return []
+        cutoff = (now or time.time()) - self.retention_s
+        return [doc_id for doc_id, stored in list(self.manifests.items()) if stored.created_at < cutoff]
+
+    def collect_garbage(self, now: Optional[float] = None) -> dict:
+        """Delete expired documents and orphaned files older than the grace period."""
+        now = now or time.time()
+        expired = self.expired(now)
+        for document_id in expired:
+            self.delete(document_id)
+        orphans = 0
+        freed = 0
+        for path in list(self.root.iterdir()):
+            if len(path.name) == 2 and path.is_dir():
+                orphans_in_shard, freed_in_shard = self._collect_shard(path, now)
+                orphans += orphans_in_shard
+                freed += freed_in_shard
+            # Only files this store itself left at the top level: uploads from the old flat
+            # `{uuid}_{filename}` layout and temp files of crashed writes. The root may be shared
+            # with other data, so anything else stays.
+            elif (
+                path.is_file()
+                and _ORPHAN_TOP_LEVEL.match(path.name)
+                and now - path.stat().st_mtime > self.orphan_grace_s
+            ):
+                freed += self._remove(path)
+                orphans += 1
+        return {"expired": len(expired), "orphans": orphans, "freed_bytes": freed}
+
+    def _collect_shard(self, shard: Path, now: float) -> tuple[int, int]:
+        orphans = freed = 0
+        for document_dir in shard.glob("*/*"):
+            # Another process may have stored it after this one loaded its manifests
+            if (document_dir / MANIFEST).exists() or now - document_dir.stat().st_mtime <= self.orphan_grace_s:
+                continue
+            freed += self._remove(document_dir)
+            orphans += 1
+        for sub in list(shard.iterdir()) + [shard]:
+            if sub.is_dir() and not any(sub.iterdir()):
+                sub.rmdir()
+        return orphans, freed
+
+    @staticmethod
+    def _remove(path: Path) -> int:
+        if path.is_dir():
+            size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            size = path.stat().st_size
+            path.unlink(missing_ok=True)
+        return size
+
+    @contextmanager
+    def maintenance(self, min_interval_s: float = 0.0) -> Iterator[bool]:
+        """Yield True if this process should run maintenance now.
+
+        False while another process runs it, or when one finished less than `min_interval_s`
+        ago, so processes that each schedule it hourly still run it about once an hour overall.
+        """
+        lock_path = self.root / MAINTENANCE_LOCK
+        with file_lock(lock_path, blocking=False) as acquired:
+            # Opening the lock file creates it with a fresh mtime; only a completed run touches it
+            if acquired and min_interval_s > 0 and lock_path.stat().st_size > 0:
+                acquired = time.time() - lock_path.stat().st_mtime >= min_interval_s
+            yield acquired
+            if acquired:
+                lock_path.write_text(f"{os.getpid()} {time.time():.0f}\n", encoding="utf-8")
+
+    def compact(self) -> dict:
+        """Re-encode files whose compression differs from the current setting, then run GC.
+
+        Call it inside `maintenance`. Manifests are re-read from disk first, so documents other
+        processes stored or changed are re-encoded and expire too.
+        """
+        self._load()
+        recompressed = 0
+        for stored in list(self.manifests.values()):
+            directory = self.document_dir(stored.document_id)
+            for kind, meta in list(stored.files.items()):
+                name = str(meta["name"])
+                if name.endswith(_ZSTD_SUFFIX) == (self.compression == "zstd"):
+                    continue
+                path = directory / name
+                try:
+                    data = self._decode(path)
+                except (OSError, ImportError) as exc:
+                    logger.warning("Cannot re-encode %s: %s", path, exc)
+                    continue
+                plain_name = name[: -len(_ZSTD_SUFFIX)] if name.endswith(_ZSTD_SUFFIX) else name
+                self._put(stored, kind, plain_name, data)
+                recompressed += 1
+        return {"recompressed": recompressed, **self.collect_garbage()}
+
+    def usage(self) -> dict:
+        manifests = list(self.manifests.values())
+        stored_bytes = sum(stored.stored_bytes for stored in manifests)
+        original_bytes = sum(stored.original_bytes for stored in manifests)
+        disk = shutil.disk_usage(self.root)
+        return {
+            "documents": len(manifests),
+            "files": sum(len(stored.files) for stored in manifests),
+            "stored_bytes": stored_bytes,
+            "original_bytes": original_bytes,
+            "compression": self.compression,
+            "compression_ratio": round(original_bytes / stored_bytes, 3) if stored_bytes else 1.0,
+            "retention_days": self.retention_s / 86400,
+            "disk_total_bytes": disk.total,
+            "disk_free_bytes": disk.free,
+        }
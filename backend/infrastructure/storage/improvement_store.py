@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from backend.infrastructure.metrics.prometheus import CACHE_HITS, CACHE_MISSES
+from backend.infrastructure.storage.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class ImprovementStore:
+    """Clause improvement suggestions keyed by clause content, persisted as a JSONL journal.
+
+    Each line also names the document the suggestion was made for, so deleting a document drops
+    the suggestions no other document shares. Several processes (pre-fork workers, replicas)
+    may share the journal: appends and rewrites hold a lock file next to it, and
+    `reload_if_changed` re-reads it once another process has changed it. `generation` counts
+    the reloads and puts, so callers can tell when stored suggestions need re-attaching.
+    """
+
+    def __init__(self, journal_path: Optional[Path] = None) -> None:
+        self.journal_path = journal_path
+        self.lock_path = journal_path.with_name(journal_path.name + ".lock") if journal_path is not None else None
+        self.suggestions: Dict[str, dict] = {}
+        # key -> documents whose clauses carry the suggestion
+        self.documents: Dict[str, Set[str]] = {}
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._journal_stamp: Optional[Tuple[int, int, int]] = None
+        if journal_path is not None:
+            journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    @staticmethod
+    def key_for(clause_text: str) -> str:
+        return hashlib.sha256(clause_text.strip().encode("utf-8")).hexdigest()
+
+    def get(self, clause_text: str) -> Optional[dict]:
+        suggestion = self.suggestions.get(self.key_for(clause_text))
+        (CACHE_MISSES if suggestion is None else CACHE_HITS).inc(cache="improvement")
+        return suggestion
+
+    def put(self, clause_text: str, suggestion: dict, document_id: Optional[str] = None) -> None:
+        key = self.key_for(clause_text)
+        self.suggestions[key] = suggestion
+        if document_id is not None:
+            self.documents.setdefault(key, set()).add(document_id)
+        self.generation += 1
+        if self.journal_path is not None and self.lock_path is not None:
+            line = json.dumps({"key": key, "document_id": document_id, **suggestion}, ensure_ascii=False)
+            with file_lock(self.lock_path):
+                with self.journal_path.open("a", encoding="utf-8") as fh:
+                    fh.write(line + "\n")
+
+    def forget_document(self, document_id: str) -> None:
+        """Drop the suggestions made for a deleted document, unless another document uses them too."""
+        dropped: Set[str] = set()
+        for key, documents in list(self.documents.items()):
+            if document_id not in documents:
+                continue
+            documents.discard(document_id)
+            if not documents:
+                del self.documents[key]
+                self.suggestions.pop(key, None)
+                dropped.add(key)
+        self.generation += 1
+        if self.journal_path is None or self.lock_path is None:
+            return
+        # Judged from the journal, which may hold lines other processes appended for the document
+        with file_lock(self.lock_path):
+            if not self.journal_path.exists():
+                return
+            kept = []
+            with self.journal_path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get("document_id") == document_id or record.get("key") in dropped:
+                        continue
+                    kept.append(line)
+            fd, tmp_name = tempfile.mkstemp(dir=self.journal_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.writelines(kept)
+            os.replace(tmp_name, self.journal_path)
+
+    def reload_if_changed(self) -> bool:
+        """Re-read the journal when another process has appended to or rewritten it."""
+        if self.journal_path is None or self._stamp() == self._journal_stamp:
+            return False
+        with self._lock:
+            self._load()
+        return True
+
+    def _stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = self.journal_path.stat() if self.journal_path is not None else None
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) if stat is not None else None
+
+    def _load(self) -> None:
+        if self.journal_path is None or not self.journal_path.exists():
+            return
+        # Stamped before reading: a line appended meanwhile changes the stamp and is read next time.
+        # This process's own appends trigger a reload too, so none from another process is missed.
+        self._journal_stamp = self._stamp()
+        # Built aside and swapped in, so concurrent readers never see a half-loaded store
+        suggestions: Dict[str, dict] = {}
+        documents: Dict[str, Set[str]] = {}
+        with self.journal_path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                    key = record.pop("key")
+                except (json.JSONDecodeError, KeyError):
+                    logger.warning("Skipping corrupt improvement journal line in %s", self.journal_path)
+                    continue
+                document_id = record.pop("document_id", None)
+                if document_id is not None:
+                    documents.setdefault(key, set()).add(document_id)
+                suggestions[key] = record
+        self.suggestions, self.documents = suggestions, documents
+        self.generation += 1
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import shutil
+from pathlib import Path
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class ProfileStore:
+    """Captured request profiles on disk, one JSON file per capture under a directory per document."""
+
+    def __init__(self, directory: Path, keep_per_document: int = 10) -> None:
+        self.directory = directory
+        self.keep_per_document = keep_per_document
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _document_dir(self, document_id: str) -> Path:
+        return self.directory / _UNSAFE.sub("_", document_id)
+
+    def save(self, document_id: str, profile: dict) -> None:
+        target_dir = self._document_dir(document_id)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / f"{profile['id']}.json"
+        target.write_text(json.dumps(profile, ensure_ascii=False), encoding="utf-8")
+        # Profile ids start with a sortable timestamp, so the oldest files sort first
+        for stale in sorted(target_dir.glob("*.json"))[: -self.keep_per_document]:
+            stale.unlink(missing_ok=True)
+
+    def list(self, document_id: str) -> List[dict]:
+        target_dir = self._document_dir(document_id)
+        if not target_dir.exists():
+            return []
+        profiles = []
+        for path in sorted(target_dir.glob("*.json"), reverse=True):
+            try:
+                profiles.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, json.JSONDecodeError):
+                logger.warning("Skipping unreadable profile %s", path)
+        return profiles
+
+    def forget(self, document_id: str) -> None:
+        """Delete every capture of a deleted document; they hold its timings and identifiers."""
+        shutil.rmtree(self._document_dir(document_id), ignore_errors=True)
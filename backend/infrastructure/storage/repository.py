@@ -1,26 +1,64 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
 from fastapi import UploadFile
 
 from backend.domain.models import AnalysisResult, Document, DocumentStatus
+from backend.infrastructure.http.serialized import SerializedPayload
+from backend.infrastructure.metrics.prometheus import CACHE_HITS, CACHE_MISSES
+from backend.infrastructure.storage.file_store import StorageManager, StoredDocument
+
+logger = logging.getLogger(__name__)
 
 
 class InMemoryRepository:
     """Simple repository that stores metadata in memory and files on disk."""
 
-    def __init__(self, storage_dir: Path) -> None:
+    def __init__(self, storage_dir: Path, storage: Optional[StorageManager] = None) -> None:
         self.storage_dir = storage_dir
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.storage = storage or StorageManager(storage_dir)
         self.documents: Dict[str, Document] = {}
         self.results: Dict[str, AnalysisResult] = {}
         self.status: Dict[str, DocumentStatus] = {}
+        # Clause positions ordered by descending risk score, rebuilt on every save
+        self.risk_index: Dict[str, List[int]] = {}
+        # Serialized JSON bodies, dropped whenever the underlying object is saved again
+        self.serialized_results: Dict[str, SerializedPayload] = {}
+        self.serialized_status: Dict[str, SerializedPayload] = {}
+        # Save sequence number per result, so a serialization that raced a save is not cached
+        self.result_versions: Dict[str, int] = {}
+        self._saves = 0
+        # Secondary indexes (analytics, search, ...) that follow every saved result
+        self.result_listeners: List[Callable[[AnalysisResult], None]] = []
+        # ...and drop a document again once retention or an admin deletes it
+        self.removal_listeners: List[Callable[[str], None]] = []
+        # Uploads survive restarts through the storage manifests; results need a re-analysis
+        for stored in self.storage.manifests.values():
+            self._add_stored(stored)
+
+    def _add_stored(self, stored: StoredDocument) -> Optional[Document]:
+        upload = stored.files.get("upload")
+        if upload is None:
+            return None
+        document = Document(
+            id=stored.document_id,
+            filename=stored.filename,
+            content_type=stored.content_type,
+            stored_path=str(self.storage.document_dir(stored.document_id) / str(upload["name"])),
+        )
+        self.documents[stored.document_id] = document
+        return document
 
     async def store_upload(self, document_id: str, upload_file: UploadFile) -> Document:
-        target_path = self.storage_dir / f"{document_id}_{upload_file.filename}"
-        target_path.write_bytes(await upload_file.read())
+        data = await upload_file.read()
+        target_path = await asyncio.to_thread(
+            self.storage.write_upload, document_id, upload_file.filename or "upload", upload_file.content_type, data
+        )
         document = Document(
             id=document_id,
             filename=upload_file.filename,
@@ -35,18 +73,141 @@ class InMemoryRepository:
         if document:
             document.text = text
             self.documents[document_id] = document
+            self.storage.write_text(document_id, text)
+
+    @contextmanager
+    def local_upload(self, document: Document) -> Iterator[Path]:
+        """Plain on-disk path of the upload for OCR, decompressed to a temp file if needed."""
+        # Looked up on use: compaction (here or in another process) renames re-encoded uploads
+        stored_path = self.storage.upload_path(document.id)
+        if stored_path is not None:
+            document.stored_path = str(stored_path)
+        with self.storage.materialize(Path(document.stored_path or "")) as path:
+            yield path
+
+    def compact_storage(self, min_interval_s: float = 0.0) -> dict:
+        """Drop expired documents from memory and disk, re-encode files and delete orphans.
+
+        Skipped (``{"skipped": True}``) while another process sharing the storage runs it, or
+        when one finished less than `min_interval_s` ago.
+        """
+        with self.storage.maintenance(min_interval_s) as run:
+            if not run:
+                return {"skipped": True}
+            # Re-read manifests first so documents other processes stored expire through
+            # `forget_document` (and its listeners) rather than behind their back in GC
+            self.storage.reload()
+            expired = self.storage.expired()
+            for document_id in expired:
+                self.forget_document(document_id)
+            stats = self.storage.compact()
+            for document_id, document in list(self.documents.items()):
+                stored_path = self.storage.upload_path(document_id)
+                if stored_path is not None:
+                    document.stored_path = str(stored_path)
+        return {**stats, "expired": stats["expired"] + len(expired)}
+
+    def forget_document(self, document_id: str) -> None:
+        """Delete a document's files and state, and have every removal listener purge it too."""
+        self.storage.delete(document_id)
+        self.evict(document_id)
+        self._notify_removed(document_id)
+
+    def prune_deleted(self) -> List[str]:
+        """Forget documents held in memory whose files another process has deleted."""
+        known = set(self.documents) | set(self.results)
+        removed = [document_id for document_id in known if not self.storage.exists(document_id)]
+        for document_id in removed:
+            self.evict(document_id)
+            self._notify_removed(document_id)
+        return removed
+
+    def _notify_removed(self, document_id: str) -> None:
+        for listener in self.removal_listeners:
+            try:
+                listener(document_id)
+            except Exception as exc:  # noqa: BLE001
+                # One failing index must not keep the others holding the document
+                logger.warning("Removal listener failed for %s: %s", document_id, exc)
+
+    def evict(self, document_id: str) -> None:
+        """Drop a document's in-memory state only; its files stay in storage."""
+        for mapping in (
+            self.documents,
+            self.results,
+            self.status,
+            self.risk_index,
+            self.serialized_results,
+            self.serialized_status,
+            self.result_versions,
+        ):
+            mapping.pop(document_id, None)
 
     def get_document(self, document_id: str) -> Optional[Document]:
-        return self.documents.get(document_id)
+        document = self.documents.get(document_id)
+        if document is None:
+            # Uploaded through another process sharing the storage root (API node -> worker)
+            stored = self.storage.refresh(document_id)
+            if stored is not None:
+                document = self._add_stored(stored)
+        return document
 
     def save_analysis_result(self, result: AnalysisResult) -> None:
+        # Bump first and drop the cached body last, so a concurrent serializer either sees the new
+        # version and skips caching, or caches the old body before it is dropped here
+        self._saves += 1
+        self.result_versions[result.document_id] = self._saves
         self.results[result.document_id] = result
+        self.risk_index[result.document_id] = self._build_risk_index(result)
+        self.serialized_results.pop(result.document_id, None)
+        for listener in self.result_listeners:
+            listener(result)
+
+    def add_result_listener(self, listener: Callable[[AnalysisResult], None]) -> None:
+        self.result_listeners.append(listener)
+
+    def add_removal_listener(self, listener: Callable[[str], None]) -> None:
+        self.removal_listeners.append(listener)
+
+    @staticmethod
+    def _build_risk_index(result: AnalysisResult) -> List[int]:
+        scores = [clause.risk.score if clause.risk else 0 for clause in result.clauses]
+        return sorted(range(len(scores)), key=lambda idx: (-scores[idx], idx))
+
+    def get_risk_index(self, document_id: str) -> Optional[List[int]]:
+        return self.risk_index.get(document_id)
 
     def get_analysis_result(self, document_id: str) -> Optional[AnalysisResult]:
         return self.results.get(document_id)
 
+    def get_serialized_result(self, document_id: str) -> Optional[SerializedPayload]:
+        """JSON body of the current result; safe to call from a worker thread."""
+        payload = self.serialized_results.get(document_id)
+        if payload is None:
+            # Read the version before the result: a save in between only makes it look stale
+            version = self.result_versions.get(document_id)
+            result = self.results.get(document_id)
+            if result is None:
+                return None
+            payload = SerializedPayload.from_model(result)
+            if self.result_versions.get(document_id) == version:
+                self.serialized_results[document_id] = payload
+            CACHE_MISSES.inc(cache="serialized_result")
+        else:
+            CACHE_HITS.inc(cache="serialized_result")
+        return payload
+
     def save_status(self, status: DocumentStatus) -> None:
         self.status[status.document_id] = status
+        self.serialized_status.pop(status.document_id, None)
 
     def get_status(self, document_id: str) -> DocumentStatus:
         return self.status.get(document_id, DocumentStatus(document_id=document_id, stage="idle", progress=0))
+
+    def get_serialized_status(self, document_id: str) -> SerializedPayload:
+        payload = self.serialized_status.get(document_id)
+        if payload is None:
+            payload = SerializedPayload.from_model(self.get_status(document_id))
+            if document_id in self.status:
+                self.serialized_status[document_id] = payload
+        return payload
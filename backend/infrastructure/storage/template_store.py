@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from backend.domain.models import ContractTemplate
+from backend.infrastructure.storage.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateStore:
+    """Registered contract templates with their stored analysis, persisted as a JSONL journal.
+
+    Each registration appends the whole template; a deletion appends a ``{"id", "deleted"}``
+    tombstone. Templates are few and rarely change, so the journal is never compacted.
+    """
+
+    def __init__(self, journal_path: Optional[Path] = None) -> None:
+        self.journal_path = journal_path
+        self.lock_path = journal_path.with_name(journal_path.name + ".lock") if journal_path is not None else None
+        self.templates: Dict[str, ContractTemplate] = {}
+        self._lock = threading.Lock()
+        self._journal_stamp: Optional[Tuple[int, int]] = None
+        if journal_path is not None:
+            journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def add(self, template: ContractTemplate) -> None:
+        with self._lock:
+            self.templates[template.id] = template
+            self._append(template.model_dump_json())
+
+    def get(self, template_id: str) -> Optional[ContractTemplate]:
+        return self.templates.get(template_id)
+
+    def list(self) -> List[ContractTemplate]:
+        return sorted(self.templates.values(), key=lambda template: template.created_at)
+
+    def delete(self, template_id: str) -> bool:
+        with self._lock:
+            if self.templates.pop(template_id, None) is None:
+                return False
+            self._append(json.dumps({"id": template_id, "deleted": True}))
+            return True
+
+    def reload_if_changed(self) -> bool:
+        """Re-read the journal when another process (API node vs. worker) has appended to it."""
+        if self.journal_path is None or self._stamp() == self._journal_stamp:
+            return False
+        with self._lock:
+            self._load()
+        return True
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.journal_path.stat() if self.journal_path is not None else None
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size) if stat is not None else None
+
+    def _append(self, line: str) -> None:
+        if self.journal_path is not None and self.lock_path is not None:
+            # API nodes and workers share the journal; unlocked appends could interleave
+            with file_lock(self.lock_path):
+                # Only skip the next reload when no other process appended since the last one
+                current = self._stamp() == self._journal_stamp
+                with self.journal_path.open("a", encoding="utf-8") as fh:
+                    fh.write(line + "\n")
+                if current:
+                    self._journal_stamp = self._stamp()
+
+    def _load(self) -> None:
+        if self.journal_path is None or not self.journal_path.exists():
+            return
+        self._journal_stamp = self._stamp()
+        # Built aside and swapped in, so concurrent readers never see a half-loaded library
+        templates: Dict[str, ContractTemplate] = {}
+        with self.journal_path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                    if record.get("deleted"):
+                        templates.pop(record["id"], None)
+                        continue
+                    template = ContractTemplate.model_validate(record)
+                except (json.JSONDecodeError, KeyError, ValidationError):
+                    logger.warning("Skipping corrupt template journal line in %s", self.journal_path)
+                    continue
+                templates[template.id] = template
+        self.templates = templates
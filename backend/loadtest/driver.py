@@ -0,0 +1,179 @@
+"""Load driver for the upload → analyze → result → report flow.
+
+Each of ``--users`` virtual users repeats the flow for ``--duration`` seconds (or
+``--iterations`` times) against a running API, then throughput, p50/p95/p99 latency and error
+rates per step are printed::
+
+    python -m backend.loadtest.driver --base-url http://localhost:8000 --users 20 --duration 60
+
+Contracts come from the benchmark corpus; ``--clauses`` sets their size.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from backend.benchmarks.corpus import CONTRACT_KINDS, generate_contract
+
+STEPS = ("upload", "analyze", "result", "report", "flow")
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class LoadRecorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.status_codes: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, step: str, seconds: float, status: Optional[int]) -> None:
+        self.latencies[step].append(seconds)
+        if status is not None:
+            self.status_codes[step][status] += 1
+        if status is None or status >= 400:
+            self.errors[step] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        steps = {}
+        for step in STEPS:
+            values = sorted(self.latencies.get(step, []))
+            if not values:
+                continue
+            steps[step] = {
+                "count": len(values),
+                "errors": self.errors.get(step, 0),
+                "error_rate": round(self.errors.get(step, 0) / len(values), 4),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+                "status_codes": dict(self.status_codes.get(step, {})),
+            }
+        flows = steps.get("flow", {})
+        completed = flows.get("count", 0) - flows.get("errors", 0)
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "flows_completed": completed,
+            "throughput_flows_per_s": round(completed / elapsed, 3) if elapsed else 0.0,
+            "steps": steps,
+        }
+
+
+async def _step(recorder: LoadRecorder, step: str, request) -> Optional[httpx.Response]:
+    started = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError:
+        recorder.record(step, time.perf_counter() - started, None)
+        return None
+    recorder.record(step, time.perf_counter() - started, response.status_code)
+    return response if response.status_code < 400 else None
+
+
+async def _flow(client: httpx.AsyncClient, recorder: LoadRecorder, text: str, kind: str, report_format: str) -> None:
+    started = time.perf_counter()
+    ok = False
+    try:
+        files = {"file": ("contract.txt", text.encode("utf-8"), "text/plain")}
+        upload = await _step(recorder, "upload", client.post("/api/documents", files=files))
+        if upload is None:
+            return
+        document_id = upload.json()["documentId"]
+        base = f"/api/documents/{document_id}"
+        if await _step(recorder, "analyze", client.post(f"{base}/analyze", json={"contract_type": kind})) is None:
+            return
+        if await _step(recorder, "result", client.get(f"{base}/result")) is None:
+            return
+        ok = await _step(recorder, "report", client.get(f"{base}/report", params={"format": report_format})) is not None
+    finally:
+        recorder.record("flow", time.perf_counter() - started, 200 if ok else None)
+
+
+async def _user(
+    client: httpx.AsyncClient,
+    recorder: LoadRecorder,
+    user_id: int,
+    deadline: float,
+    iterations: int,
+    clauses: int,
+    report_format: str,
+) -> None:
+    rng = random.Random(user_id)
+    done = 0
+    while time.perf_counter() < deadline and (iterations <= 0 or done < iterations):
+        kind = rng.choice(CONTRACT_KINDS)
+        text = generate_contract(kind, clauses, headings=rng.random() < 0.8, seed=rng.randrange(1 << 30))
+        await _flow(client, recorder, text, kind, report_format)
+        done += 1
+
+
+async def run(
+    base_url: str,
+    users: int,
+    duration: float,
+    iterations: int,
+    clauses: int,
+    report_format: str,
+    timeout: float,
+) -> dict:
+    recorder = LoadRecorder()
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        deadline = started + duration if duration > 0 else float("inf")
+        await asyncio.gather(
+            *(_user(client, recorder, idx, deadline, iterations, clauses, report_format) for idx in range(users))
+        )
+        elapsed = time.perf_counter() - started
+    return recorder.summary(elapsed)
+
+
+def _print(summary: dict, users: int) -> None:
+    print(
+        f"users={users} elapsed={summary['elapsed_s']}s flows={summary['flows_completed']} "
+        f"throughput={summary['throughput_flows_per_s']} flows/s"
+    )
+    print(f"{'step':<8} {'count':>6} {'err%':>6} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9}  status")
+    for step, stats in summary["steps"].items():
+        print(
+            f"{step:<8} {stats['count']:>6} {stats['error_rate'] * 100:>6.1f} {stats['p50_ms']:>9.1f} "
+            f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}  {stats['status_codes']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run, 0 = use --iterations only")
+    parser.add_argument("--iterations", type=int, default=0, help="flows per user, 0 = until --duration")
+    parser.add_argument("--clauses", type=int, default=30, help="clauses per generated contract")
+    parser.add_argument("--report-format", default="md", choices=("md", "pdf"))
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request timeout in seconds")
+    parser.add_argument("--json", type=Path, default=None, help="also write the summary as JSON")
+    args = parser.parse_args()
+    if args.duration <= 0 and args.iterations <= 0:
+        parser.error("set --duration or --iterations")
+
+    summary = asyncio.run(
+        run(args.base_url, args.users, args.duration, args.iterations, args.clauses, args.report_format, args.timeout)
+    )
+    _print(summary, args.users)
+    if args.json is not None:
+        args.json.write_text(json.dumps({"users": args.users, **summary}, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""OpenAI-compatible chat completions stand-in for load tests.
+
+Answers come from `DummyLLMProvider`, chosen by the system prompt the real providers send, so
+the pipeline behaves as it would against a model. Latency, rate limits and failures are
+configurable. ``"stream": true`` is answered with server-sent chunks of one token each,
+``--per-token-ms`` apart, and ``max_tokens`` cuts answers short as a model would::
+
+    python -m backend.loadtest.mock_openai --port 8100 --latency lognormal:400:0.6 \\
+        --rpm 600 --tpm 200000 --error-429 0.02 --error-5xx 0.01
+
+Point the API at it with ``OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=mock
+LLM_PROVIDER=openai``. ``GET /stats`` returns request, error and token counters.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from backend.application.llm_scheduler import TokenBucket
+from backend.infrastructure.llm.dummy_provider import DummyLLMProvider
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """`fixed:MS`, `uniform:LO:HI`, `lognormal:MEDIAN:SIGMA` or `exp:MEAN`; returns seconds."""
+    kind, *raw = spec.split(":")
+    args = [float(value) for value in raw]
+    if kind == "fixed" and len(args) == 1:
+        return lambda rng: args[0] / 1000
+    if kind == "uniform" and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1]) / 1000
+    if kind == "lognormal" and len(args) == 2:
+        return lambda rng: args[0] * rng.lognormvariate(0, args[1]) / 1000
+    if kind == "exp" and len(args) == 1:
+        return lambda rng: rng.expovariate(1 / args[0]) / 1000
+    raise ValueError(f"Unsupported latency spec: {spec}")
+
+
+def count_tokens(text: str) -> int:
+    # Same rough rule as the scheduler estimate: Korean is close to one token per character
+    return max(1, len(text))
+
+
+@dataclass
+class MockConfig:
+    latency: str = "lognormal:300:0.5"
+    per_token_ms: float = 0.0
+    rpm: int = 0
+    tpm: int = 0
+    error_429: float = 0.0
+    error_5xx: float = 0.0
+    seed: int = 0
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    completed: int = 0
+    rate_limited: int = 0
+    injected_429: int = 0
+    injected_5xx: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    streams: int = 0
+    streams_aborted: int = 0
+    truncated: int = 0
+    in_flight: int = 0
+    by_model: Dict[str, int] = field(default_factory=dict)
+
+
+async def _answer(provider: DummyLLMProvider, system: str, user: str) -> str:
+    """Pick the dummy method matching the prompt a real provider would have sent."""
+    prompt = f"{system}\n{user}"
+    if "risk_score(" in system:
+        return json.dumps(await provider.analyze_clause(user), ensure_ascii=False)
+    if "suggestion(" in prompt:
+        return json.dumps(await provider.suggest_improvement(user), ensure_ascii=False)
+    if "employment(" in prompt and "lease(" in prompt:
+        contract_type = "lease" if "보증금" in user else "employment" if "급여" in user or "근로" in user else "general"
+        return json.dumps({"type": contract_type, "reason": "mock"})
+    if "classif" in system:
+        return await provider.classify_clause(user)
+    if "risk" in system.lower():
+        return await provider.analyze_risk(user)
+    return await provider.summarize_clause(user)
+
+
+def _error(status: int, message: str, kind: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    body = {"error": {"message": message, "type": kind, "param": None, "code": None}}
+    return JSONResponse(status_code=status, content=body, headers=headers)
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI")
+    rng = random.Random(config.seed)
+    latency = parse_latency(config.latency)
+    requests_bucket = TokenBucket(config.rpm)
+    tokens_bucket = TokenBucket(config.tpm)
+    provider = DummyLLMProvider()
+    stats = MockStats()
+    app.state.stats = stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        stats.requests += 1
+        model = payload.get("model", "mock")
+        stats.by_model[model] = stats.by_model.get(model, 0) + 1
+        messages = payload.get("messages") or []
+        system = "\n".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+        user = "\n".join(m.get("content") or "" for m in messages if m.get("role") != "system")
+        prompt_tokens = count_tokens(system + user)
+
+        delay = max(requests_bucket.delay_for(1), tokens_bucket.delay_for(prompt_tokens))
+        if delay > 0:
+            stats.rate_limited += 1
+            retry_after = f"{delay:.3f}"
+            return _error(429, "Rate limit reached (mock)", "rate_limit_exceeded", {"retry-after": retry_after})
+        requests_bucket.consume(1)
+        tokens_bucket.consume(prompt_tokens)
+
+        roll = rng.random()
+        if roll < config.error_429:
+            stats.injected_429 += 1
+            return _error(429, "Injected rate limit (mock)", "rate_limit_exceeded", {"retry-after": "0.5"})
+        if roll < config.error_429 + config.error_5xx:
+            stats.injected_5xx += 1
+            await asyncio.sleep(latency(rng) / 2)
+            return _error(rng.choice((500, 502, 503)), "Injected server error (mock)", "server_error")
+
+        content = await _answer(provider, system, user)
+        completion_tokens = count_tokens(content)
+        finish_reason = "stop"
+        max_tokens = payload.get("max_tokens") or payload.get("max_completion_tokens")
+        if max_tokens and completion_tokens > int(max_tokens):
+            # One character per token, so the cut lands where a model would stop
+            content, completion_tokens, finish_reason = content[: int(max_tokens)], int(max_tokens), "length"
+            stats.truncated += 1
+        stats.prompt_tokens += prompt_tokens
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        if payload.get("stream"):
+            include_usage = bool((payload.get("stream_options") or {}).get("include_usage"))
+            stats.streams += 1
+            return StreamingResponse(
+                _stream(completion_id, model, content, finish_reason, prompt_tokens, include_usage),
+                media_type="text/event-stream",
+            )
+
+        stats.in_flight += 1
+        try:
+            await asyncio.sleep(latency(rng) + completion_tokens * config.per_token_ms / 1000)
+        finally:
+            stats.in_flight -= 1
+        stats.completed += 1
+        stats.completion_tokens += completion_tokens
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    async def _stream(
+        completion_id: str, model: str, content: str, finish_reason: str, prompt_tokens: int, include_usage: bool
+    ) -> AsyncIterator[str]:
+        def event(choices: list, usage: Optional[dict] = None) -> str:
+            body = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+            }
+            if usage is not None:
+                body["usage"] = usage
+            return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+
+        sent = 0
+        finished = False
+        stats.in_flight += 1
+        try:
+            # Time to first token, then one token per chunk
+            await asyncio.sleep(latency(rng))
+            yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+            for token in content:
+                yield event([{"index": 0, "delta": {"content": token}, "finish_reason": None}])
+                sent += 1
+                if config.per_token_ms:
+                    await asyncio.sleep(config.per_token_ms / 1000)
+            yield event([{"index": 0, "delta": {}, "finish_reason": finish_reason}])
+            if include_usage:
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": sent, "total_tokens": prompt_tokens + sent}
+                yield event([], usage)
+            yield "data: [DONE]\n\n"
+            finished = True
+        finally:
+            # A client that closes the stream early stops generation, so only sent tokens count
+            stats.in_flight -= 1
+            stats.completion_tokens += sent
+            if finished:
+                stats.completed += 1
+            else:
+                stats.streams_aborted += 1
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats.__dict__
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default=MockConfig.latency, help="fixed:MS | uniform:LO:HI | lognormal:MEDIAN:SIGMA | exp:MEAN")
+    parser.add_argument("--per-token-ms", type=float, default=0.0, help="extra latency per completion token")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429, 0 = unlimited")
+    parser.add_argument("--tpm", type=int, default=0, help="prompt tokens per minute before 429, 0 = unlimited")
+    parser.add_argument("--error-429", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="fraction of requests answered with 5xx")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = MockConfig(
+        latency=args.latency,
+        per_token_ms=args.per_token_ms,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        error_429=args.error_429,
+        error_5xx=args.error_5xx,
+        seed=args.seed,
+    )
+    parse_latency(config.latency)  # fail fast on a bad spec
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
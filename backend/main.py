@@ -1,57 +1,112 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
+import secrets
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
-from fastapi import Body, FastAPI, File, HTTPException, UploadFile
+from fastapi import Body, FastAPI, File, Header, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from fastapi.responses import Response, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from backend.application.analysis_facade import AnalysisFacade
 from backend.application.clause_extractor import ClauseExtractor
 from backend.application.llm_agent import LLMAgent
+from backend.application.llm_scheduler import LLMScheduler
+from backend.application.portfolio_analytics import PortfolioAnalytics
+from backend.application.profiling import RequestProfiler
+from backend.application.queued_analysis import AnalysisPending, QueuedAnalysis
 from backend.application.risk_analyzer import RiskAnalyzer
-from backend.application.report_builder import render_report_html, render_report_md
+from backend.application.report_builder import render_report_md, render_report_pdf
+from backend.application.template_matcher import TemplateMatcher
 from backend.config import Settings
-from backend.infrastructure.llm.dummy_provider import DummyLLMProvider
-from backend.infrastructure.llm.openai_provider import OpenAILLMProvider
-from backend.infrastructure.ocr.tesseract_ocr_adapter import TesseractOCRAdapter
+from backend.domain.models import ContractTemplate
+from backend.infrastructure.compute.executors import ExecutorPool
+from backend.infrastructure.compute.shared_models import llm_provider, ocr_model
+from backend.infrastructure.http.serialized import cached_json_response, negotiated_encoding
+from backend.infrastructure.metrics.loop_lag import LoopLagMonitor
+from backend.infrastructure.metrics.process_memory import memory_usage
+from backend.infrastructure.metrics.prometheus import REGISTRY, gauge_lines
+from backend.infrastructure.metrics.tracing import span
+from backend.infrastructure.queue.sqlite_queue import SQLiteWorkQueue
+from backend.infrastructure.search.clause_index import ClauseSearchIndex
+from backend.infrastructure.storage.file_store import StorageManager
+from backend.infrastructure.storage.improvement_store import ImprovementStore
+from backend.infrastructure.storage.profile_store import ProfileStore
 from backend.infrastructure.storage.repository import InMemoryRepository
+from backend.infrastructure.storage.template_store import TemplateStore
 
 logger = logging.getLogger(__name__)
 
 settings = Settings()
 Path(settings.storage_path).mkdir(parents=True, exist_ok=True)
 
-repository = InMemoryRepository(settings.storage_path)
-ocr_service = TesseractOCRAdapter(language=settings.ocr_language)
+try:
+    storage = StorageManager(
+        Path(settings.storage_path),
+        compression=settings.storage_compression,
+        compression_level=settings.storage_compression_level,
+        retention_days=settings.storage_retention_days,
+    )
+except ImportError as exc:  # pragma: no cover - fallback path
+    logger.warning("Storage compression unavailable, storing uncompressed: %s", exc)
+    storage = StorageManager(Path(settings.storage_path), retention_days=settings.storage_retention_days)
+repository = InMemoryRepository(settings.storage_path, storage=storage)
+analytics = PortfolioAnalytics()
+repository.add_result_listener(analytics.on_result_saved)
+repository.add_removal_listener(analytics.on_result_removed)
+search_index = ClauseSearchIndex(Path(settings.search_index_path))
+repository.add_result_listener(search_index.on_result_saved)
+repository.add_removal_listener(search_index.on_result_removed)
+# Preloaded by `python -m backend.prefork` and then shared by its workers; built here otherwise
+ocr_service = ocr_model(settings)
 clause_extractor = ClauseExtractor()
-provider_choice = settings.llm_provider.lower().strip()
-provider: object
+provider = llm_provider(settings)
 
-if provider_choice == "openai":
-    provider = OpenAILLMProvider(api_key=settings.openai_api_key, model=settings.openai_model)
-    logger.info("Using OpenAI LLM provider with model %s", settings.openai_model)
-elif provider_choice in {"hf", "huggingface"}:
-    try:
-        from backend.infrastructure.llm.hf_provider import HuggingFaceLLMProvider
-
-        provider = HuggingFaceLLMProvider(
-            model=settings.hf_model,
-            token=settings.hf_token,
-            api_url=settings.hf_api_url,
-        )
-        logger.info("Using Hugging Face provider with model %s", settings.hf_model)
-    except Exception as exc:  # pragma: no cover - fallback path
-        logger.warning("Hugging Face provider init failed, falling back to DummyLLMProvider: %s", exc)
-        provider = DummyLLMProvider()
-else:
-    provider = DummyLLMProvider()
-    logger.info("Using Dummy LLM provider")
-
-llm_agent = LLMAgent(provider)
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.llm_max_concurrency,
+    rpm=settings.llm_rpm,
+    tpm=settings.llm_tpm,
+)
+improvement_store = ImprovementStore(Path(settings.improvement_store_path))
+repository.add_removal_listener(improvement_store.forget_document)
+llm_agent = LLMAgent(provider, improvement_store=improvement_store, scheduler=llm_scheduler)
 risk_analyzer = RiskAnalyzer()
+executors = ExecutorPool(
+    thread_workers=settings.executor_thread_workers,
+    process_workers=settings.executor_process_workers,
+)
+loop_lag = LoopLagMonitor()
+
+
+def _scheduler_metrics() -> list:
+    snapshot = llm_scheduler.snapshot()
+    return gauge_lines(
+        "cg_llm_scheduler_queue_depth", "Queued LLM requests by priority.", snapshot["queue_depth"], label="priority"
+    ) + gauge_lines("cg_llm_scheduler_running", "LLM requests currently running.", {"": snapshot["running"]})
+
+
+REGISTRY.add_collector(_scheduler_metrics)
+REGISTRY.add_collector(
+    lambda: gauge_lines(
+        "cg_storage_bytes",
+        "Bytes of documents at rest by measure.",
+        {key: value for key, value in repository.storage.usage().items() if key.endswith("_bytes")},
+        label="measure",
+    )
+)
+REGISTRY.add_collector(
+    lambda: gauge_lines(
+        "cg_process_memory_bytes", "Memory of the serving process by measure.", memory_usage(), label="measure"
+    )
+)
+profiler = RequestProfiler(ProfileStore(Path(settings.profile_path)))
+repository.add_removal_listener(profiler.store.forget)
 
 facade = AnalysisFacade(
     repository=repository,
@@ -59,9 +114,71 @@ facade = AnalysisFacade(
     clause_extractor=clause_extractor,
     llm_agent=llm_agent,
     risk_analyzer=risk_analyzer,
+    executors=executors,
+    template_matcher=TemplateMatcher(
+        TemplateStore(Path(settings.template_store_path)), min_similarity=settings.template_min_similarity
+    ),
 )
 
-app = FastAPI(title="Contract Guardian API", version="0.1.0")
+# With a shared work queue, analyses run on `python -m backend.worker` processes instead of here
+work_queue: Optional[SQLiteWorkQueue] = None
+queued_analysis: Optional[QueuedAnalysis] = None
+if settings.work_queue_path is not None:
+    work_queue = SQLiteWorkQueue(
+        Path(settings.work_queue_path),
+        lease_s=settings.work_queue_lease_s,
+        max_attempts=settings.work_queue_max_attempts,
+        journal_mode=settings.work_queue_journal_mode,
+    )
+    queued_analysis = QueuedAnalysis(
+        work_queue,
+        repository,
+        executors=executors,
+        wait_timeout_s=settings.work_queue_wait_s,
+        retention_s=settings.work_queue_retention_days * 86400,
+    )
+    repository.add_removal_listener(queued_analysis.on_result_removed)
+    REGISTRY.add_collector(
+        lambda: gauge_lines("cg_work_queue_jobs", "Work queue jobs by status.", work_queue.stats()["jobs"], label="status")
+    )
+    logger.info("Analyses go through the work queue at %s", settings.work_queue_path)
+analysis_runner = queued_analysis or facade
+
+
+async def _compact_storage_periodically(interval_s: float) -> None:
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            # Every process sharing the storage schedules this; only one runs it per interval
+            stats = await executors.run_thread(repository.compact_storage, interval_s * 0.9)
+            if not stats.get("skipped"):
+                logger.info("Storage compaction finished: %s", stats)
+            # Documents the process that ran it deleted are still held here
+            pruned = await executors.run_thread(repository.prune_deleted)
+            if pruned:
+                logger.info("Dropped %d documents deleted by another process", len(pruned))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Storage compaction failed: %s", exc)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    loop_lag.start()
+    await executors.warm_up()
+    compaction = None
+    if settings.storage_compaction_interval_s > 0:
+        compaction = asyncio.create_task(_compact_storage_periodically(settings.storage_compaction_interval_s))
+    collector = asyncio.create_task(queued_analysis.run()) if queued_analysis is not None else None
+    yield
+    if compaction is not None:
+        compaction.cancel()
+    if collector is not None:
+        collector.cancel()
+    loop_lag.stop()
+    executors.shutdown()
+
+
+app = FastAPI(title="Contract Guardian API", version="0.1.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -89,42 +206,163 @@ class ImprovePayload(BaseModel):
     clause_text: str
 
 
+class BulkImprovePayload(BaseModel):
+    min_score: int = 50
+    max_calls: int = 20
+    concurrency: int = 4
+
+
+def _require_admin(x_admin_token: Optional[str]) -> None:
+    if not settings.admin_token or not secrets.compare_digest(x_admin_token or "", settings.admin_token):
+        raise HTTPException(status_code=403, detail="Administrator token required")
+
+
+def _profiling_requested(profile: bool, x_profile: Optional[str], x_admin_token: Optional[str]) -> bool:
+    if not profile and (x_profile or "").lower() not in {"1", "true", "yes"}:
+        return False
+    _require_admin(x_admin_token)
+    return True
+
+
 @app.post("/api/documents/{document_id}/analyze")
-async def analyze_document(document_id: str, payload: AnalyzePayload = Body(default=AnalyzePayload())):
-    result = await facade.analyze(document_id, contract_type=payload.contract_type)
-    return result
+async def analyze_document(
+    request: Request,
+    document_id: str,
+    payload: AnalyzePayload = Body(default=AnalyzePayload()),
+    profile: bool = False,
+    x_tenant_id: Optional[str] = Header(default=None),
+    x_profile: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    if _profiling_requested(profile, x_profile, x_admin_token):
+        async with profiler.capture(document_id, "analyze"):
+            return await _analyze_response(request, document_id, payload.contract_type, x_tenant_id)
+    return await _analyze_response(request, document_id, payload.contract_type, x_tenant_id)
+
+
+async def _analyze_response(request: Request, document_id: str, contract_type: str, tenant: Optional[str]) -> Response:
+    try:
+        await analysis_runner.analyze(document_id, contract_type=contract_type, tenant=tenant)
+    except AnalysisPending as pending:
+        # Still running on a queue worker: point the client at the status it can poll
+        status_url = str(request.url_for("get_status", document_id=document_id))
+        return JSONResponse(
+            status_code=202,
+            content={
+                "documentId": document_id,
+                "jobId": pending.job_id,
+                "stage": repository.get_status(document_id).stage,
+                "statusUrl": status_url,
+                "resultUrl": str(request.url_for("get_result", document_id=document_id)),
+            },
+            headers={"Location": status_url, "Retry-After": "5"},
+        )
+    # Serialize and compress in a worker thread; the payload is then cached for /result as well
+    payload = await executors.run_thread(repository.get_serialized_result, document_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    encoding = negotiated_encoding(request, payload)
+    if encoding is not None:
+        await executors.run_thread(payload.encoded, encoding)
+    return cached_json_response(request, payload)
+
+
+@app.post("/api/documents/{document_id}/cancel")
+async def cancel_analysis(document_id: str):
+    return {"documentId": document_id, "cancelled": analysis_runner.cancel(document_id)}
+
+
+async def _catch_up_result(document_id: str) -> None:
+    """Import a result, and suggestions for it, that another API process's requests produced."""
+    if queued_analysis is not None and repository.get_analysis_result(document_id) is None:
+        await queued_analysis.load(document_id)
+    await facade.refresh_improvements(document_id)
 
 
 @app.get("/api/documents/{document_id}/result")
-async def get_result(document_id: str):
-    result = await facade.get_result(document_id)
+async def get_result(
+    request: Request,
+    document_id: str,
+    sort: Optional[str] = None,
+    min_level: Optional[str] = None,
+    page: Optional[int] = None,
+    page_size: int = 50,
+    fields: Optional[str] = None,
+):
+    await _catch_up_result(document_id)
+    # Without query options keep returning the full AnalysisResult for existing clients
+    if sort is None and min_level is None and page is None and fields is None:
+        payload = repository.get_serialized_result(document_id)
+        if not payload:
+            raise HTTPException(status_code=404, detail="Result not found")
+        return cached_json_response(request, payload)
+    result = await facade.get_result_page(
+        document_id,
+        sort=sort or "risk_desc",
+        min_level=min_level,
+        page=page or 1,
+        page_size=min(page_size, 500),
+        fields=fields,
+    )
     if not result:
         raise HTTPException(status_code=404, detail="Result not found")
     return result
 
 
+@app.get("/api/documents/{document_id}/summary")
+async def get_summary(document_id: str):
+    await _catch_up_result(document_id)
+    summary = await facade.get_result_summary(document_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Result not found")
+    return summary
+
+
 @app.get("/api/documents/{document_id}/status")
-async def get_status(document_id: str):
-    return repository.get_status(document_id)
+async def get_status(request: Request, document_id: str):
+    if queued_analysis is not None and repository.get_status(document_id).stage not in ("done", "failed", "cancelled"):
+        # Progress of a job started through another API process may not have been mirrored yet
+        await queued_analysis.load(document_id)
+    return cached_json_response(request, repository.get_serialized_status(document_id))
 
 
 @app.get("/api/documents/{document_id}/report")
-async def get_report(document_id: str, format: str = "pdf"):
+async def get_report(
+    document_id: str,
+    format: str = "pdf",
+    profile: bool = False,
+    x_profile: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    if _profiling_requested(profile, x_profile, x_admin_token):
+        async with profiler.capture(document_id, "report"):
+            return await _build_report(document_id, format)
+    return await _build_report(document_id, format)
+
+
+@app.get("/api/documents/{document_id}/profiles")
+async def get_profiles(document_id: str, x_admin_token: Optional[str] = Header(default=None)):
+    _require_admin(x_admin_token)
+    return {"documentId": document_id, "profiles": profiler.store.list(document_id)}
+
+
+async def _build_report(document_id: str, format: str) -> Response:
+    await _catch_up_result(document_id)
     result = await facade.get_result(document_id)
     if not result:
         raise HTTPException(status_code=404, detail="Result not found")
 
     fmt = format.lower()
-    md = render_report_md(result)
+    with span("report.markdown", clauses=len(result.clauses)):
+        # String formatting is cheaper than pickling the whole result to a worker process
+        md = await executors.run_thread(render_report_md, result)
     if fmt == "md":
         return Response(content=md, media_type="text/markdown", headers={"Content-Disposition": "attachment; filename=report.md"})
 
     # Try to render PDF, otherwise fall back to markdown
     try:
-        from weasyprint import HTML  # type: ignore
-
-        html = render_report_html(result)
-        pdf_bytes = HTML(string=html).write_pdf()
+        with span("report.pdf"):
+            pdf_bytes = await executors.run_cpu(render_report_pdf, result)
         return Response(
             content=pdf_bytes,
             media_type="application/pdf",
@@ -140,9 +378,162 @@ async def get_report(document_id: str, format: str = "pdf"):
 
 @app.post("/api/documents/{document_id}/clauses/{clause_id}/improve")
 async def improve_clause(document_id: str, clause_id: str, payload: ImprovePayload):
-    # For now, simply return suggestion without persisting
+    await _catch_up_result(document_id)
     try:
-        suggestion = await llm_agent.provider.suggest_improvement(payload.clause_text)
+        improvement = await facade.improve_clause(document_id, clause_id, payload.clause_text)
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"Improvement failed: {exc}") from exc
-    return {"clauseId": clause_id, **suggestion}
+    return {"clauseId": clause_id, **improvement.model_dump()}
+
+
+@app.post("/api/documents/{document_id}/improvements")
+async def improve_clauses(document_id: str, payload: BulkImprovePayload = Body(default=BulkImprovePayload())):
+    await _catch_up_result(document_id)
+    stats = await facade.improve_clauses(
+        document_id,
+        min_score=payload.min_score,
+        max_calls=max(0, min(payload.max_calls, 200)),
+        concurrency=max(1, min(payload.concurrency, 16)),
+    )
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    return {"documentId": document_id, **stats}
+
+
+@app.get("/api/storage/usage")
+async def storage_usage():
+    return repository.storage.usage()
+
+
+@app.post("/api/storage/compact")
+async def compact_storage(x_admin_token: Optional[str] = Header(default=None)):
+    _require_admin(x_admin_token)
+    return await executors.run_thread(repository.compact_storage)
+
+
+def _template_summary(template: ContractTemplate) -> dict:
+    return {
+        "id": template.id,
+        "name": template.name,
+        "contract_type": template.contract_type,
+        "filename": template.filename,
+        "clause_count": len(template.clauses),
+        "created_at": template.created_at,
+    }
+
+
+@app.post("/api/templates")
+async def register_template(
+    name: str,
+    contract_type: Optional[str] = None,
+    file: UploadFile = File(...),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    _require_admin(x_admin_token)
+    template = await facade.register_template(file, name, contract_type=contract_type)
+    return _template_summary(template)
+
+
+@app.get("/api/templates")
+async def list_templates():
+    return {"templates": [_template_summary(template) for template in facade.template_matcher.store.list()]}
+
+
+@app.delete("/api/templates/{template_id}")
+async def delete_template(template_id: str, x_admin_token: Optional[str] = Header(default=None)):
+    _require_admin(x_admin_token)
+    if not await executors.run_thread(facade.template_matcher.store.delete, template_id):
+        raise HTTPException(status_code=404, detail="Template not found")
+    return {"templateId": template_id, "deleted": True}
+
+
+@app.get("/api/runtime")
+async def runtime_stats():
+    runtime = {
+        "event_loop_lag": loop_lag.snapshot(),
+        "executors": executors.snapshot(),
+        "process": {"pid": os.getpid(), "memory_bytes": memory_usage()},
+    }
+    if work_queue is not None:
+        runtime["work_queue"] = await executors.run_thread(work_queue.stats)
+    return runtime
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/llm/scheduler")
+async def scheduler_stats():
+    return llm_scheduler.snapshot()
+
+
+def _analytics_filters(
+    contract_type: Optional[str], since: Optional[datetime], until: Optional[datetime], min_level: Optional[str]
+) -> dict:
+    if min_level is not None and min_level not in {"low", "medium", "high"}:
+        raise HTTPException(status_code=400, detail=f"Unsupported risk level: {min_level}")
+    return {"contract_type": contract_type, "since": since, "until": until, "min_level": min_level}
+
+
+@app.get("/api/analytics/aggregate")
+async def analytics_aggregate(
+    group_by: str = "category",
+    contract_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_level: Optional[str] = None,
+):
+    filters = _analytics_filters(contract_type, since, until, min_level)
+    try:
+        groups = analytics.aggregate(group_by=group_by, **filters)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"groupBy": group_by, "groups": groups}
+
+
+@app.get("/api/analytics/histogram")
+async def analytics_histogram(
+    bins: int = 10,
+    contract_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_level: Optional[str] = None,
+):
+    filters = _analytics_filters(contract_type, since, until, min_level)
+    return analytics.histogram(bins=max(1, min(bins, 100)), **filters)
+
+
+@app.get("/api/analytics/top")
+async def analytics_top(
+    k: int = 100,
+    contract_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_level: Optional[str] = None,
+):
+    filters = _analytics_filters(contract_type, since, until, min_level)
+    hits = analytics.top_k(k=max(1, min(k, 1000)), **filters)
+    for hit in hits:
+        result = repository.get_analysis_result(hit["document_id"])
+        if result and hit["position"] < len(result.clauses):
+            clause = result.clauses[hit["position"]]
+            hit["clause_id"] = clause.id
+            hit["summary"] = clause.summary
+    return {"clauses": hits}
+
+
+@app.get("/api/search")
+async def search_clauses(
+    q: str,
+    level: Optional[str] = None,
+    contract_type: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+):
+    page_size = max(1, min(page_size, 100))
+    total, hits = await executors.run_thread(
+        search_index.search, q, level=level, contract_type=contract_type, page=page, page_size=page_size
+    )
+    return {"query": q, "total": total, "page": max(page, 1), "page_size": page_size, "hits": hits}
@@ -0,0 +1,233 @@
+"""Pre-fork API server: models are loaded once and shared copy-on-write by forked workers.
+
+``uvicorn --workers N`` starts N fresh interpreters that each import ``backend.main`` and so
+each load their own EasyOCR reader and local model. Here the master loads them first and then
+forks the workers, which import the app with the weights already in memory::
+
+    WORK_QUEUE_PATH=data/queue.sqlite3 PREFORK_WORKERS=4 python -m backend.prefork --host 0.0.0.0 --port 8000
+
+Each worker keeps documents, status and results in its own memory, so analyses must go
+through the shared work queue: every worker follows its change feed and imports all results.
+The server refuses to start without ``WORK_QUEUE_PATH``. Besides the API workers the master
+forks ``PREFORK_ANALYSIS_WORKERS`` queue consumers (see ``backend.worker``) that run the
+analyses on the same shared weights.
+
+API workers share the listening socket; every forked process gets ``PREFORK_TORCH_THREADS``
+torch threads (default: CPUs / processes). The master restarts processes that die, forwards
+SIGTERM/SIGINT for a graceful shutdown and logs per-process memory on SIGUSR1. POSIX only.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from multiprocessing import resource_tracker
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from backend.infrastructure.metrics.process_memory import memory_usage
+
+logger = logging.getLogger(__name__)
+
+# A worker dying sooner than this after its start counts as a crash loop
+_CRASH_WINDOW_S = 10.0
+_MiB = 1024 * 1024
+API = "api"
+ANALYSIS = "analysis"
+
+
+def log_memory(pids: Iterable[int]) -> None:
+    """One line per process, then the sum of PSS: what the workers really cost together."""
+    total = 0
+    for pid in sorted(pids):
+        try:
+            usage = memory_usage(pid)
+        except FileNotFoundError:
+            continue
+        total += usage["pss"]
+        logger.info(
+            "pid %d: rss %.0f MiB, pss %.0f MiB, shared %.0f MiB, private %.0f MiB",
+            pid,
+            usage["rss"] / _MiB,
+            usage["pss"] / _MiB,
+            usage["shared"] / _MiB,
+            usage["private"] / _MiB,
+        )
+    logger.info("total pss %.0f MiB", total / _MiB)
+
+
+class PreforkServer:
+    """Forks `workers` uvicorn servers on an already bound socket, plus `analysis_workers`
+    work-queue consumers, and keeps them running."""
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        workers: int,
+        torch_threads: int,
+        app: str = "backend.main:app",
+        log_level: str = "info",
+        analysis_workers: int = 0,
+        queue_path: Optional[Path] = None,
+    ) -> None:
+        if analysis_workers and queue_path is None:
+            raise ValueError("analysis workers need a work queue path")
+        self.sock = sock
+        self.workers = max(1, workers)
+        self.analysis_workers = max(0, analysis_workers)
+        self.queue_path = queue_path
+        self.torch_threads = max(1, torch_threads)
+        self.app = app
+        self.log_level = log_level
+        # pid -> (role, start time)
+        self.children: Dict[int, Tuple[str, float]] = {}
+        self.stopping = False
+        self._backoff = 0.0
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGUSR1, lambda *_: log_memory([os.getpid(), *self.children]))
+        for _ in range(self.workers):
+            self._spawn(API)
+        for _ in range(self.analysis_workers):
+            self._spawn(ANALYSIS)
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            child = self.children.pop(pid, None)
+            if child is None or self.stopping:
+                continue
+            role, started = child
+            lived = time.monotonic() - started
+            logger.warning(
+                "%s worker %d exited (%s) after %.1fs; restarting", role, pid, os.waitstatus_to_exitcode(status), lived
+            )
+            # Back off while workers die right after starting, e.g. on a broken configuration
+            self._backoff = min(30.0, max(1.0, self._backoff * 2)) if lived < _CRASH_WINDOW_S else 0.0
+            time.sleep(self._backoff)
+            if not self.stopping:
+                self._spawn(role)
+        self.sock.close()
+        logger.info("All workers stopped")
+        return 0
+
+    def _stop(self, signum: int, _frame: object) -> None:
+        # A second signal is forwarded too; uvicorn then exits without waiting for requests
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _spawn(self, role: str) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = self._serve() if role == API else self._analyze()
+            except BaseException:  # noqa: BLE001
+                logger.exception("Worker %d failed", os.getpid())
+            finally:
+                os._exit(code)
+        self.children[pid] = (role, time.monotonic())
+        logger.info("Started %s worker %d", role, pid)
+
+    def _child_setup(self) -> None:
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGUSR1):
+            signal.signal(signum, signal.SIG_DFL)
+        from backend.infrastructure.compute.shared_models import limit_torch_threads
+
+        limit_torch_threads(self.torch_threads)
+
+    def _serve(self) -> int:
+        self._child_setup()
+        import uvicorn
+
+        server = uvicorn.Server(uvicorn.Config(self.app, log_level=self.log_level))
+        server.run(sockets=[self.sock])
+        return 0 if server.started else 1
+
+    def _analyze(self) -> int:
+        self._child_setup()
+        # Only the API workers accept connections
+        self.sock.close()
+        from backend.config import Settings
+        from backend.worker import run_worker
+
+        run_worker(Settings(), self.queue_path)
+        return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="default: PREFORK_WORKERS, else one per CPU")
+    parser.add_argument(
+        "--analysis-workers", type=int, default=None, help="work-queue consumers (default: PREFORK_ANALYSIS_WORKERS)"
+    )
+    parser.add_argument("--torch-threads", type=int, default=None, help="per process (default: PREFORK_TORCH_THREADS)")
+    parser.add_argument("--app", default="backend.main:app")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # Imported here: executor processes spawned by the workers re-import this module as __mp_main__
+    from backend.config import Settings
+    from backend.infrastructure.compute.shared_models import limit_torch_threads, preload
+
+    settings = Settings()
+    if settings.work_queue_path is None:
+        # Each worker would hold its own documents, status and results: requests landing on
+        # another worker than the one that ran the analysis would get 404s
+        parser.error("prefork workers do not share in-memory state; set WORK_QUEUE_PATH to a shared queue file")
+    cpus = os.cpu_count() or 1
+    workers = args.workers or settings.prefork_workers or cpus
+    analysis_workers = args.analysis_workers if args.analysis_workers is not None else settings.prefork_analysis_workers
+    torch_threads = args.torch_threads or settings.prefork_torch_threads or max(1, cpus // (workers + analysis_workers))
+
+    # Load single-threaded: an OpenMP pool started in the master would be unusable after fork
+    limit_torch_threads(1)
+    started = time.perf_counter()
+    loaded = preload(settings)
+    logger.info("Preloaded %s in %.1fs", ", ".join(loaded), time.perf_counter() - started)
+
+    # Started once here so the workers' executor process pools share one tracker process
+    resource_tracker.ensure_running()
+    sock = socket.create_server((args.host, args.port), backlog=2048)
+    sock.set_inheritable(True)
+    # Objects moved to the permanent generation are never visited by the collector, so its
+    # passes in the workers do not write to (and thereby copy) the pages holding the models
+    gc.collect()
+    gc.freeze()
+    logger.info(
+        "Serving on http://%s:%d with %d workers and %d analysis workers, %d torch thread(s) each",
+        args.host,
+        args.port,
+        workers,
+        analysis_workers,
+        torch_threads,
+    )
+    server = PreforkServer(
+        sock,
+        workers,
+        torch_threads,
+        app=args.app,
+        log_level=args.log_level,
+        analysis_workers=analysis_workers,
+        queue_path=Path(settings.work_queue_path),
+    )
+    sys.exit(server.run())
+
+
+if __name__ == "__main__":
+    main()
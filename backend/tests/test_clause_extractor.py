@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.application.clause_extractor import ClauseExtractor
+from backend.benchmarks.bench_clause_extractor import _legacy_split, make_document
+from backend.benchmarks.corpus import CONTRACT_KINDS, generate_contract
+
+_EDGE_CASES = (
+    "",
+    "   \n\n  ",
+    "계약서\r\n\r\n제1조  목적\r\n① 갑은\t\t을에게\r\n 1. 지급\r\n제 2 조 기타  사항",
+    "갑과 을은 다음과 같이 합의한다.\n\n\n임금은 매월 지급한다.\n  \n계약기간은 1년으로 한다.",
+    "1. 첫 줄부터 호로 시작한다.\n2. 둘째 호\n\n다음 문단",
+    "전문 제3조에 따른다.  본문\n제4조 (기타) 끝",
+)
+
+
+@pytest.mark.parametrize("kind", CONTRACT_KINDS)
+@pytest.mark.parametrize("headings", [True, False])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_split_matches_legacy_on_corpus(kind: str, headings: bool, seed: int) -> None:
+    text = generate_contract(kind, 40, headings=headings, seed=seed)
+    assert ClauseExtractor().split_into_clauses(text) == _legacy_split(text)
+
+
+@pytest.mark.parametrize("text", _EDGE_CASES)
+def test_split_matches_legacy_on_edge_cases(text: str) -> None:
+    assert ClauseExtractor().split_into_clauses(text) == _legacy_split(text)
+
+
+def test_split_matches_legacy_on_benchmark_document() -> None:
+    text = make_document(20)
+    assert ClauseExtractor().split_into_clauses(text) == _legacy_split(text)
+
+
+def test_clauses_reference_the_document_text() -> None:
+    text = make_document(2)
+    extractor = ClauseExtractor()
+    clauses = extractor.build_clauses(text)
+    assert [clause.raw_text for clause in clauses] == _legacy_split(text)
+    for clause, span in zip(clauses, extractor.split_spans(text)):
+        assert (clause.start, clause.end, clause.article_no) == (span.start, span.end, span.number)
+        assert text[span.start : span.end].startswith("제")
+
+
+def test_spans_nest_hang_and_ho() -> None:
+    text = make_document(1)
+    first = ClauseExtractor().split_spans(text)[0]
+    assert [(child.kind, child.number) for child in first.children] == [("항", 1), ("항", 2)]
+    ho = first.children[0].children
+    assert [(child.kind, child.number) for child in ho] == [("호", 1), ("호", 2)]
+    assert text[ho[1].start : ho[1].end] == "2. 수당은 근로시간에 비례한다."
+    # A 항 ends where the next one starts, without its trailing whitespace
+    assert text[first.children[0].end - 1] == "."
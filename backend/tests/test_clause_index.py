@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+from backend.domain.models import AnalysisResult, Clause, ClauseRisk
+from backend.infrastructure.search.clause_index import ClauseSearchIndex, SearchJournalWriter, tokenize
+
+
+def _clause(clause_id: str, text: str, summary: Optional[str] = None, category: Optional[str] = None, score: int = 40) -> Clause:
+    level = "high" if score >= 75 else "medium" if score >= 50 else "low"
+    return Clause(id=clause_id, raw_text=text, summary=summary, category=category, risk=ClauseRisk(score=score, level=level))
+
+
+def _result(document_id: str, *clauses: Clause, contract_type: str = "general") -> AnalysisResult:
+    return AnalysisResult(document_id=document_id, clauses=list(clauses), contract_type=contract_type)
+
+
+def _filler(n: int) -> AnalysisResult:
+    # Clauses without the query terms, so idf behaves as on a real corpus
+    return _result("filler", *(_clause(f"f{i}", f"본 계약의 일반 조건 {i}번 항목은 관계 법령에 따른다.") for i in range(n)))
+
+
+def _ids(hits: list) -> list:
+    return [(hit["document_id"], hit["clause_id"]) for hit in hits]
+
+
+def _journal_lines(path: Path) -> int:
+    return sum(1 for line in path.read_text(encoding="utf-8").splitlines() if line.strip())
+
+
+def test_tokenize_uses_hangul_bigrams() -> None:
+    assert tokenize("위약금을 Penalty 1") == ["위약", "약금", "금을", "penalty", "1"]
+    assert tokenize("갑") == ["갑"]
+
+
+def test_bm25_ranks_frequency_length_and_fields() -> None:
+    index = ClauseSearchIndex()
+    index.on_result_saved(_filler(20))
+    index.on_result_saved(
+        _result(
+            "doc",
+            _clause("once-long", "근로자가 퇴사하는 경우 위약금을 지급하며 세부 사항은 별도 합의에 따라 정하고 통지는 서면으로 한다."),
+            _clause("once-short", "위약금을 지급한다."),
+            _clause("twice", "위약금을 지급하고 추가 위약금도 지급한다."),
+            _clause("category", "계약 위반 시 위약금을 지급한다.", category="위약금"),
+        )
+    )
+    total, hits = index.search("위약금")
+    assert total == 4
+    ranked = [clause_id for _, clause_id in _ids(hits)]
+    # A category hit outweighs body frequency; more occurrences beat fewer; shorter beats longer
+    assert ranked[0] == "category"
+    assert ranked.index("twice") < ranked.index("once-short") < ranked.index("once-long")
+    assert all(a["relevance"] >= b["relevance"] for a, b in zip(hits, hits[1:]))
+
+
+def test_every_query_token_must_match() -> None:
+    index = ClauseSearchIndex()
+    index.on_result_saved(_result("doc", _clause("a", "위약금을 지급한다."), _clause("b", "원상복구 비용은 임차인이 부담한다.")))
+    assert index.search("위약금 원상복구") == (0, [])
+    assert _ids(index.search("원상복구")[1]) == [("doc", "b")]
+
+
+def test_filters_and_pagination() -> None:
+    index = ClauseSearchIndex()
+    index.on_result_saved(
+        _result("lease", *(_clause(f"l{i}", "위약금 " * (i + 1), score=80 if i % 2 else 20) for i in range(6)), contract_type="lease")
+    )
+    index.on_result_saved(_result("job", _clause("j", "위약금을 지급한다.", score=90), contract_type="employment"))
+
+    total, _ = index.search("위약금", level="high")
+    assert total == 4
+    total, hits = index.search("위약금", contract_type="employment")
+    assert (total, _ids(hits)) == (1, [("job", "j")])
+    assert index.search("위약금", contract_type="unknown") == (0, [])
+    assert index.search("위약금", level="extreme") == (0, [])
+
+    total, everything = index.search("위약금", page_size=100)
+    pages = [index.search("위약금", page=page, page_size=3)[1] for page in (1, 2, 3)]
+    assert total == 7
+    assert _ids([hit for page in pages for hit in page]) == _ids(everything)
+
+
+def test_resaving_a_document_replaces_its_clauses() -> None:
+    index = ClauseSearchIndex()
+    index.on_result_saved(_result("doc", _clause("a", "위약금을 지급한다.")))
+    index.on_result_saved(_result("doc", _clause("a", "원상복구 비용을 부담한다.")))
+    assert index.search("위약금") == (0, [])
+    assert len(index) == 1
+
+
+def test_journal_replay_restores_the_index(tmp_path: Path) -> None:
+    journal = tmp_path / "clauses.jsonl"
+    index = ClauseSearchIndex(journal)
+    index.on_result_saved(_filler(10))
+    index.on_result_saved(_result("a", _clause("a1", "위약금을 지급한다."), _clause("a2", "위약금 위약금"), contract_type="lease"))
+    index.on_result_saved(_result("b", _clause("b1", "위약금 없음")))
+    index.on_result_saved(_result("b", _clause("b1", "원상복구 의무")))
+    index.on_result_removed("filler")
+
+    replayed = ClauseSearchIndex(journal)
+    assert len(replayed) == len(index) == 3
+    for query in ("위약금", "원상복구", "일반 조건"):
+        assert replayed.search(query) == index.search(query)
+    assert replayed.search("위약금", contract_type="lease")[0] == 2
+    # Removal rewrote the journal: one line per live document, nothing left of the deleted one
+    assert _journal_lines(journal) == 2
+    assert "관계 법령" not in journal.read_text(encoding="utf-8")
+
+
+def test_index_follows_lines_other_processes_append(tmp_path: Path) -> None:
+    journal = tmp_path / "clauses.jsonl"
+    reader = ClauseSearchIndex(journal)
+    writer = ClauseSearchIndex(journal)
+    writer.on_result_saved(_result("doc", _clause("a", "위약금을 지급한다.")))
+    assert _ids(reader.search("위약금")[1]) == [("doc", "a")]
+
+    # Another process compacts the journal without a document it deleted
+    writer.on_result_saved(_result("gone", _clause("g", "원상복구")))
+    assert reader.search("원상복구")[0] == 1
+    writer.on_result_removed("gone")
+    assert reader.search("원상복구") == (0, [])
+    assert reader.search("위약금")[0] == 1
+
+
+def test_results_written_by_a_worker_are_not_appended_again(tmp_path: Path) -> None:
+    journal = tmp_path / "clauses.jsonl"
+    index = ClauseSearchIndex(journal)
+    result = _result("doc", _clause("a", "위약금을 지급한다."))
+    SearchJournalWriter(journal).on_result_saved(result)
+    # The API node imports the same result from the queue and saves it locally
+    index.on_result_saved(result)
+    assert _journal_lines(journal) == 1
+    assert index.search("위약금")[0] == 1
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, List, Tuple
+
+from backend.application.llm_scheduler import LLMScheduler, TokenBucket
+
+
+def _recorder(order: List[str], label: str) -> Callable[[], Awaitable[str]]:
+    async def call() -> str:
+        order.append(label)
+        await asyncio.sleep(0)
+        return label
+
+    return call
+
+
+async def _run_behind_gate(scheduler: LLMScheduler, requests: List[Tuple[str, str, str, int]], hold: float = 0.0) -> List[str]:
+    """Queue `requests` (label, flow, priority, tokens) while one gate call occupies the only slot."""
+    order: List[str] = []
+    release = asyncio.Event()
+
+    async def gate() -> None:
+        await release.wait()
+
+    gate_task = asyncio.ensure_future(scheduler.submit(gate, flow="gate"))
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.ensure_future(scheduler.submit(_recorder(order, label), flow=flow, priority=priority, tokens=tokens))
+        for label, flow, priority, tokens in requests
+    ]
+    await asyncio.sleep(hold)
+    release.set()
+    await asyncio.gather(gate_task, *tasks)
+    return order
+
+
+def test_fair_queuing_interleaves_flows() -> None:
+    scheduler = LLMScheduler(max_concurrency=1)
+    big = [(f"big-{i}", "big", "interactive", 100) for i in range(10)]
+    small = [(f"small-{i}", "small", "interactive", 100) for i in range(3)]
+    order = asyncio.run(_run_behind_gate(scheduler, big + small))
+    # Submitted after all ten, the small document's calls still go out within the first six
+    positions = [order.index(f"small-{i}") for i in range(3)]
+    assert max(positions) < 6
+    assert order.index("big-0") < order.index("big-1") < order.index("big-9")
+
+
+def test_weights_follow_token_cost() -> None:
+    scheduler = LLMScheduler(max_concurrency=1)
+    heavy = [(f"heavy-{i}", "heavy", "interactive", 400) for i in range(3)]
+    light = [(f"light-{i}", "light", "interactive", 100) for i in range(8)]
+    order = asyncio.run(_run_behind_gate(scheduler, heavy + light))
+    # One 400-token call costs as much virtual time as four 100-token ones; equal finish tags
+    # go to the earlier submission
+    assert order[:5] == ["light-0", "light-1", "light-2", "heavy-0", "light-3"]
+
+
+def test_interactive_goes_before_bulk() -> None:
+    scheduler = LLMScheduler(max_concurrency=1, bulk_max_wait_s=30.0)
+    requests = [("bulk-0", "batch", "bulk", 1), ("bulk-1", "batch", "bulk", 1), ("chat", "user", "interactive", 1)]
+    order = asyncio.run(_run_behind_gate(scheduler, requests))
+    assert order == ["chat", "bulk-0", "bulk-1"]
+
+
+def test_bulk_requests_age_past_interactive_ones() -> None:
+    scheduler = LLMScheduler(max_concurrency=1, bulk_max_wait_s=0.05)
+    requests = [("bulk-0", "batch", "bulk", 1), ("chat", "user", "interactive", 1)]
+    order = asyncio.run(_run_behind_gate(scheduler, requests, hold=0.1))
+    assert order == ["bulk-0", "chat"]
+
+
+def test_failures_reach_the_caller_and_free_the_slot() -> None:
+    async def scenario() -> Tuple[str, dict]:
+        scheduler = LLMScheduler(max_concurrency=1)
+
+        async def broken() -> None:
+            raise RuntimeError("provider down")
+
+        try:
+            await scheduler.submit(broken, flow="doc")
+        except RuntimeError as exc:
+            message = str(exc)
+        else:
+            message = ""
+        await scheduler.submit(_recorder([], "after"), flow="doc")
+        return message, scheduler.snapshot()
+
+    message, snapshot = asyncio.run(scenario())
+    assert message == "provider down"
+    assert snapshot["running"] == 0 and snapshot["completed"] == 2
+
+
+def test_token_bucket_delays_once_drained() -> None:
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.delay_for(60) == 0.0
+    bucket.consume(60)
+    assert 0.9 < bucket.delay_for(1) <= 1.0
+    # Larger than the bucket: waits for a full bucket rather than forever
+    assert bucket.delay_for(1000) <= 60.0
+    assert TokenBucket(per_minute=0).delay_for(10**9) == 0.0
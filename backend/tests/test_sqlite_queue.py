@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from backend.infrastructure.queue.sqlite_queue import DELETED, SQLiteWorkQueue
+
+
+def _queue(tmp_path: Path, lease_s: float = 30.0, max_attempts: int = 3) -> SQLiteWorkQueue:
+    return SQLiteWorkQueue(tmp_path / "queue.sqlite3", lease_s=lease_s, max_attempts=max_attempts)
+
+
+def test_expired_lease_is_retried_by_another_worker(tmp_path: Path) -> None:
+    queue = _queue(tmp_path, lease_s=0.05)
+    job, _ = queue.enqueue("analyze", {"document_id": "doc"}, key="doc")
+    assert queue.claim("crashed").id == job.id
+    assert queue.claim("other") is None
+
+    time.sleep(0.1)
+    retried = queue.claim("other")
+    assert retried is not None and retried.id == job.id
+    assert (retried.worker, retried.attempts) == ("other", 2)
+    # The crashed worker lost the job: it can neither extend nor finish it
+    assert not queue.heartbeat(job.id, "crashed")
+    assert not queue.complete(job.id, "crashed", "{}")
+    assert queue.complete(job.id, "other", '{"ok": true}')
+    assert queue.get(job.id).status == "done"
+
+
+def test_lease_expiry_fails_the_job_after_max_attempts(tmp_path: Path) -> None:
+    queue = _queue(tmp_path, lease_s=0.02, max_attempts=2)
+    job, _ = queue.enqueue("analyze", {}, key="doc")
+    for worker in ("w1", "w2"):
+        assert queue.claim(worker).id == job.id
+        time.sleep(0.05)
+    assert queue.claim("w3") is None
+    failed = queue.get(job.id)
+    assert failed.status == "failed"
+    assert failed.error == "lease expired after 2 attempts"
+
+
+def test_heartbeat_extends_the_lease_and_records_progress(tmp_path: Path) -> None:
+    queue = _queue(tmp_path, lease_s=0.3)
+    job, _ = queue.enqueue("analyze", {}, key="doc")
+    claimed = queue.claim("w1")
+    for progress in (20, 40, 60):
+        time.sleep(0.15)
+        assert queue.heartbeat(job.id, "w1", stage="llm", progress=progress, message="clauses")
+    # Well past the original lease, but the heartbeats kept it
+    assert queue.claim("w2") is None
+    current = queue.get(job.id)
+    assert (current.status, current.worker, current.stage, current.progress) == ("leased", "w1", "llm", 60)
+    assert current.lease_until > claimed.lease_until
+
+
+def test_failed_job_is_requeued_until_attempts_run_out(tmp_path: Path) -> None:
+    queue = _queue(tmp_path, max_attempts=2)
+    job, _ = queue.enqueue("analyze", {}, key="doc")
+    queue.claim("w1")
+    assert queue.fail(job.id, "w1", "boom")
+    assert queue.get(job.id).status == "queued"
+    queue.claim("w1")
+    assert queue.fail(job.id, "w1", "boom again")
+    assert queue.get(job.id).status == "failed"
+
+
+def test_enqueue_coalesces_and_supersedes_by_key(tmp_path: Path) -> None:
+    queue = _queue(tmp_path)
+    first, created = queue.enqueue("analyze", {"contract_type": "lease"}, key="doc")
+    same, again = queue.enqueue("analyze", {"contract_type": "lease"}, key="doc")
+    assert created and not again and same.id == first.id
+
+    newer, created = queue.enqueue("analyze", {"contract_type": "employment"}, key="doc")
+    assert created and newer.id != first.id
+    superseded = queue.get(first.id)
+    assert (superseded.status, superseded.error) == ("cancelled", "superseded")
+    assert queue.latest("doc").id == newer.id
+
+
+def test_change_feed_reports_every_change_in_order(tmp_path: Path) -> None:
+    queue = _queue(tmp_path)
+    start = queue.current_version()
+    job, _ = queue.enqueue("analyze", {}, key="doc")
+    queue.claim("w1")
+    queue.heartbeat(job.id, "w1", stage="ocr", progress=10)
+    queue.complete(job.id, "w1", '{"ok": true}')
+
+    changes = queue.changes(start)
+    assert [change.id for change in changes] == [job.id]
+    assert changes[0].status == "done" and changes[0].result == '{"ok": true}'
+    assert changes[0].version == queue.current_version() == start + 4
+    assert queue.changes(queue.current_version()) == []
+
+    other, _ = queue.enqueue("analyze", {}, key="other")
+    seen = queue.current_version()
+    queue.cancel("other")
+    assert [(change.id, change.status) for change in queue.changes(seen)] == [(other.id, "cancelled")]
+
+
+def test_versions_never_go_back_after_purge(tmp_path: Path) -> None:
+    queue = _queue(tmp_path)
+    job, _ = queue.enqueue("analyze", {}, key="doc")
+    queue.claim("w1")
+    queue.complete(job.id, "w1", "{}")
+    seen = queue.current_version()
+    assert queue.purge(older_than_s=-1) == 1
+
+    # A reopened queue (another process) must hand out versions past what readers have seen
+    reopened = SQLiteWorkQueue(tmp_path / "queue.sqlite3")
+    later, _ = reopened.enqueue("analyze", {}, key="doc")
+    assert later.version > seen
+    assert [change.id for change in reopened.changes(seen)] == [later.id]
+
+
+def test_forget_reports_the_deletion_through_the_feed(tmp_path: Path) -> None:
+    queue = _queue(tmp_path)
+    job, _ = queue.enqueue("analyze", {}, key="doc")
+    queue.claim("w1")
+    queue.complete(job.id, "w1", '{"clauses": []}')
+    seen = queue.current_version()
+    assert queue.forget("doc") == 1
+    [change] = queue.changes(seen)
+    assert (change.status, change.error, change.result) == ("cancelled", DELETED, None)
+    assert queue.forget("doc") == 0
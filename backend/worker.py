@@ -0,0 +1,220 @@
+"""Analysis worker: claims jobs from the shared work queue and runs the pipeline.
+
+Start as many as needed, on any host that sees the same storage root and queue file::
+
+    WORK_QUEUE_PATH=/shared/queue.sqlite3 STORAGE_PATH=/shared/documents python -m backend.worker --concurrency 4
+
+API nodes started with the same ``WORK_QUEUE_PATH`` only enqueue; results flow back to them
+through the queue. SIGTERM/SIGINT stop claiming and let running jobs finish.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from pathlib import Path
+from typing import Optional, Set
+
+from fastapi import HTTPException
+
+from backend.application.analysis_facade import AnalysisFacade
+from backend.application.clause_extractor import ClauseExtractor
+from backend.application.llm_agent import LLMAgent
+from backend.application.llm_scheduler import LLMScheduler
+from backend.application.queued_analysis import ANALYZE
+from backend.application.risk_analyzer import RiskAnalyzer
+from backend.application.template_matcher import TemplateMatcher
+from backend.config import Settings
+from backend.infrastructure.compute.executors import ExecutorPool
+from backend.infrastructure.compute.shared_models import llm_provider, ocr_model
+from backend.infrastructure.queue.sqlite_queue import Job, SQLiteWorkQueue
+from backend.infrastructure.search.clause_index import SearchJournalWriter
+from backend.infrastructure.storage.file_store import StorageManager
+from backend.infrastructure.storage.improvement_store import ImprovementStore
+from backend.infrastructure.storage.repository import InMemoryRepository
+from backend.infrastructure.storage.template_store import TemplateStore
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisWorker:
+    """Runs up to `concurrency` queued analyses at once, heartbeating each job's lease."""
+
+    def __init__(
+        self,
+        queue: SQLiteWorkQueue,
+        facade: AnalysisFacade,
+        worker_id: Optional[str] = None,
+        concurrency: int = 2,
+        poll_interval_s: float = 0.5,
+    ) -> None:
+        self.queue = queue
+        self.facade = facade
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrency = max(1, concurrency)
+        self.poll_interval_s = poll_interval_s
+        # Several beats per lease, so one slow write does not cost the job
+        self.heartbeat_s = max(0.1, queue.lease_s / 4)
+        self.processed = 0
+
+    async def run(self, stop: asyncio.Event) -> None:
+        running: Set[asyncio.Task[None]] = set()
+        logger.info("Worker %s consuming %s (concurrency %d)", self.worker_id, self.queue.path, self.concurrency)
+        while not stop.is_set():
+            claimed = False
+            if len(running) < self.concurrency:
+                job = await asyncio.to_thread(self.queue.claim, self.worker_id, (ANALYZE,))
+                if job is not None:
+                    claimed = True
+                    task = asyncio.create_task(self._process(job))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+            if claimed:
+                continue
+            # Idle or at capacity: wake on the next poll tick, a finished job or shutdown
+            waiters = [asyncio.create_task(stop.wait()), *running]
+            await asyncio.wait(waiters, timeout=self.poll_interval_s, return_when=asyncio.FIRST_COMPLETED)
+            waiters[0].cancel()
+        if running:
+            logger.info("Worker %s draining %d running job(s)", self.worker_id, len(running))
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def _process(self, job: Job) -> None:
+        document_id = job.payload["document_id"]
+        repository = self.facade.repository
+        analysis = asyncio.create_task(
+            self.facade.analyze(
+                document_id, contract_type=job.payload.get("contract_type") or "general", tenant=job.payload.get("tenant")
+            )
+        )
+        try:
+            while not analysis.done():
+                await asyncio.wait({analysis}, timeout=self.heartbeat_s)
+                if analysis.done():
+                    break
+                status = repository.get_status(document_id)
+                owned = await asyncio.to_thread(
+                    self.queue.heartbeat, job.id, self.worker_id, status.stage, status.progress, status.message
+                )
+                if not owned:
+                    # Cancelled, superseded, or the lease ran out and another worker took over
+                    logger.info("Job %s for %s is no longer ours; stopping it", job.id, document_id)
+                    self.facade.cancel(document_id)
+                    analysis.cancel()
+                    await asyncio.gather(analysis, return_exceptions=True)
+                    return
+            try:
+                result = analysis.result()
+            except HTTPException as exc:
+                # Missing document or file: retrying cannot help
+                await asyncio.to_thread(self.queue.fail, job.id, self.worker_id, str(exc.detail), False)
+                return
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Job %s for %s failed (attempt %d): %s", job.id, document_id, job.attempts, exc)
+                await asyncio.to_thread(self.queue.fail, job.id, self.worker_id, f"{type(exc).__name__}: {exc}")
+                return
+            body = await asyncio.to_thread(result.model_dump_json)
+            await asyncio.to_thread(self.queue.complete, job.id, self.worker_id, body)
+            self.processed += 1
+        finally:
+            # Results live in the queue and on the API nodes; workers keep no per-document state
+            repository.evict(document_id)
+
+
+def build_facade(settings: Settings) -> AnalysisFacade:
+    """Pipeline without the API's secondary indexes; those are fed on the API nodes.
+
+    The exception is the search journal: the worker that produced a result appends its line,
+    once, and the API nodes' indexes pick it up from there.
+    """
+    try:
+        storage = StorageManager(
+            Path(settings.storage_path),
+            compression=settings.storage_compression,
+            compression_level=settings.storage_compression_level,
+        )
+    except ImportError as exc:  # pragma: no cover - fallback path
+        logger.warning("Storage compression unavailable, storing uncompressed: %s", exc)
+        storage = StorageManager(Path(settings.storage_path))
+    scheduler = LLMScheduler(max_concurrency=settings.llm_max_concurrency, rpm=settings.llm_rpm, tpm=settings.llm_tpm)
+    repository = InMemoryRepository(settings.storage_path, storage=storage)
+    repository.add_result_listener(SearchJournalWriter(Path(settings.search_index_path)).on_result_saved)
+    return AnalysisFacade(
+        repository=repository,
+        ocr_service=ocr_model(settings),
+        clause_extractor=ClauseExtractor(),
+        llm_agent=LLMAgent(
+            llm_provider(settings),
+            improvement_store=ImprovementStore(Path(settings.improvement_store_path)),
+            scheduler=scheduler,
+        ),
+        risk_analyzer=RiskAnalyzer(),
+        executors=ExecutorPool(
+            thread_workers=settings.executor_thread_workers,
+            process_workers=settings.executor_process_workers,
+        ),
+        template_matcher=TemplateMatcher(
+            TemplateStore(Path(settings.template_store_path)), min_similarity=settings.template_min_similarity
+        ),
+    )
+
+
+async def _serve(worker: AnalysisWorker) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except NotImplementedError:  # pragma: no cover - Windows
+            pass
+    executors = worker.facade.executors
+    if executors is not None:
+        await executors.warm_up()
+    try:
+        await worker.run(stop)
+    finally:
+        if executors is not None:
+            executors.shutdown()
+        logger.info("Worker %s stopped after %d job(s)", worker.worker_id, worker.processed)
+
+
+def run_worker(
+    settings: Settings, queue_path: Path, concurrency: Optional[int] = None, worker_id: Optional[str] = None
+) -> None:
+    """Consume `queue_path` until SIGTERM/SIGINT; also the pre-fork server's analysis workers."""
+    queue = SQLiteWorkQueue(
+        Path(queue_path),
+        lease_s=settings.work_queue_lease_s,
+        max_attempts=settings.work_queue_max_attempts,
+        journal_mode=settings.work_queue_journal_mode,
+    )
+    worker = AnalysisWorker(
+        queue,
+        build_facade(settings),
+        worker_id=worker_id,
+        concurrency=concurrency or settings.worker_concurrency,
+    )
+    asyncio.run(_serve(worker))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queue", type=Path, default=None, help="queue file (default: WORK_QUEUE_PATH)")
+    parser.add_argument("--concurrency", type=int, default=None, help="jobs in flight (default: WORKER_CONCURRENCY)")
+    parser.add_argument("--worker-id", default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    settings = Settings()
+    queue_path = args.queue or settings.work_queue_path
+    if queue_path is None:
+        parser.error("set WORK_QUEUE_PATH or pass --queue")
+    run_worker(settings, queue_path, concurrency=args.concurrency, worker_id=args.worker_id)
+
+
+if __name__ == "__main__":
+    main()
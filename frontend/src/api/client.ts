@@ -1,4 +1,4 @@
-import type { AnalysisResult, DocumentStatus, ClauseImprovement } from "../types";
+import type { AnalysisResult, ClausePage, DocumentStatus, ClauseImprovement, ResultSummary } from "../types";
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL || "http://localhost:8000";
 
@@ -30,6 +30,14 @@ export async function triggerAnalysis(documentId: string, contractType: string =
   return res.json();
 }
 
+export async function cancelAnalysis(documentId: string): Promise<{ documentId: string; cancelled: boolean }> {
+  const res = await fetch(`${API_BASE}/api/documents/${documentId}/cancel`, { method: "POST" });
+  if (!res.ok) {
+    throw new Error("분석 취소 실패");
+  }
+  return res.json();
+}
+
 export async function fetchResult(documentId: string): Promise<AnalysisResult> {
   const res = await fetch(`${API_BASE}/api/documents/${documentId}/result`);
   if (!res.ok) {
@@ -38,6 +46,37 @@ export async function fetchResult(documentId: string): Promise<AnalysisResult> {
   return res.json();
 }
 
+export type ResultPageQuery = {
+  sort?: "risk_desc" | "risk_asc" | "position";
+  minLevel?: "low" | "medium" | "high";
+  page?: number;
+  pageSize?: number;
+  fields?: string[];
+};
+
+export async function fetchResultPage(documentId: string, query: ResultPageQuery = {}): Promise<ClausePage> {
+  const params = new URLSearchParams({
+    sort: query.sort ?? "risk_desc",
+    page: String(query.page ?? 1),
+    page_size: String(query.pageSize ?? 50),
+  });
+  if (query.minLevel) params.set("min_level", query.minLevel);
+  if (query.fields?.length) params.set("fields", query.fields.join(","));
+  const res = await fetch(`${API_BASE}/api/documents/${documentId}/result?${params.toString()}`);
+  if (!res.ok) {
+    throw new Error("결과 조회 실패");
+  }
+  return res.json();
+}
+
+export async function fetchSummary(documentId: string): Promise<ResultSummary> {
+  const res = await fetch(`${API_BASE}/api/documents/${documentId}/summary`);
+  if (!res.ok) {
+    throw new Error("요약 조회 실패");
+  }
+  return res.json();
+}
+
 export async function downloadReport(
   documentId: string,
   format: "pdf" | "md" = "pdf",
@@ -71,3 +110,18 @@ export async function suggestImprovement(documentId: string, clauseId: string, c
   }
   return res.json();
 }
+
+export async function suggestImprovements(
+  documentId: string,
+  options: { minScore?: number; maxCalls?: number } = {},
+): Promise<{ documentId: string; eligible: number; reused: number; generated: number; failed: number; skipped: number }> {
+  const res = await fetch(`${API_BASE}/api/documents/${documentId}/improvements`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ min_score: options.minScore ?? 50, max_calls: options.maxCalls ?? 20 }),
+  });
+  if (!res.ok) {
+    throw new Error("수정안 일괄 요청 실패");
+  }
+  return res.json();
+}
@@ -86,11 +86,11 @@ const ClauseList = ({ clauses, sortByRisk = "desc", documentId }: Props) => {
               </button>
             </div>
           )}
-          {suggestions[clause.id] && (
+          {(suggestions[clause.id] ?? clause.improvement) && (
             <div className="suggestion-box">
               <p className="label">제안된 수정안</p>
-              <p className="clause-body">{suggestions[clause.id].suggestion}</p>
-              <p className="muted">이유: {suggestions[clause.id].rationale || "제공되지 않음"}</p>
+              <p className="clause-body">{(suggestions[clause.id] ?? clause.improvement)?.suggestion}</p>
+              <p className="muted">이유: {(suggestions[clause.id] ?? clause.improvement)?.rationale || "제공되지 않음"}</p>
             </div>
           )}
           {errorId === clause.id && <p className="error-chip">수정안 생성 실패</p>}
@@ -4,6 +4,14 @@ export interface ClauseRisk {
   explanation: string;
 }
 
+export interface ClauseSpan {
+  kind: "조" | "항" | "호" | string;
+  number?: number;
+  start: number;
+  end: number;
+  children: ClauseSpan[];
+}
+
 export interface Clause {
   id: string;
   raw_text: string;
@@ -11,6 +19,11 @@ export interface Clause {
   category?: string;
   reasoning?: string;
   risk: ClauseRisk;
+  improvement?: Omit<ClauseImprovement, "clauseId"> | null;
+  start?: number;
+  end?: number;
+  article_no?: number;
+  children?: ClauseSpan[];
 }
 
 export interface AnalysisResult {
@@ -20,6 +33,9 @@ export interface AnalysisResult {
   overall_risk_level?: string;
   contract_type?: string;
   auto_contract_type?: string;
+  template_id?: string | null;
+  template_clauses_reused?: number;
+  stage_durations?: Record<string, number>;
   created_at?: string;
 }
 
@@ -36,3 +52,25 @@ export interface ClauseImprovement {
   rationale: string;
   risk_delta?: number;
 }
+
+export interface ClausePage {
+  document_id: string;
+  contract_type?: string;
+  overall_risk_score: number;
+  total: number;
+  page: number;
+  page_size: number;
+  clauses: Partial<Clause>[];
+}
+
+export interface ResultSummary {
+  document_id: string;
+  contract_type?: string;
+  auto_contract_type?: string;
+  stage_durations?: Record<string, number>;
+  overall_risk_score: number;
+  overall_risk_level: string;
+  clause_count: number;
+  by_level: Record<string, number>;
+  by_category: Record<string, number>;
+}